@@ -49,6 +49,14 @@ def create_app(config_name='development'):
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(payment_bp, url_prefix='/api/payment')
     
+    # Apply market data settings to the shared service instance
+    from app.blueprints.api.routes import market_service, replay_manager, stream_hub
+    market_service.init_app(app)
+    stream_hub.init_app(app)
+    replay_manager.init_app(app)
+    from app.blueprints.trading.routes import matching_engine
+    matching_engine.init_app(app)
+    
     # Health check endpoint
     @app.route('/api/health')
     def health():
@@ -1,34 +1,250 @@
 """API blueprint - market data, quotes, candles"""
-from flask import Blueprint, request, jsonify
+import time
+
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_login import current_user, login_required
+from app.services import market_codec, order_book, price_process
+from app.services.conditional import conditional
 from app.services.market_data import MarketDataService
-from app.extensions import limiter
+from app.services.market_replay import ReplayError, ReplayManager
+from app.services.market_stream import MarketStreamHub, StreamFullError
+from app.extensions import limiter, login_manager
 
 api_bp = Blueprint('api', __name__)
 market_service = MarketDataService()
+stream_hub = MarketStreamHub(market_service)
+replay_manager = ReplayManager(market_service)
+
+MAX_RTT_SYMBOLS = 50
+# Symbols outside the snapshot are priced one by one; the whole universe fits
+MAX_QUOTE_SYMBOLS = 100
+
+
+def _candles_version(symbol):
+    """Version of a candle page from the request's range end (checked before generating it)"""
+    replay = request.args.get('replay')
+    if replay:
+        if not current_user.is_authenticated:
+            return None
+        try:
+            session = replay_manager.get(replay)
+        except ReplayError:
+            return None
+        virtual_ms = session.virtual_time()
+        return f'replay.{replay}.{price_process.tick_time(virtual_ms)}', virtual_ms
+    end = request.args.get('to', type=int)
+    before = request.args.get('before', type=int)
+    if before is not None:
+        end = before - 1 if end is None else min(end, before - 1)
+    return market_service.candles_version(request.args.get('timeframe', '1d'), end_ms=end)
 
 
 @api_bp.route('/market/candles/<symbol>', methods=['GET'])
 @limiter.limit("30 per minute")
+@conditional(_candles_version)
 def get_candles(symbol):
-    """Get historical candles for a symbol"""
+    """Get historical candles for a symbol.
+    
+    Paging (all times epoch ms, `limit` capped at MARKET_CANDLES_MAX_LIMIT):
+    - `before=<cursor>`: the `limit` candles before it (scroll back with `prev_cursor`)
+    - `after=<cursor>`: the `limit` candles after it (page forward with `next_cursor`)
+    - `from=<ms>` / `to=<ms>`: candles in a time range, oldest first page when `from` is set
+    - `since=<ms>` (time of the newest candle you hold): that candle and newer ones
+    Without any of these the newest `limit` candles are returned.
+    
+    Responses carry an ETag/Last-Modified; revalidating with If-None-Match or
+    If-Modified-Since returns 304 until the page's bucket or price tick moves.
+    
+    `format=columnar` (or `Accept: application/msgpack`) returns candles as
+    per-field arrays: {"t": [...], "o": [...], "h", "l", "c", "v"}.
+    
+    `replay=<session id>` (see POST /market/replay, login required) returns
+    the session's candles at its virtual time instead; only `limit` and
+    `since` apply.
+    """
     timeframe = request.args.get('timeframe', '1d')
-    limit = int(request.args.get('limit', 120))
+    max_limit = current_app.config.get('MARKET_CANDLES_MAX_LIMIT', 1000)
+    limit = max(1, min(request.args.get('limit', 120, type=int), max_limit))
+    since = request.args.get('since', type=int)
+    replay = request.args.get('replay')
     
-    candles = market_service.get_candles(symbol, timeframe=timeframe, limit=limit)
+    if replay:
+        if not current_user.is_authenticated:
+            return login_manager.unauthorized()
+        try:
+            session = replay_manager.get(replay)
+        except ReplayError as e:
+            return jsonify({'error': str(e)}), 404
+        if session.buffer.symbol != symbol.upper():
+            return jsonify({'error': 'Replay session is for another symbol'}), 400
+        fmt = market_codec.negotiate(request)
+        payload = {
+            'symbol': session.buffer.symbol,
+            'candles': session.candles(limit, since),
+            'replay': session.state(),
+        }
+        return market_codec.response(market_codec.shape(payload, fmt, 'candles', market_codec.CANDLE_FIELDS), fmt)
+    before = request.args.get('before', type=int)
+    after = request.args.get('after', type=int)
+    start = request.args.get('from', type=int)
+    end = request.args.get('to', type=int)
     
-    return jsonify({
+    if before is not None or after is not None or start is not None or end is not None:
+        if before is not None:
+            end = before - 1 if end is None else min(end, before - 1)
+        if after is not None:
+            start = after + 1 if start is None else max(start, after + 1)
+        newest = before is not None or (after is None and start is None)
+        candles = market_service.get_candle_range(
+            symbol, timeframe=timeframe, start_ms=start, end_ms=end, limit=limit, newest=newest,
+        )
+    else:
+        candles = market_service.get_candles(symbol, timeframe=timeframe, limit=limit, since=since)
+    
+    # Cursors are candle times: pass prev_cursor as `before`, next_cursor as `after`.
+    # prev_cursor is null once the page reaches the start of history (the epoch),
+    # next_cursor once it reaches the forming candle.
+    interval_ms = market_service.TIMEFRAME_INTERVALS.get(timeframe, market_service.TIMEFRAME_INTERVALS['1d'])
+    interval_ms = int(interval_ms.total_seconds() * 1000)
+    reaches_now = bool(candles) and candles[-1]['time'] + interval_ms > time.time() * 1000
+    
+    fmt = market_codec.negotiate(request)
+    payload = {
         'symbol': symbol.upper(),
-        'candles': candles
-    }), 200
+        'candles': candles,
+        'prev_cursor': candles[0]['time'] if candles and candles[0]['time'] >= interval_ms else None,
+        'next_cursor': candles[-1]['time'] if candles and not reaches_now else None,
+    }
+    return market_codec.response(market_codec.shape(payload, fmt, 'candles', market_codec.CANDLE_FIELDS), fmt)
 
 
 @api_bp.route('/market/quote/<symbol>', methods=['GET'])
 @limiter.limit("60 per minute")
 def get_quote(symbol):
-    """Get current quote for a symbol"""
+    """Get current quote for a symbol (JSON or `Accept: application/msgpack`)"""
     quote = market_service.get_quote(symbol)
     
-    return jsonify(quote), 200
+    return market_codec.response(quote, market_codec.negotiate(request))
+
+
+@api_bp.route('/market/quotes', methods=['GET'])
+@limiter.limit("60 per minute")
+def get_quotes():
+    """Get current quotes for many symbols (`symbols=A,B,C`, at most 100; all when omitted).
+    
+    `format=columnar` (or `Accept: application/msgpack`) returns quotes as
+    per-field arrays: {"s": [...], "p": [...], "b", "a", "t"}.
+    """
+    symbols_param = request.args.get('symbols', '')
+    symbols = [s.strip() for s in symbols_param.split(',') if s.strip()] or None
+    if symbols is not None and len(symbols) > MAX_QUOTE_SYMBOLS:
+        return jsonify({'message': f'At most {MAX_QUOTE_SYMBOLS} symbols per request'}), 400
+    
+    quotes = market_service.get_quotes(symbols)
+    
+    fmt = market_codec.negotiate(request)
+    payload = {
+        'timestamp': market_service.snapshot.tick,
+        'quotes': quotes
+    }
+    return market_codec.response(market_codec.shape(payload, fmt, 'quotes', market_codec.QUOTE_FIELDS), fmt)
+
+
+@api_bp.route('/market/book/<symbol>', methods=['GET'])
+@limiter.limit("60 per minute")
+def get_order_book(symbol):
+    """Synthetic Level-2 order book: `depth` levels (default and max 10) per side.
+    
+    Levels are [price, size] pairs, best first; sizes are in units of the asset
+    (shares, coins, base currency).
+    """
+    depth = request.args.get('depth', order_book.LEVELS, type=int)
+    book = market_service.get_order_book(symbol, max(1, min(depth, order_book.LEVELS)))
+    if book is None:
+        return jsonify({'error': 'Symbol not found'}), 404
+    
+    return market_codec.response(book, market_codec.negotiate(request))
+
+
+@api_bp.route('/market/stream', methods=['GET'])
+@limiter.limit("30 per minute")
+def stream_market():
+    """Stream quote (and optional candle) updates as Server-Sent Events.
+    
+    Query params: `symbols=A,B,C` (all when omitted), `timeframe=1m` to also
+    receive the latest candles each tick. Try it with `curl -N`.
+    
+    `replay=<session id>` (login required) streams a replay session's quote
+    and new candles at its virtual time instead, then an `end` event.
+    """
+    symbols_param = request.args.get('symbols', '')
+    symbols = [s.strip() for s in symbols_param.split(',') if s.strip()] or None
+    timeframe = request.args.get('timeframe')
+    
+    replay = None
+    if request.args.get('replay'):
+        if not current_user.is_authenticated:
+            return login_manager.unauthorized()
+        try:
+            replay = replay_manager.get(request.args['replay'])
+        except ReplayError as e:
+            return jsonify({'error': str(e)}), 404
+    
+    try:
+        subscription = stream_hub.subscribe(symbols, timeframe, replay=replay)
+    except StreamFullError as e:
+        return jsonify({'message': str(e)}), 503
+    
+    return Response(
+        stream_with_context(subscription.events()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # Disable proxy buffering
+        },
+    )
+
+
+@api_bp.route('/market/replay', methods=['POST'])
+@limiter.limit("30 per minute")
+@login_required
+def create_replay():
+    """Start replaying a past window of a symbol at 1x-100x speed.
+    
+    JSON body: `symbol`, `timeframe` (default 1m), `start` (epoch ms), and
+    `end` (epoch ms) or `bars`, plus `speed` (default 1). The returned `id`
+    goes in `replay=` on the candles and stream endpoints; every worker can
+    serve it and replays of the same window share one buffer.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        session = replay_manager.create(
+            str(data.get('symbol', '')),
+            data.get('timeframe', '1m'),
+            int(data['start']),
+            end_ms=int(data['end']) if data.get('end') is not None else None,
+            bars=int(data['bars']) if data.get('bars') is not None else None,
+            speed=float(data.get('speed', 1)),
+        )
+    except ReplayError as e:
+        return jsonify({'error': str(e)}), 400
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'start (epoch ms) is required; end, bars and speed must be numbers'}), 400
+    
+    return jsonify(session.state()), 201
+
+
+@api_bp.route('/market/replay/<session_id>', methods=['GET'])
+@limiter.limit("60 per minute")
+@login_required
+def get_replay(session_id):
+    """Replay session state: window, speed and current virtual time"""
+    try:
+        session = replay_manager.get(session_id)
+    except ReplayError as e:
+        return jsonify({'error': str(e)}), 404
+    
+    return jsonify(session.state())
 
 
 @api_bp.route('/assets/search', methods=['GET'])
@@ -43,6 +259,28 @@ def search_assets():
     return jsonify(results), 200
 
 
+@api_bp.route('/market/rtt', methods=['GET'])
+@limiter.limit("30 per minute")
+def get_rtt_coaching_many():
+    """Get RTT coaching for a watchlist (`symbols=A,B,C`, up to 50)"""
+    symbols_param = request.args.get('symbols', '')
+    symbols = [s.strip() for s in symbols_param.split(',') if s.strip()]
+    side = request.args.get('side', 'buy')  # 'buy' or 'sell'
+    free_mode = request.args.get('free_mode', 'false').lower() == 'true'
+    
+    if not symbols:
+        return jsonify({'message': 'symbols is required'}), 400
+    if len(symbols) > MAX_RTT_SYMBOLS:
+        return jsonify({'message': f'At most {MAX_RTT_SYMBOLS} symbols per request'}), 400
+    
+    results = market_service.get_rtt_coaching_many(symbols, side, free_mode)
+    
+    return jsonify({
+        'side': side,
+        'results': [{'symbol': symbol, 'coaching': coaching} for symbol, coaching in results]
+    }), 200
+
+
 @api_bp.route('/market/rtt/<symbol>', methods=['GET'])
 @limiter.limit("60 per minute")
 def get_rtt_coaching(symbol):
@@ -71,3 +309,11 @@ def get_market_status():
         'message': message
     }), 200
 
+
+
+@api_bp.route('/market/cache', methods=['GET'])
+@login_required
+@limiter.limit("10 per minute")
+def get_market_cache_stats():
+    """Get per-process market cache counters (signed-in users only)"""
+    return jsonify(market_service.cache.stats()), 200
@@ -1,14 +1,47 @@
 """Lessons blueprint - educational content"""
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
+from sqlalchemy import func
 from app.extensions import db
 from app.models.lesson import Lesson, LessonProgress
+from app.services.conditional import conditional
 from datetime import datetime
 
 lessons_bp = Blueprint('lessons', __name__)
 
 
+def _progress_version(lesson_id=None):
+    """(count, latest updated_at) of the current user's progress rows, optionally for one lesson"""
+    if not current_user.is_authenticated:
+        return 0, None
+    query = db.session.query(func.count(LessonProgress.id), func.max(LessonProgress.updated_at)).filter(
+        LessonProgress.user_id == current_user.id
+    )
+    if lesson_id is not None:
+        query = query.filter(LessonProgress.lesson_id == lesson_id)
+    return query.one()
+
+
+def _lessons_version():
+    """Version of the lesson list: lesson count/updated_at max plus the user's progress"""
+    count, updated = db.session.query(func.count(Lesson.id), func.max(Lesson.updated_at)).one()
+    progress_count, progress_updated = _progress_version()
+    modified = max((t for t in (updated, progress_updated) if t is not None), default=None)
+    return f'{count}.{updated}.{progress_count}.{progress_updated}', modified
+
+
+def _lesson_version(slug):
+    """Version of one lesson (and the user's progress on it); None lets the view 404"""
+    row = db.session.query(Lesson.id, Lesson.updated_at).filter_by(slug=slug).first()
+    if row is None:
+        return None
+    progress_count, progress_updated = _progress_version(row.id)
+    modified = max((t for t in (row.updated_at, progress_updated) if t is not None), default=None)
+    return f'{row.id}.{row.updated_at}.{progress_count}.{progress_updated}', modified
+
+
 @lessons_bp.route('', methods=['GET'])
+@conditional(_lessons_version)
 def get_lessons():
     """Get all lessons"""
     lessons = Lesson.query.order_by(Lesson.order, Lesson.id).all()
@@ -32,6 +65,7 @@ def get_lessons():
 
 
 @lessons_bp.route('/<slug>', methods=['GET'])
+@conditional(_lesson_version)
 def get_lesson(slug):
     """Get lesson by slug"""
     lesson = Lesson.query.filter_by(slug=slug).first_or_404()
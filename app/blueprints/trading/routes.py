@@ -1,17 +1,29 @@
 """Trading blueprint - trades, positions, portfolio"""
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from app.blueprints.api.routes import market_service
 from app.extensions import db
 from app.models.portfolio import Portfolio
 from app.models.trade import Trade
+from app.services import balance_ledger
+from app.services.conditional import conditional
+from app.services.fill_pricing import FillPricer
+from app.services.order_matching import MatchingEngine
 from app.services.entitlements import (
     get_starting_simcash,
     get_user_entitlements,
+    is_asset_allowed,
 )
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 
 trading_bp = Blueprint('trading', __name__)
+matching_engine = MatchingEngine(market_service)
+fill_pricer = FillPricer(market_service)
+
+ORDER_TYPES = ('market', 'limit', 'stop')
 
 
 _TIER_RANK = {
@@ -46,12 +58,10 @@ def _require_min_tier(min_tier: str, message: str):
 
 def _require_asset_access(symbol: str):
     entitlements = get_user_entitlements(current_user)
-    allowed = entitlements.get('assets_allowed', [])
-    if allowed == 'all':
+    if is_asset_allowed(entitlements.get('tier', 'free'), symbol):
         return None
 
-    if isinstance(allowed, list) and symbol in allowed:
-        return None
+    allowed = entitlements.get('assets_allowed', [])
 
     # For now, anything not in Starter's list requires Pro.
     required_tier = 'starter' if entitlements.get('tier', 'free') == 'free' else 'pro'
@@ -82,6 +92,23 @@ def _require_trade_limit():
     }), 403
 
 
+def _positive_decimal(data, field):
+    """Optional positive number from the request body as a Decimal (None when absent).
+
+    Raises ValueError when the field is present but not a finite number > 0.
+    """
+    value = data.get(field)
+    if value is None or value == '':
+        return None
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f'{field} must be a number') from None
+    if not number.is_finite() or number <= 0:
+        raise ValueError(f'{field} must be a positive number')
+    return number
+
+
 def _tier_starting_balance_decimal() -> Decimal:
     """Tier-based starting SimCash balance as a Decimal(15,2)."""
     amount = int(get_starting_simcash(current_user))
@@ -101,15 +128,27 @@ def _get_or_create_portfolio() -> Portfolio:
         experience=None,
     )
     db.session.add(portfolio)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A parallel request of the same user created it first
+        db.session.rollback()
+        portfolio = Portfolio.query.filter_by(user_id=current_user.id).first()
     return portfolio
 
 
 # === PORTFOLIO / WALLET ===
 
+def _portfolio_version():
+    """Version of the user's portfolio row (None before it exists, so the view creates it)"""
+    updated = db.session.query(Portfolio.updated_at).filter_by(user_id=current_user.id).scalar()
+    return None if updated is None else (updated.isoformat(), updated)
+
+
 @trading_bp.route('/wallet', methods=['GET'])
 @trading_bp.route('/portfolio', methods=['GET'])
 @login_required
+@conditional(_portfolio_version)
 def get_wallet():
     """Get user's wallet/portfolio"""
     portfolio = _get_or_create_portfolio()
@@ -168,7 +207,15 @@ def get_trades():
 @trading_bp.route('/trades', methods=['POST'])
 @login_required
 def create_trade():
-    """Place a new trade"""
+    """Place a new trade.
+    
+    `orderType` is 'market' (default), filled at once at the server's price for
+    the size (see FillPricer; a client `entryPrice` is ignored), or 'limit' /
+    'stop' with a `triggerPrice`: the order rests as 'pending' until the quote
+    reaches it and then opens at the quote. Buy orders reserve size x triggerPrice up
+    front; the difference is settled at the fill. `stopLoss` / `takeProfit`
+    close the position automatically once the quote crosses them.
+    """
     data = request.get_json()
     
     # Validate symbol access + trade limits by tier
@@ -182,44 +229,71 @@ def create_trade():
         if denied:
             return denied
 
-    # Get portfolio
-    portfolio = _get_or_create_portfolio()
+    # Make sure the portfolio exists before its balance is debited
+    _get_or_create_portfolio()
+    
+    order_type = data.get('orderType', 'market')
+    if order_type not in ORDER_TYPES:
+        return jsonify({'message': f'Invalid orderType: {order_type}'}), 400
     
     # Validate required fields
-    required = ['symbol', 'side', 'size', 'entryPrice']
+    required = ['symbol', 'side', 'size'] + (['triggerPrice'] if order_type != 'market' else [])
     for field in required:
-        if field not in data:
+        if data.get(field) in (None, ''):
             return jsonify({'message': f'Missing required field: {field}'}), 400
     
     side = data['side']
-    size = Decimal(str(data['size']))
-    entry_price = Decimal(str(data['entryPrice']))
+    if side not in ('buy', 'sell'):
+        return jsonify({'message': f'Invalid side: {side}'}), 400
+    try:
+        size = _positive_decimal(data, 'size')
+        trigger_price = _positive_decimal(data, 'triggerPrice') if order_type != 'market' else None
+        stop_loss = _positive_decimal(data, 'stopLoss')
+        take_profit = _positive_decimal(data, 'takeProfit')
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    if order_type == 'market':
+        fill = fill_pricer.price(data['symbol'], side, float(size))
+        if fill is None:
+            return jsonify({'message': 'Symbol not found'}), 404
+        entry_price = Decimal(str(fill['price']))
+    else:
+        # Resting orders are priced at their trigger until they fill
+        entry_price = trigger_price
     
-    # Check balance for buy orders
+    # A long's stop-loss sits below the entry and its take-profit above it; a short's the
+    # other way round. On the wrong side an exit would fire as soon as the position opens.
+    below, above = ('stopLoss', 'takeProfit') if side == 'buy' else ('takeProfit', 'stopLoss')
+    levels = {'stopLoss': stop_loss, 'takeProfit': take_profit}
+    if levels[below] is not None and levels[below] >= entry_price:
+        return jsonify({'message': f'{below} must be below the entry price ({entry_price}) for a {side}'}), 400
+    if levels[above] is not None and levels[above] <= entry_price:
+        return jsonify({'message': f'{above} must be above the entry price ({entry_price}) for a {side}'}), 400
+    
+    # Pay for buy orders: a conditional debit, so parallel orders can't overdraw the balance
     if side == 'buy':
-        cost = entry_price * size
-        if portfolio.balance < cost:
+        cost = balance_ledger.cents(entry_price * size)
+        if cost <= 0:
+            return jsonify({'message': 'Order value is below one cent'}), 400
+        if not balance_ledger.debit(current_user.id, cost):
+            db.session.rollback()
             return jsonify({
                 'message': 'Insufficient funds',
-                'balance': str(portfolio.balance),
+                'balance': str(balance_ledger.balance(current_user.id)),
                 'required': str(cost),
                 'hint': 'You can reset your practice cash from the Portfolio page to restore your starting SimCash.'
             }), 400
-        
-        # Deduct balance
-        portfolio.balance -= cost
     
     # Calculate risk/reward metrics
     risk_amount = None
     reward_amount = None
     rr_ratio = None
     
-    if 'stopLoss' in data and data['stopLoss']:
-        stop_loss = Decimal(str(data['stopLoss']))
+    if stop_loss is not None:
         risk_amount = abs(entry_price - stop_loss) * size
     
-    if 'takeProfit' in data and data['takeProfit']:
-        take_profit = Decimal(str(data['takeProfit']))
+    if take_profit is not None:
         reward_amount = abs(take_profit - entry_price) * size
     
     if risk_amount and reward_amount and risk_amount > 0:
@@ -232,18 +306,23 @@ def create_trade():
         asset_class=data.get('assetClass'),
         side=side,
         size=size,
+        order_type=order_type,
+        trigger_price=trigger_price,
         entry_price=entry_price,
-        stop_loss=Decimal(str(data['stopLoss'])) if data.get('stopLoss') else None,
-        take_profit=Decimal(str(data['takeProfit'])) if data.get('takeProfit') else None,
+        stop_loss=stop_loss,
+        take_profit=take_profit,
         risk_amount=risk_amount,
         reward_amount=reward_amount,
         rr_ratio=rr_ratio,
-        status='open'
+        status='open' if order_type == 'market' else 'pending'
     )
     
     db.session.add(trade)
     db.session.commit()
     
+    # The matching process picks the trade up on its next tick
+    matching_engine.start()
+    
     return jsonify(trade.to_dict()), 201
 
 
@@ -251,7 +330,7 @@ def create_trade():
 @trading_bp.route('/positions/<int:trade_id>/close', methods=['POST'])
 @login_required
 def close_trade(trade_id):
-    """Close an open trade"""
+    """Close an open trade at the server's fill price for its size"""
     trade = Trade.query.get_or_404(trade_id)
     
     # Verify ownership
@@ -261,29 +340,71 @@ def close_trade(trade_id):
     if trade.status == 'closed':
         return jsonify({'message': 'Trade already closed'}), 400
     
-    data = request.get_json()
-    exit_price = Decimal(str(data.get('exitPrice')))
+    if trade.status != 'open':
+        return jsonify({'message': 'Order has not been filled - cancel it instead'}), 400
+    
+    # Closing sells a long into the bids and buys a short back from the asks
+    fill = fill_pricer.price(trade.symbol, 'sell' if trade.side == 'buy' else 'buy', float(trade.size))
+    if fill is None:
+        return jsonify({'message': 'Symbol not found'}), 404
+    exit_price = Decimal(str(fill['price']))
     
     # Calculate P&L
     if trade.side == 'buy':
-        pnl = (exit_price - trade.entry_price) * trade.size
-        # Return principal + pnl
-        proceeds = (trade.entry_price * trade.size) + pnl
+        pnl = balance_ledger.cents((exit_price - trade.entry_price) * trade.size)
+        # Return principal (as debited at entry) + pnl
+        proceeds = balance_ledger.cents(trade.entry_price * trade.size) + pnl
     else:
         # Short selling (simplified)
-        pnl = (trade.entry_price - exit_price) * trade.size
+        pnl = balance_ledger.cents((trade.entry_price - exit_price) * trade.size)
         proceeds = pnl
     
-    # Update portfolio
-    portfolio = _get_or_create_portfolio()
-    portfolio.balance += proceeds
+    # Conditional on 'open' so a close racing another close, or an SL/TP fill, settles once
+    closed = db.session.execute(
+        update(Trade)
+        .where(Trade.id == trade.id, Trade.status == 'open')
+        .values(status='closed', exit_price=exit_price, exit_time=datetime.utcnow(), pnl=pnl, exit_reason='manual')
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not closed:
+        db.session.rollback()
+        return jsonify({'message': 'Trade already closed'}), 400
+    
+    # A short's loss is charged even when it exceeds the balance
+    balance_ledger.settle(trade.user_id, proceeds)
+    db.session.commit()
+    matching_engine.remove(trade.id)
+    db.session.refresh(trade)
+    
+    return jsonify(trade.to_dict()), 200
+
+
+@trading_bp.route('/trades/<int:trade_id>/cancel', methods=['POST'])
+@login_required
+def cancel_trade(trade_id):
+    """Cancel a pending limit/stop order, releasing a buy order's cash reserve"""
+    trade = Trade.query.get_or_404(trade_id)
+    
+    # Verify ownership
+    if trade.user_id != current_user.id:
+        return jsonify({'message': 'Unauthorized'}), 403
     
-    # Update trade
-    trade.exit_price = exit_price
-    trade.exit_time = datetime.utcnow()
-    trade.pnl = pnl
-    trade.status = 'closed'
+    # Conditional on 'pending' so an order the matching engine is filling can't also be refunded
+    cancelled = db.session.execute(
+        update(Trade)
+        .where(Trade.id == trade.id, Trade.status == 'pending')
+        .values(status='cancelled', exit_time=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not cancelled:
+        db.session.rollback()
+        return jsonify({'message': 'Only pending orders can be cancelled'}), 400
+    
+    if trade.side == 'buy':
+        balance_ledger.credit(trade.user_id, trade.trigger_price * trade.size)
     
     db.session.commit()
+    matching_engine.remove(trade.id)
+    db.session.refresh(trade)
     
     return jsonify(trade.to_dict()), 200
@@ -16,6 +16,10 @@ class Config:
         'pool_pre_ping': True,
         'pool_recycle': 300,
     }
+    # SQLite serializes writers: wait for the write lock (balance updates queue
+    # on it under concurrent trades) instead of failing after the default 5s
+    if SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 60))}
     
     # Session config
     SESSION_COOKIE_HTTPONLY = True
@@ -25,6 +29,41 @@ class Config:
     # Rate limiting
     RATELIMIT_STORAGE_URL = 'memory://'
     
+    # Market data: candle generation engine
+    # ('seeded' deterministic, 'numpy' vectorized random, 'python' random loop)
+    MARKET_CANDLE_ENGINE = os.environ.get('MARKET_CANDLE_ENGINE', 'seeded')
+    # Price model per asset class/volatility label for the random-walk engines,
+    # e.g. "default=gbm,crypto=merton,stock:high=garch" (see app/services/price_models.py)
+    MARKET_PRICE_MODELS = os.environ.get('MARKET_PRICE_MODELS', 'default=legacy')
+    # Per-process candle cache memory cap in bytes (0 disables the cache)
+    MARKET_CACHE_MAX_BYTES = int(os.environ.get('MARKET_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    # Seeded prices co-move through sector factors and indices track their
+    # constituents (false = independent walks; use a fresh candle store dir when changing)
+    MARKET_CORRELATED_ASSETS = os.environ.get('MARKET_CORRELATED_ASSETS', 'true').lower() in ('true', '1', 'yes')
+    # Completed bars kept per symbol/timeframe in the rolling series
+    MARKET_SERIES_CAPACITY = int(os.environ.get('MARKET_SERIES_CAPACITY', 1000))
+    # Page size cap for /api/market/candles
+    MARKET_CANDLES_MAX_LIMIT = int(os.environ.get('MARKET_CANDLES_MAX_LIMIT', 1000))
+    # On-disk columnar candle history shared by all workers via mmap (unset = off)
+    MARKET_CANDLE_STORE_DIR = os.environ.get('MARKET_CANDLE_STORE_DIR')
+    # History backfilled the first time a symbol/timeframe is stored
+    MARKET_STORE_HISTORY_DAYS = int(os.environ.get('MARKET_STORE_HISTORY_DAYS', 3650))
+    # Memory-mapped quote board written by one producer process (gunicorn.conf.py)
+    # and read by every worker, e.g. /dev/shm/tradetutor-quotes (unset = off)
+    MARKET_SHARED_SNAPSHOT_PATH = os.environ.get('MARKET_SHARED_SNAPSHOT_PATH')
+    # SSE market stream: connections per worker process and heartbeat interval
+    MARKET_STREAM_MAX_CONNECTIONS = int(os.environ.get('MARKET_STREAM_MAX_CONNECTIONS', 8))
+    MARKET_STREAM_HEARTBEAT_SECONDS = int(os.environ.get('MARKET_STREAM_HEARTBEAT_SECONDS', 15))
+    # Market replay: longest replayable window (bars) and fastest virtual clock
+    MARKET_REPLAY_MAX_BARS = int(os.environ.get('MARKET_REPLAY_MAX_BARS', 20000))
+    MARKET_REPLAY_MAX_SPEED = float(os.environ.get('MARKET_REPLAY_MAX_SPEED', 100))
+    # Resting limit/stop orders and SL/TP exits matched every price tick by one
+    # process per host (the worker holding the lock file; the others stand by);
+    # books are rebuilt from the database at this interval
+    ORDER_MATCHING_ENABLED = os.environ.get('ORDER_MATCHING_ENABLED', 'true').lower() in ('true', '1', 'yes')
+    ORDER_MATCHING_RELOAD_SECONDS = int(os.environ.get('ORDER_MATCHING_RELOAD_SECONDS', 60))
+    ORDER_MATCHING_LOCK_PATH = os.environ.get('ORDER_MATCHING_LOCK_PATH')  # default: <tmp>/tradetutor-order-matching.lock
+    
     # Frontend URL for CORS
     FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
     
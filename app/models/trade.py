@@ -6,6 +6,9 @@ from decimal import Decimal
 
 class Trade(db.Model):
     __tablename__ = 'trades'
+    __table_args__ = (
+        db.Index('ix_trades_status_symbol', 'status', 'symbol'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
@@ -15,10 +18,12 @@ class Trade(db.Model):
     asset_class = db.Column(db.String(20))  # 'stock', 'crypto', 'forex'
     side = db.Column(db.String(10), nullable=False)  # 'buy' or 'sell'
     size = db.Column(db.Numeric(15, 8), nullable=False)
+    order_type = db.Column(db.String(10), nullable=False, default='market')  # 'market', 'limit', 'stop'
     
     # Pricing
     entry_price = db.Column(db.Numeric(15, 8), nullable=False)
     exit_price = db.Column(db.Numeric(15, 8))
+    trigger_price = db.Column(db.Numeric(15, 8))  # limit/stop price of a resting order
     
     # Risk management
     stop_loss = db.Column(db.Numeric(15, 8))
@@ -31,7 +36,8 @@ class Trade(db.Model):
     pnl = db.Column(db.Numeric(15, 2))
     
     # Status and timing
-    status = db.Column(db.String(20), default='open')  # 'open', 'closed'
+    status = db.Column(db.String(20), default='open')  # 'pending', 'open', 'closed', 'cancelled'
+    exit_reason = db.Column(db.String(20))  # 'manual', 'stop_loss', 'take_profit'
     entry_time = db.Column(db.DateTime, default=datetime.utcnow)
     exit_time = db.Column(db.DateTime)
     
@@ -50,6 +56,8 @@ class Trade(db.Model):
             'assetClass': self.asset_class,
             'side': self.side,
             'size': str(self.size),
+            'orderType': self.order_type,
+            'triggerPrice': str(self.trigger_price) if self.trigger_price else None,
             'entryPrice': str(self.entry_price),
             'exitPrice': str(self.exit_price) if self.exit_price else None,
             'stopLoss': str(self.stop_loss) if self.stop_loss else None,
@@ -59,6 +67,7 @@ class Trade(db.Model):
             'rrRatio': str(self.rr_ratio) if self.rr_ratio else None,
             'pnl': str(self.pnl) if self.pnl else None,
             'status': self.status,
+            'exitReason': self.exit_reason,
             'entryTime': self.entry_time.isoformat(),
             'exitTime': self.exit_time.isoformat() if self.exit_time else None,
             'score': self.score,
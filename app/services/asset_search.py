@@ -0,0 +1,202 @@
+"""Prebuilt asset search index - prefix tries, n-gram postings and typo tolerance.
+
+Results are ranked in tiers, each tier kept in universe order:
+
+0. exact symbol
+1. symbol prefix
+2. name/sector word prefix
+3. substring of symbol, name or sector
+4. one typo (insert, delete, substitute or transpose) away from the symbol
+   or a name/sector word
+
+Tiers are filled lazily from sorted postings and the search stops as soon as
+``limit`` results pass the class filter, so query cost depends on the query
+and ``limit`` rather than the size of the universe.
+"""
+import re
+from itertools import chain
+
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+# Postings are kept for n-grams up to this length; longer substrings
+# intersect trigram postings and verify
+_MAX_GRAM = 3
+
+# Field separator in haystacks; never matches a query
+_SEP = '\x1f'
+
+
+def _words(text):
+    return _WORD_RE.findall(text.lower())
+
+
+def _deletions(term):
+    """``term`` plus every variant with one character removed"""
+    return {term} | {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a, b):
+    """True if Damerau-Levenshtein distance (a, b) <= 1"""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diffs = [i for i in range(la) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        return (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]])
+    if la > lb:
+        a, b = b, a
+    # b is one longer: skipping one char of b must give a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+class _PrefixTrie:
+    """Character trie; every node holds the sorted ids of docs with a term under it"""
+
+    def __init__(self):
+        self._root = ({}, [])
+
+    def insert(self, term, doc_id):
+        node = self._root
+        for char in term:
+            children, ids = node
+            node = children.get(char)
+            if node is None:
+                node = children[char] = ({}, [])
+            if not node[1] or node[1][-1] != doc_id:
+                node[1].append(doc_id)
+
+    def find(self, prefix):
+        """Sorted doc ids with a term starting with ``prefix``"""
+        node = self._root
+        for char in prefix:
+            node = node[0].get(char)
+            if node is None:
+                return ()
+        return node[1]
+
+
+class AssetSearchIndex:
+    """Search index over a SymbolRegistry (or anything with ``by_category``)"""
+
+    def __init__(self, registry):
+        self._docs = []  # doc id -> (asset, category)
+        self._haystacks = []  # lowercase symbol, name and sector joined by _SEP
+        self._symbol_trie = _PrefixTrie()
+        self._word_trie = _PrefixTrie()
+        self._exact_symbol = {}
+        self._grams = {}  # n-gram -> sorted doc ids
+        self._typos = {}  # term with <=1 deletion -> {term: sorted doc ids}
+
+        for category, assets in registry.by_category.items():
+            for asset in assets:
+                self._add(len(self._docs), asset, category)
+                self._docs.append((asset, category))
+
+        self._gram_sets = {gram: frozenset(ids) for gram, ids in self._grams.items() if len(gram) == _MAX_GRAM}
+
+    def _add(self, doc_id, asset, category):
+        symbol = asset.symbol.lower()
+        haystack = _SEP.join((symbol, asset.name.lower(), asset.sector.lower()))
+        self._haystacks.append(haystack)
+
+        self._exact_symbol.setdefault(symbol, doc_id)
+        self._symbol_trie.insert(symbol, doc_id)
+
+        terms = {symbol}
+        for word in chain(_words(asset.name), _words(asset.sector)):
+            self._word_trie.insert(word, doc_id)
+            terms.add(word)
+
+        for n in range(1, _MAX_GRAM + 1):
+            for i in range(len(haystack) - n + 1):
+                gram = haystack[i:i + n]
+                if _SEP in gram:
+                    continue
+                ids = self._grams.setdefault(gram, [])
+                if not ids or ids[-1] != doc_id:
+                    ids.append(doc_id)
+
+        for term in terms:
+            for variant in _deletions(term):
+                ids = self._typos.setdefault(variant, {}).setdefault(term, [])
+                if not ids or ids[-1] != doc_id:
+                    ids.append(doc_id)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _matches_class(self, doc_id, asset_class):
+        if asset_class == 'all':
+            return True
+        asset, category = self._docs[doc_id]
+        return asset_class in (category, asset.asset_class)
+
+    def search(self, query='', asset_class='all', limit=10):
+        """Ranked asset info dicts; an empty query lists every asset in the class"""
+        query = (query or '').strip().lower()
+        asset_class = asset_class or 'all'
+
+        if not query:
+            return [asset.info for doc_id, (asset, _) in enumerate(self._docs)
+                    if self._matches_class(doc_id, asset_class)]
+
+        results = []
+        seen = set()
+        for doc_id in self._ranked_candidates(query):
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
+            if self._matches_class(doc_id, asset_class):
+                results.append(self._docs[doc_id][0].info)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _ranked_candidates(self, query):
+        """Doc ids in rank order (may repeat across tiers)"""
+        exact = self._exact_symbol.get(query)
+        if exact is not None:
+            yield exact
+        yield from self._symbol_trie.find(query)
+
+        words = _words(query)
+        if len(words) == 1:
+            yield from self._word_trie.find(words[0])
+
+        yield from self._substring(query)
+
+        if len(query) >= 3:
+            yield from self._fuzzy(query)
+
+    def _substring(self, query):
+        if len(query) <= _MAX_GRAM:
+            yield from self._grams.get(query, ())
+            return
+
+        # Drive from the rarest trigram, check the rest, then verify
+        trigrams = {query[i:i + _MAX_GRAM] for i in range(len(query) - _MAX_GRAM + 1)}
+        if any(gram not in self._gram_sets for gram in trigrams):
+            return
+        trigrams = sorted(trigrams, key=lambda gram: len(self._grams[gram]))
+        others = [self._gram_sets[gram] for gram in trigrams[1:]]
+        for doc_id in self._grams[trigrams[0]]:
+            if all(doc_id in ids for ids in others) and query in self._haystacks[doc_id]:
+                yield doc_id
+
+    def _fuzzy(self, query):
+        matches = {}
+        for variant in _deletions(query):
+            for term, ids in self._typos.get(variant, {}).items():
+                if term not in matches and _within_one_edit(query, term):
+                    matches[term] = ids
+        if matches:
+            yield from sorted(set(chain.from_iterable(matches.values())))
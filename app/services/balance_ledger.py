@@ -0,0 +1,79 @@
+"""Balance ledger - atomic changes to a portfolio's cash balance.
+
+Every change is a single UPDATE that does the arithmetic in the database
+(``balance = balance - :amount``) instead of a read-modify-write in Python,
+so concurrent requests of one user - other threads or other gunicorn
+workers - can't lose each other's updates. Debits are conditional on the
+funds (``WHERE balance >= :amount``) and report whether they happened.
+Amounts are never signed: signed settlements pick ``credit`` or ``charge``.
+
+The UPDATE takes the row lock on Postgres and the database write lock on
+SQLite, both held until the caller commits: the balance change and the
+trade rows it pays for commit (or roll back) together.
+"""
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+
+from sqlalchemy import update
+
+from app.extensions import db
+from app.models.portfolio import Portfolio
+
+
+CENT = Decimal('0.01')
+
+
+def cents(amount):
+    """``amount`` rounded to the balance's precision"""
+    return Decimal(amount).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def debit(user_id, amount):
+    """Take ``amount`` (> 0) from the balance if it covers it; returns False (and changes nothing) if not"""
+    amount = cents(amount)
+    if amount <= 0:
+        raise ValueError(f'Debit amount must be positive, got {amount}')
+    return db.session.execute(
+        update(Portfolio)
+        .where(Portfolio.user_id == user_id, Portfolio.balance >= amount)
+        .values(balance=Portfolio.balance - amount, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount == 1
+
+
+def credit(user_id, amount):
+    """Add ``amount`` (>= 0) to the balance"""
+    amount = cents(amount)
+    if amount < 0:
+        raise ValueError(f'Credit amount must not be negative, got {amount}')
+    _add(user_id, amount)
+
+
+def charge(user_id, amount):
+    """Take ``amount`` (>= 0) from the balance even if that overdraws it - for realized losses"""
+    amount = cents(amount)
+    if amount < 0:
+        raise ValueError(f'Charge amount must not be negative, got {amount}')
+    _add(user_id, -amount)
+
+
+def settle(user_id, amount):
+    """Book a signed settlement: a credit when ``amount`` >= 0, otherwise a charge"""
+    if amount >= 0:
+        credit(user_id, amount)
+    else:
+        charge(user_id, -amount)
+
+
+def _add(user_id, amount):
+    db.session.execute(
+        update(Portfolio)
+        .where(Portfolio.user_id == user_id)
+        .values(balance=Portfolio.balance + amount, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def balance(user_id):
+    """Current balance straight from the database (not a possibly stale ORM copy)"""
+    return db.session.query(Portfolio.balance).filter_by(user_id=user_id).scalar()
@@ -0,0 +1,92 @@
+"""Rolling candle series - fixed-size ring buffer of completed bars"""
+import numpy as np
+
+
+COLUMNS = ('time', 'open', 'high', 'low', 'close', 'volume')
+
+
+class CandleSeries:
+    """Last ``capacity`` completed bars of one symbol/timeframe.
+
+    Bars are stored column-wise in preallocated arrays. ``advance`` only
+    generates the bars between the newest stored bucket and the target
+    bucket, so rolling forward one bucket costs one bar instead of a full
+    history rebuild. An attached ``indicators`` object (e.g.
+    ``indicators.IndicatorSet``) is fed every appended bar, so its state
+    stays in step with the buffer.
+    """
+
+    def __init__(self, capacity, generate, indicators=None):
+        """
+        Args:
+            capacity: number of bars kept
+            generate: callable(first_bucket, last_bucket) -> dict of OHLCV arrays
+            indicators: optional object with reset() and update_many(bars)
+        """
+        self.capacity = capacity
+        self._generate = generate
+        self.indicators = indicators
+        self._columns = {
+            'time': np.zeros(capacity, dtype=np.int64),
+            'open': np.zeros(capacity),
+            'high': np.zeros(capacity),
+            'low': np.zeros(capacity),
+            'close': np.zeros(capacity),
+            'volume': np.zeros(capacity, dtype=np.int64),
+        }
+        self._head = 0  # next write position
+        self._count = 0
+        self.last_bucket = None
+
+    def __len__(self):
+        return self._count
+
+    def advance(self, to_bucket):
+        """Append bars up to and including ``to_bucket``; returns bars added"""
+        if self.last_bucket is not None and to_bucket <= self.last_bucket:
+            return 0
+
+        first = to_bucket - self.capacity + 1
+        if self.last_bucket is not None:
+            first = max(first, self.last_bucket + 1)
+        self._append(self._generate(first, to_bucket))
+        self.last_bucket = to_bucket
+        return to_bucket - first + 1
+
+    def _append(self, bars):
+        n = len(bars['time'])
+        if self.indicators is not None:
+            if n >= self.capacity:
+                # Gap wider than the buffer: restart from the retained window
+                self.indicators.reset()
+                self.indicators.update_many({name: bars[name][-self.capacity:] for name in COLUMNS})
+            else:
+                self.indicators.update_many(bars)
+        if n >= self.capacity:
+            for name in COLUMNS:
+                self._columns[name][:] = bars[name][-self.capacity:]
+            self._head = 0
+            self._count = self.capacity
+            return
+
+        positions = (self._head + np.arange(n)) % self.capacity
+        for name in COLUMNS:
+            self._columns[name][positions] = bars[name]
+        self._head = (self._head + n) % self.capacity
+        self._count = min(self.capacity, self._count + n)
+
+    def window(self, first_bucket, last_bucket):
+        """Bars for an inclusive bucket range, or None if it isn't fully held"""
+        if self.last_bucket is None or last_bucket > self.last_bucket \
+                or first_bucket <= self.last_bucket - self._count or first_bucket > last_bucket:
+            return None
+        skip = self.last_bucket - last_bucket
+        n = last_bucket - first_bucket + 1
+        positions = (self._head - skip - n + np.arange(n)) % self.capacity
+        return {name: self._columns[name][positions] for name in COLUMNS}
+
+    def tail(self, n):
+        """Newest ``n`` bars (oldest first) as a dict of arrays"""
+        n = max(0, min(n, self._count))
+        positions = (self._head - n + np.arange(n)) % self.capacity
+        return {name: self._columns[name][positions] for name in COLUMNS}
@@ -0,0 +1,140 @@
+"""Columnar candle store - fixed-width binary history files, memory-mapped for reads.
+
+One file per symbol/timeframe (``<root>/<SYMBOL>/<timeframe>.bars``): a
+16-byte header followed by 48-byte records (int64 time, float64 open, high,
+low, close, int64 volume), sorted by time. Readers map the file read-only,
+so every worker on the host shares the same page-cache pages instead of
+holding its own copy. Appends take an exclusive ``flock`` and only write bars
+newer than the last stored one, which makes concurrent appends of the same
+(deterministic) bars from several workers safe.
+"""
+import os
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows dev servers: single process, no cross-worker locking
+    fcntl = None
+
+from app.services.candle_series import COLUMNS
+
+
+RECORD = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<i8'),
+])
+
+MAGIC = b'TTBARS01'
+HEADER = np.dtype([('magic', 'S8'), ('record_size', '<u4'), ('reserved', '<u4')])
+
+
+class CandleStore:
+    """Append-only OHLCV history files with binary-search range reads"""
+
+    def __init__(self, root):
+        self.root = root
+        self._maps = {}  # (symbol, timeframe) -> (file size, memmap or None)
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        # Map whatever history is already on disk up front
+        for symbol in os.listdir(root):
+            directory = os.path.join(root, symbol)
+            if os.path.isdir(directory):
+                for name in os.listdir(directory):
+                    if name.endswith('.bars'):
+                        self._records(symbol, name[:-len('.bars')])
+
+    def _path(self, symbol, timeframe):
+        return os.path.join(self.root, symbol.upper(), f'{timeframe}.bars')
+
+    def _records(self, symbol, timeframe):
+        """Read-only record array for a series (remapped when the file grew)"""
+        key = (symbol.upper(), timeframe)
+        path = self._path(symbol, timeframe)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+
+        cached = self._maps.get(key)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+
+        with self._lock:
+            count = (size - HEADER.itemsize) // RECORD.itemsize
+            records = None
+            if count > 0:
+                header = np.fromfile(path, dtype=HEADER, count=1)[0]
+                if header['magic'] != MAGIC or header['record_size'] != RECORD.itemsize:
+                    raise ValueError(f'{path} is not a candle store file')
+                records = np.memmap(path, dtype=RECORD, mode='r', offset=HEADER.itemsize, shape=(count,))
+            self._maps[key] = (size, records)
+        return records
+
+    def count(self, symbol, timeframe):
+        records = self._records(symbol, timeframe)
+        return 0 if records is None else len(records)
+
+    def time_range(self, symbol, timeframe):
+        """(first, last) stored bar time, or None when the series is empty"""
+        records = self._records(symbol, timeframe)
+        if records is None:
+            return None
+        return int(records['time'][0]), int(records['time'][-1])
+
+    def append(self, symbol, timeframe, bars):
+        """Append OHLCV arrays (sorted by time); bars at or before the last stored time are skipped.
+
+        Returns the number of bars written.
+        """
+        path = self._path(symbol, timeframe)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'ab+') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                size = f.seek(0, os.SEEK_END)
+                if size < HEADER.itemsize:
+                    f.truncate(0)
+                    f.write(np.array([(MAGIC, RECORD.itemsize, 0)], dtype=HEADER).tobytes())
+                    size = HEADER.itemsize
+                size -= (size - HEADER.itemsize) % RECORD.itemsize  # drop a torn trailing record
+                f.truncate(size)
+
+                times = np.asarray(bars['time'], dtype=np.int64)
+                if size > HEADER.itemsize:
+                    f.seek(size - RECORD.itemsize)
+                    last_time = int(np.frombuffer(f.read(RECORD.itemsize), dtype=RECORD)['time'][0])
+                    start = int(np.searchsorted(times, last_time, side='right'))
+                else:
+                    start = 0
+                if start >= times.size:
+                    return 0
+
+                records = np.empty(times.size - start, dtype=RECORD)
+                for name in COLUMNS:
+                    records[name] = bars[name][start:]
+                f.seek(size)
+                f.write(records.tobytes())
+                f.flush()
+                return len(records)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def read_range(self, symbol, timeframe, start_ms=None, end_ms=None):
+        """Bars with start_ms <= time < end_ms as a dict of column arrays (copies)"""
+        records = self._records(symbol, timeframe)
+        if records is None:
+            return {name: np.empty(0, dtype=RECORD[name]) for name in COLUMNS}
+        times = records['time']
+        lo = 0 if start_ms is None else int(np.searchsorted(times, start_ms, side='left'))
+        hi = len(times) if end_ms is None else int(np.searchsorted(times, end_ms, side='left'))
+        window = np.array(records[lo:max(lo, hi)])
+        return {name: window[name] for name in COLUMNS}
@@ -0,0 +1,85 @@
+"""Conditional GET - ETag / Last-Modified revalidation for polled read endpoints.
+
+Views decorated with ``conditional(version)`` get a cheap version callback
+that runs before the view. When the client's ``If-None-Match`` (or, without
+one, ``If-Modified-Since``) still matches, a bodiless 304 is returned and the
+view - query, candle generation, serialization - never runs. Otherwise the
+view's response is tagged so the next poll can revalidate.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, current_app, request
+from flask_login import current_user
+
+
+def _etag(token):
+    """Weak ETag for a version token in the context of this request.
+
+    The URL (query string), Accept header and user are folded in, so pages,
+    wire formats and per-user views of the same version get distinct tags.
+    """
+    user = current_user.get_id() if current_user.is_authenticated else ''
+    variant = '\n'.join((request.full_path, request.headers.get('Accept', ''), user or '', str(token)))
+    return hashlib.blake2b(variant.encode(), digest_size=12).hexdigest()
+
+
+def _http_time(modified):
+    """Naive-UTC datetime or epoch ms -> aware datetime truncated to HTTP's one-second resolution"""
+    if modified is None:
+        return None
+    if isinstance(modified, datetime):
+        modified = modified if modified.tzinfo else modified.replace(tzinfo=timezone.utc)
+    else:
+        modified = datetime.fromtimestamp(modified / 1000, tz=timezone.utc)
+    return modified.replace(microsecond=0)
+
+
+def _not_modified(etag, modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if modified is not None and request.if_modified_since is not None:
+        return modified <= request.if_modified_since
+    return False
+
+
+def _tag(response, etag, modified):
+    response.set_etag(etag, weak=True)
+    if modified is not None:
+        response.last_modified = modified
+    response.cache_control.no_cache = True
+    if current_user.is_authenticated:
+        response.cache_control.private = True
+    response.vary.add('Accept')
+    return response
+
+
+def conditional(version):
+    """Decorator: revalidate against ``version(*view_args)`` before running the view.
+
+    ``version`` takes the view's arguments and returns ``(token, last_modified)``
+    - token any str()-able value that changes whenever the body would,
+    last_modified a naive-UTC datetime, epoch ms or None - or None to skip
+    revalidation for this request. Only successful GET/HEAD responses are tagged.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+            current = version(*args, **kwargs)
+            if current is None:
+                return view(*args, **kwargs)
+
+            token, modified = current
+            etag, modified = _etag(token), _http_time(modified)
+            if _not_modified(etag, modified):
+                return _tag(Response(status=304), etag, modified)
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                _tag(response, etag, modified)
+            return response
+        return wrapper
+    return decorator
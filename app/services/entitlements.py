@@ -1,6 +1,7 @@
 """Entitlements and tier enforcement service"""
 from datetime import datetime
 from typing import Dict, Any
+from app.services.symbols import registry
 
 
 # Tier configuration - single source of truth
@@ -63,6 +64,19 @@ TIER_CONFIG = {
 }
 
 
+# Uppercase symbol sets per tier for O(1) membership checks (None = all assets)
+TIER_ALLOWED_SYMBOLS = {
+    tier: None if cfg['assets_allowed'] == 'all' else registry.symbol_set(cfg['assets_allowed'])
+    for tier, cfg in TIER_CONFIG.items()
+}
+
+
+def is_asset_allowed(tier: str, symbol: str) -> bool:
+    """Check whether a tier may trade a symbol (case-insensitive)"""
+    allowed = TIER_ALLOWED_SYMBOLS.get(tier, TIER_ALLOWED_SYMBOLS['free'])
+    return allowed is None or symbol.upper() in allowed
+
+
 def get_user_entitlements(user) -> Dict[str, Any]:
     """
     Get user entitlements based on their tier and expiration.
@@ -98,10 +112,7 @@ def get_user_entitlements(user) -> Dict[str, Any]:
         
         # Asset access
         'assets_allowed': tier_config['assets_allowed'],
-        'can_access_asset': lambda symbol: (
-            tier_config['assets_allowed'] == 'all' or 
-            symbol in tier_config['assets_allowed']
-        ) if isinstance(tier_config['assets_allowed'], list) else True,
+        'can_access_asset': lambda symbol: is_asset_allowed(current_tier, symbol),
         
         # Learning
         'lessons_access': tier_config['lessons_access'],
@@ -125,12 +136,7 @@ def get_user_entitlements(user) -> Dict[str, Any]:
 def can_access_asset(user, symbol: str) -> bool:
     """Check if user can access a specific asset"""
     entitlements = get_user_entitlements(user)
-    assets_allowed = entitlements['assets_allowed']
-    
-    if assets_allowed == 'all':
-        return True
-    
-    return symbol in assets_allowed
+    return is_asset_allowed(entitlements['tier'], symbol)
 
 
 def can_access_lesson(user, lesson_order: int) -> bool:
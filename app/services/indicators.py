@@ -0,0 +1,368 @@
+"""Technical indicators - vectorized batch functions and O(1) incremental calculators.
+
+Batch functions take full NumPy arrays and return arrays aligned to the
+input (NaN until the indicator has enough data). Incremental calculators
+keep running state so each new bar is an O(1) ``update``; ``peek`` returns
+the value a bar would produce without committing it (used for the bar that
+is still forming). Both give the same numbers for the same input.
+
+Smoothing conventions:
+- EMA: alpha = 2 / (period + 1), seeded with the SMA of the first ``period`` values
+- Wilder (RSI, ATR): alpha = 1 / period, seeded the same way
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+
+# ---------------------------------------------------------------------------
+# Batch API
+# ---------------------------------------------------------------------------
+
+def _smooth(values, alpha, start, seed):
+    """y[start] = seed, then y[t] = (1 - alpha) * y[t-1] + alpha * x[t].
+
+    The recursion is evaluated in blocks with a closed form (cumulative sum of
+    x scaled by powers of 1 - alpha), keeping every power within float range.
+    """
+    out = np.full(values.shape, np.nan)
+    n = values.size
+    if start >= n:
+        return out
+    out[start] = seed
+    decay = 1.0 - alpha
+    if decay <= 0:
+        out[start + 1:] = values[start + 1:]
+        return out
+
+    block = max(1, int(27.0 / -math.log(decay)))  # decay ** -block <= ~1e12
+    y = seed
+    t = start + 1
+    while t < n:
+        x = values[t:t + block]
+        powers = decay ** np.arange(1, x.size + 1)
+        segment = powers * (y + alpha * np.cumsum(x / powers))
+        out[t:t + x.size] = segment
+        y = segment[-1]
+        t += x.size
+    return out
+
+
+def sma(values, period):
+    """Simple moving average"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if values.size < period:
+        return out
+    sums = np.cumsum(values)
+    out[period - 1] = sums[period - 1]
+    out[period:] = sums[period:] - sums[:-period]
+    out[period - 1:] /= period
+    return out
+
+
+def ema(values, period):
+    """Exponential moving average"""
+    values = np.asarray(values, dtype=np.float64)
+    if values.size < period:
+        return np.full(values.shape, np.nan)
+    return _smooth(values, 2.0 / (period + 1), period - 1, values[:period].mean())
+
+
+def _wilder(values, period, start):
+    """Wilder smoothing of values[start:], seeded with their first ``period`` mean"""
+    if values.size - start < period:
+        return np.full(values.shape, np.nan)
+    seed_end = start + period
+    return _smooth(values, 1.0 / period, seed_end - 1, values[start:seed_end].mean())
+
+
+def rsi(values, period=14):
+    """Wilder-smoothed Relative Strength Index"""
+    values = np.asarray(values, dtype=np.float64)
+    changes = np.zeros(values.shape)
+    changes[1:] = np.diff(values)
+    avg_gain = _wilder(np.maximum(changes, 0.0), period, 1)
+    avg_loss = _wilder(np.maximum(-changes, 0.0), period, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    out[avg_loss == 0] = 100.0
+    out[np.isnan(avg_loss)] = np.nan
+    return out
+
+
+def macd(values, fast=12, slow=26, signal=9):
+    """MACD line, signal line and histogram"""
+    values = np.asarray(values, dtype=np.float64)
+    line = ema(values, fast) - ema(values, slow)
+    signal_line = np.full(values.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(line))
+    if valid.size >= signal:
+        signal_line[valid[0]:] = ema(line[valid[0]:], signal)
+    return line, signal_line, line - signal_line
+
+
+def true_range(high, low, close):
+    """True range per bar (first bar uses high - low)"""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    tr = high - low
+    if tr.size > 1:
+        prev = close[:-1]
+        tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(high[1:] - prev), np.abs(low[1:] - prev)))
+    return tr
+
+
+def atr(high, low, close, period=14):
+    """Wilder-smoothed Average True Range"""
+    return _wilder(true_range(high, low, close), period, 0)
+
+
+def bollinger(values, period=20, num_std=2.0):
+    """Bollinger bands: (middle, upper, lower) with population std dev"""
+    values = np.asarray(values, dtype=np.float64)
+    middle = sma(values, period)
+    if values.size < period:
+        return middle, middle.copy(), middle.copy()
+    # Center on the first value to limit cancellation in the sum of squares
+    centered = values - values[0]
+    mean_sq = sma(centered * centered, period)
+    mean_c = middle - values[0]
+    std = np.sqrt(np.maximum(mean_sq - mean_c * mean_c, 0.0))
+    return middle, middle + num_std * std, middle - num_std * std
+
+
+# ---------------------------------------------------------------------------
+# Incremental API
+# ---------------------------------------------------------------------------
+
+class SMA:
+    """Simple moving average over a sliding window"""
+
+    def __init__(self, period):
+        self.period = period
+        self._window = deque(maxlen=period)
+        self._total = 0.0
+        self.value = None
+
+    def update(self, x):
+        if len(self._window) == self.period:
+            self._total -= self._window[0]
+        self._window.append(x)
+        self._total += x
+        if len(self._window) == self.period:
+            self.value = self._total / self.period
+        return self.value
+
+    def peek(self, x):
+        if len(self._window) == self.period:
+            return (self._total - self._window[0] + x) / self.period
+        if len(self._window) == self.period - 1:
+            return (self._total + x) / self.period
+        return None
+
+
+class _Smoother:
+    """Exponential smoothing seeded with the mean of the first ``period`` inputs"""
+
+    def __init__(self, period, alpha):
+        self.period = period
+        self.alpha = alpha
+        self._count = 0
+        self._seed_total = 0.0
+        self.value = None
+
+    def update(self, x):
+        self.value = self.peek(x)
+        self._count += 1
+        if self.value is None:
+            self._seed_total += x
+        return self.value
+
+    def peek(self, x):
+        if self.value is not None:
+            return (1.0 - self.alpha) * self.value + self.alpha * x
+        if self._count + 1 == self.period:
+            return (self._seed_total + x) / self.period
+        return None
+
+
+class EMA(_Smoother):
+    """Exponential moving average"""
+
+    def __init__(self, period):
+        super().__init__(period, 2.0 / (period + 1))
+
+
+class Wilder(_Smoother):
+    """Wilder's smoothing (alpha = 1 / period)"""
+
+    def __init__(self, period):
+        super().__init__(period, 1.0 / period)
+
+
+class RSI:
+    """Wilder-smoothed Relative Strength Index"""
+
+    def __init__(self, period=14):
+        self._gain = Wilder(period)
+        self._loss = Wilder(period)
+        self._prev = None
+        self.value = None
+
+    @staticmethod
+    def _rsi(avg_gain, avg_loss):
+        if avg_gain is None or avg_loss is None:
+            return None
+        if avg_loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    def update(self, close):
+        if self._prev is not None:
+            change = close - self._prev
+            self.value = self._rsi(self._gain.update(max(change, 0.0)), self._loss.update(max(-change, 0.0)))
+        self._prev = close
+        return self.value
+
+    def peek(self, close):
+        if self._prev is None:
+            return None
+        change = close - self._prev
+        return self._rsi(self._gain.peek(max(change, 0.0)), self._loss.peek(max(-change, 0.0)))
+
+
+class MACD:
+    """MACD line, signal line and histogram"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self._fast = EMA(fast)
+        self._slow = EMA(slow)
+        self._signal = EMA(signal)
+        self.value = (None, None, None)
+
+    @staticmethod
+    def _combine(fast, slow, signal_peek):
+        if fast is None or slow is None:
+            return None, None, None
+        line = fast - slow
+        signal = signal_peek(line)
+        return line, signal, (line - signal) if signal is not None else None
+
+    def update(self, close):
+        self.value = self._combine(self._fast.update(close), self._slow.update(close), self._signal.update)
+        return self.value
+
+    def peek(self, close):
+        return self._combine(self._fast.peek(close), self._slow.peek(close), self._signal.peek)
+
+
+class ATR:
+    """Wilder-smoothed Average True Range"""
+
+    def __init__(self, period=14):
+        self._smoother = Wilder(period)
+        self._prev_close = None
+        self.value = None
+
+    def _true_range(self, high, low):
+        if self._prev_close is None:
+            return high - low
+        return max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+
+    def update(self, high, low, close):
+        self.value = self._smoother.update(self._true_range(high, low))
+        self._prev_close = close
+        return self.value
+
+    def peek(self, high, low, close):
+        return self._smoother.peek(self._true_range(high, low))
+
+
+class Bollinger:
+    """Bollinger bands over a sliding window: (middle, upper, lower)"""
+
+    def __init__(self, period=20, num_std=2.0):
+        self.period = period
+        self.num_std = num_std
+        self._window = deque(maxlen=period)
+        self._anchor = None  # running sums are kept relative to this to limit cancellation
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self.value = (None, None, None)
+
+    def _bands(self, anchor, x):
+        """Bands for the window with ``x`` appended"""
+        d = x - anchor
+        total, total_sq = self._sum + d, self._sum_sq + d * d
+        if len(self._window) == self.period:
+            old = self._window[0] - anchor
+            total, total_sq = total - old, total_sq - old * old
+        mean = total / self.period
+        spread = self.num_std * math.sqrt(max(total_sq / self.period - mean * mean, 0.0))
+        middle = anchor + mean
+        return (middle, middle + spread, middle - spread), total, total_sq
+
+    def update(self, close):
+        if self._anchor is None:
+            self._anchor = close
+        bands, self._sum, self._sum_sq = self._bands(self._anchor, close)
+        self._window.append(close)
+        if len(self._window) == self.period:
+            self.value = bands
+        return self.value
+
+    def peek(self, close):
+        if len(self._window) < self.period - 1:
+            return None, None, None
+        anchor = self._anchor if self._anchor is not None else close
+        return self._bands(anchor, close)[0]
+
+
+class IndicatorSet:
+    """The indicators RTT coaching uses, fed bar by bar"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.rsi = RSI(14)
+        self.ma9 = SMA(9)
+        self.ma21 = SMA(21)
+        self.macd = MACD()
+        self.atr = ATR(14)
+        self.bollinger = Bollinger(20)
+        self.bars = 0
+
+    def update(self, high, low, close):
+        self.rsi.update(close)
+        self.ma9.update(close)
+        self.ma21.update(close)
+        self.macd.update(close)
+        self.atr.update(high, low, close)
+        self.bollinger.update(close)
+        self.bars += 1
+
+    def update_many(self, bars):
+        """Feed a dict of OHLCV arrays (oldest first)"""
+        for high, low, close in zip(bars['high'].tolist(), bars['low'].tolist(), bars['close'].tolist()):
+            self.update(high, low, close)
+
+    def peek(self, high, low, close):
+        """Indicator values if a bar with these prices were appended"""
+        macd_line, macd_signal, macd_hist = self.macd.peek(close)
+        bb_mid, bb_upper, bb_lower = self.bollinger.peek(close)
+        return {
+            'rsi': self.rsi.peek(close),
+            'ma9': self.ma9.peek(close),
+            'ma21': self.ma21.peek(close),
+            'macd': macd_line,
+            'macd_signal': macd_signal,
+            'macd_hist': macd_hist,
+            'atr': self.atr.peek(high, low, close),
+            'bb_middle': bb_mid,
+            'bb_upper': bb_upper,
+            'bb_lower': bb_lower,
+        }
@@ -0,0 +1,84 @@
+"""Per-process market data cache - bounded LRU with per-entry expiry"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class MarketCache:
+    """LRU cache with a memory cap, per-entry expiry and hit/miss counters.
+
+    Entries carry an absolute expiry (epoch ms), normally the end of the
+    timeframe bucket they were computed for, so they invalidate themselves at
+    bucket boundaries. Sizes are caller-supplied estimates in bytes; the least
+    recently used entries are evicted once the total exceeds ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, expires_at_ms, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def get(self, key, now_ms=None):
+        """Return the cached value or None if missing/expired"""
+        if not self.enabled:
+            return None
+        now_ms = now_ms if now_ms is not None else time.time() * 1000
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at, size = entry
+            if expires_at <= now_ms:
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, expires_at_ms, size):
+        """Store a value until ``expires_at_ms``, evicting LRU entries as needed"""
+        if not self.enabled or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (value, expires_at_ms, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
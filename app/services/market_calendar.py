@@ -0,0 +1,320 @@
+"""Market session calendar - precomputed session and volatility-regime boundaries.
+
+Session open/close times (New York exchange hours with NYSE holidays and
+early closes) and the time-of-day volatility regime edges are computed once
+for a rolling window of days and stored as sorted epoch-ms arrays. Queries
+are binary searches: ``bisect`` on plain lists for a single timestamp (no
+allocation) and ``np.searchsorted`` for candle arrays. Timestamps outside the
+window fall back to direct DST arithmetic.
+"""
+import bisect
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+
+_MINUTE_MS = 60 * 1000
+_HOUR_MS = 60 * _MINUTE_MS
+_DAY_MS = 24 * _HOUR_MS
+
+# Regular stock/index session in New York local time (9:30 AM - 4:00 PM)
+MARKET_OPEN_MINUTES = 9 * 60 + 30
+MARKET_CLOSE_MINUTES = 16 * 60
+EARLY_CLOSE_MINUTES = 13 * 60
+
+# Time-of-day volatility: local hour edges and the multiplier after each edge
+# (9-11 open rush, 11-13 lunch lull, 15-17 close, otherwise normal)
+_REGIME_HOURS = (9, 11, 13, 15, 17)
+_REGIME_VALUES = (1.0, 1.5, 0.7, 1.0, 1.4)  # indexed by edges passed % 5
+
+
+def _us_dst_bounds_ms(year):
+    """Return (start, end) epoch ms of US daylight saving time for a year.
+
+    DST starts the 2nd Sunday of March at 2:00 EST (07:00 UTC) and ends the
+    1st Sunday of November at 2:00 EDT (06:00 UTC).
+    """
+    march_first = np.datetime64(f'{year}-03-01', 'D')
+    nov_first = np.datetime64(f'{year}-11-01', 'D')
+    # 1970-01-01 was a Thursday; numpy weekday: Monday=0 .. Sunday=6
+    march_dow = (march_first.astype('int64') + 3) % 7
+    nov_dow = (nov_first.astype('int64') + 3) % 7
+    second_sunday = march_first.astype('int64') + (6 - march_dow) % 7 + 7
+    first_sunday = nov_first.astype('int64') + (6 - nov_dow) % 7
+    return second_sunday * _DAY_MS + 7 * _HOUR_MS, first_sunday * _DAY_MS + 6 * _HOUR_MS
+
+
+def new_york_offsets(times_ms):
+    """Vectorized UTC offset (ms, negative) of New York for an array of epoch ms"""
+    times_ms = np.asarray(times_ms, dtype=np.int64)
+    offset = np.full(times_ms.shape, -5 * _HOUR_MS, dtype=np.int64)
+    if times_ms.size:
+        first_year = int(str(times_ms.min().astype('datetime64[ms]').astype('datetime64[Y]')))
+        last_year = int(str(times_ms.max().astype('datetime64[ms]').astype('datetime64[Y]')))
+        for year in range(first_year, last_year + 1):
+            start, end = _us_dst_bounds_ms(year)
+            offset[(times_ms >= start) & (times_ms < end)] = -4 * _HOUR_MS
+    return offset
+
+
+def new_york_hours(times_ms):
+    """Vectorized New York local hour (0-23) for an array of epoch ms"""
+    times_ms = np.asarray(times_ms, dtype=np.int64)
+    return ((times_ms + new_york_offsets(times_ms)) // _HOUR_MS) % 24
+
+
+def _easter(year):
+    """Gregorian Easter Sunday (anonymous algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """n-th (1-based, -1 = last) weekday (Monday=0) of a month"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year, month + 1, 1) - timedelta(days=1) if month < 12 else date(year, 12, 31)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day):
+    """Saturday holidays are observed Friday, Sunday holidays Monday"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def exchange_holidays(year):
+    """NYSE full-day closures: {date: name}"""
+    holidays = {
+        _nth_weekday(year, 1, 0, 3): 'Martin Luther King Jr. Day',
+        _nth_weekday(year, 2, 0, 3): "Presidents' Day",
+        _easter(year) - timedelta(days=2): 'Good Friday',
+        _nth_weekday(year, 5, 0, -1): 'Memorial Day',
+        _observed(date(year, 7, 4)): 'Independence Day',
+        _nth_weekday(year, 9, 0, 1): 'Labor Day',
+        _nth_weekday(year, 11, 3, 4): 'Thanksgiving',
+        _observed(date(year, 12, 25)): 'Christmas',
+    }
+    # New Year's Day falling on a Saturday is not observed on Dec 31
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays[_observed(new_year)] = "New Year's Day"
+    if year >= 2022:
+        holidays[_observed(date(year, 6, 19))] = 'Juneteenth'
+    return holidays
+
+
+def early_closes(year, holidays):
+    """NYSE 1:00 PM closes: July 3, the day after Thanksgiving and Christmas Eve"""
+    days = {
+        date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),
+        date(year, 12, 24),
+    }
+    return {day for day in days if day.weekday() < 5 and day not in holidays}
+
+
+class MarketCalendar:
+    """Session boundaries and volatility regimes for a rolling window of days.
+
+    The window is rebuilt (and swapped in atomically) when a query lands
+    within ``margin_days`` of its end, so a long-running process keeps rolling
+    forward without per-call datetime math.
+    """
+
+    def __init__(self, days_back=800, days_ahead=400, margin_days=7, now_ms=None):
+        self.days_back = days_back
+        self.days_ahead = days_ahead
+        self.margin_days = margin_days
+        self._lock = threading.Lock()
+        self._window = None
+        self._build(now_ms if now_ms is not None else time.time() * 1000)
+
+    def _build(self, center_ms):
+        first_day = int(center_ms // _DAY_MS) - self.days_back
+        last_day = int(center_ms // _DAY_MS) + self.days_ahead
+        days = np.arange(first_day, last_day + 1, dtype=np.int64)
+        # DST switches at 2 AM local: the 05:00 UTC offset holds at local
+        # midnight, the 17:00 UTC one for every session hour
+        midnights = days * _DAY_MS - new_york_offsets(days * _DAY_MS + 5 * _HOUR_MS)
+        daytime = days * _DAY_MS - new_york_offsets(days * _DAY_MS + 17 * _HOUR_MS)  # + local ms of day
+        weekdays = (days + 3) % 7  # Monday=0
+
+        regime_edges = (daytime[:, None] + np.array(_REGIME_HOURS, dtype=np.int64) * _HOUR_MS).ravel()
+
+        years = range(int(str(days[0].astype('datetime64[D]'))[:4]),
+                      int(str(days[-1].astype('datetime64[D]'))[:4]) + 1)
+        holidays, half_days, dst_edges = {}, set(), []
+        for year in years:
+            dst_edges.extend(int(edge) for edge in _us_dst_bounds_ms(year))
+            year_holidays = exchange_holidays(year)
+            holidays.update(year_holidays)
+            half_days |= early_closes(year, year_holidays)
+
+        stock_open, stock_close, closures = [], [], {}
+        forex_open, forex_close = [], []
+        epoch = date(1970, 1, 1)
+        for day, midnight, day_base, weekday in zip(
+                days.tolist(), midnights.tolist(), daytime.tolist(), weekdays.tolist()):
+            if weekday >= 5:
+                continue
+            # Forex trades Monday 00:00 - Saturday 00:00 New York time as one session
+            if forex_close and forex_close[-1] == midnight:
+                forex_close[-1] = midnight + _DAY_MS
+            else:
+                forex_open.append(midnight)
+                forex_close.append(midnight + _DAY_MS)
+
+            local_date = epoch + timedelta(days=day)
+            if local_date in holidays:
+                closures[day] = holidays[local_date]
+                continue
+            close_minutes = EARLY_CLOSE_MINUTES if local_date in half_days else MARKET_CLOSE_MINUTES
+            stock_open.append(day_base + MARKET_OPEN_MINUTES * _MINUTE_MS)
+            stock_close.append(day_base + close_minutes * _MINUTE_MS)
+
+        self._window = {
+            'start': int(midnights[0]),
+            'end': int(midnights[-1] + _DAY_MS),
+            'regime_edges': regime_edges,
+            'regime_values': np.array(_REGIME_VALUES),
+            'regime_edges_list': regime_edges.tolist(),
+            'dst_edges': dst_edges,  # alternating DST start/end epoch ms
+            'closures': closures,
+            'sessions': {
+                'stock': (stock_open, stock_close),
+                'index': (stock_open, stock_close),
+                'forex': (forex_open, forex_close),
+            },
+        }
+
+    def _window_for(self, time_ms):
+        window = self._window
+        if not window['start'] <= time_ms < window['end'] - self.margin_days * _DAY_MS:
+            with self._lock:
+                window = self._window
+                if not window['start'] <= time_ms < window['end'] - self.margin_days * _DAY_MS:
+                    self._build(time_ms)
+                    window = self._window
+        return window
+
+    # -- time of day ------------------------------------------------------
+
+    def time_of_day_volatility(self, times_ms):
+        """Vectorized time-of-day volatility multiplier for epoch-ms times"""
+        times_ms = np.asarray(times_ms, dtype=np.int64)
+        window = self._window_for(time.time() * 1000)
+        edges, values = window['regime_edges'], window['regime_values']
+        tod = values[np.searchsorted(edges, times_ms, side='right') % len(values)]
+
+        outside = (times_ms < window['start']) | (times_ms >= window['end'])
+        if outside.any():
+            hours = new_york_hours(times_ms[outside])
+            fallback = np.ones(hours.shape, dtype=np.float64)
+            fallback[(hours >= 9) & (hours < 11)] = 1.5
+            fallback[(hours >= 11) & (hours < 13)] = 0.7
+            fallback[(hours >= 15) & (hours < 17)] = 1.4
+            tod[outside] = fallback
+        return tod
+
+    def volatility_at(self, time_ms):
+        """Time-of-day volatility multiplier for one epoch-ms time"""
+        window = self._window_for(time_ms)
+        return _REGIME_VALUES[bisect.bisect_right(window['regime_edges_list'], time_ms) % len(_REGIME_VALUES)]
+
+    def _local_ms(self, time_ms):
+        window = self._window_for(time_ms)
+        in_dst = bisect.bisect_right(window['dst_edges'], time_ms) % 2 == 1
+        return time_ms - (4 if in_dst else 5) * _HOUR_MS
+
+    def local_hour(self, time_ms):
+        """New York local hour (0-23) for one epoch-ms time"""
+        return int(self._local_ms(time_ms) // _HOUR_MS % 24)
+
+    # -- sessions ---------------------------------------------------------
+
+    def session(self, asset_class, time_ms):
+        """(is_open, open_ms, close_ms) of the session containing or following ``time_ms``.
+
+        Crypto is always open (None bounds); unknown classes are treated as
+        always open too.
+        """
+        window = self._window_for(time_ms)
+        sessions = window['sessions'].get(asset_class)
+        if sessions is None:
+            return True, None, None
+        opens, closes = sessions
+        i = bisect.bisect_right(closes, time_ms)
+        if i == len(closes):
+            return False, None, None
+        return opens[i] <= time_ms, opens[i], closes[i]
+
+    def is_open(self, asset_class, time_ms=None):
+        time_ms = time_ms if time_ms is not None else time.time() * 1000
+        return self.session(asset_class, time_ms)[0]
+
+    def next_open(self, asset_class, time_ms=None):
+        """Epoch ms of the next session open after ``time_ms`` (None if always open)"""
+        time_ms = time_ms if time_ms is not None else time.time() * 1000
+        is_open, open_ms, close_ms = self.session(asset_class, time_ms)
+        if open_ms is None or not is_open:
+            return open_ms
+        return self.session(asset_class, close_ms)[1]
+
+    def status(self, asset_class='stock', time_ms=None):
+        """(is_open, human readable message) for an asset class"""
+        time_ms = time_ms if time_ms is not None else time.time() * 1000
+
+        # Crypto trades 24/7
+        if asset_class == 'crypto':
+            return True, "Crypto markets are open 24/7"
+
+        if asset_class not in ('stock', 'index', 'forex'):
+            return True, "Market status unknown"
+
+        is_open, open_ms, close_ms = self.session(asset_class, time_ms)
+
+        # Forex closes only on weekends
+        if asset_class == 'forex':
+            if is_open:
+                return True, "Forex market open"
+            return False, "Forex market closed on weekends"
+
+        if is_open:
+            mins_left = int((close_ms - time_ms) / _MINUTE_MS)
+            if close_ms - open_ms < (MARKET_CLOSE_MINUTES - MARKET_OPEN_MINUTES) * _MINUTE_MS:
+                return True, f"Market open, early close today ({mins_left} minutes remaining)"
+            return True, f"Market open ({mins_left} minutes remaining)"
+
+        local_ms = self._local_ms(time_ms)
+        day = int(local_ms // _DAY_MS)
+        if (day + 3) % 7 >= 5:
+            return False, "Stock market closed on weekends"
+        closures = self._window['closures']
+        if day in closures:
+            return False, f"Market closed for {closures[day]}"
+        if open_ms is not None and open_ms - time_ms < _DAY_MS - local_ms % _DAY_MS:
+            mins_until = int((open_ms - time_ms) / _MINUTE_MS)
+            return False, f"Market opens in {mins_until} minutes"
+        if open_ms is None:
+            return False, "Market closed"
+        hours_until = int((open_ms - time_ms) / _HOUR_MS)
+        return False, f"Market closed. Opens in {hours_until} hours"
+
+
+market_calendar = MarketCalendar()
@@ -0,0 +1,50 @@
+"""Wire formats for market data - row JSON, columnar JSON and MessagePack.
+
+Row JSON (the default) is the original list-of-dicts shape. Columnar
+payloads replace each list of candles/quotes with one short-keyed array per
+field (``{"t": [...], "o": [...], ...}``), so key names are sent once
+instead of once per bar. Both JSON shapes are encoded with orjson;
+MessagePack always uses the columnar shape.
+"""
+import msgpack
+import orjson
+from flask import Response
+
+
+CANDLE_FIELDS = (('t', 'time'), ('o', 'open'), ('h', 'high'), ('l', 'low'), ('c', 'close'), ('v', 'volume'))
+QUOTE_FIELDS = (('s', 'symbol'), ('p', 'price'), ('b', 'bid'), ('a', 'ask'), ('t', 'timestamp'))
+
+FORMATS = ('json', 'columnar', 'msgpack')
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+
+
+def negotiate(request):
+    """Pick a format from ``?format=`` or else the Accept header"""
+    fmt = request.args.get('format', '').lower()
+    if fmt in FORMATS:
+        return fmt
+    best = request.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES, default='application/json')
+    return 'msgpack' if best in MSGPACK_MIMETYPES else 'json'
+
+
+def columns(rows, fields):
+    """Transpose a list of dicts into {short_key: [values]}"""
+    return {short: [row.get(name) for row in rows] for short, name in fields}
+
+
+def shape(payload, fmt, key, fields):
+    """Payload with ``payload[key]`` transposed for the columnar formats"""
+    if fmt == 'json' or key not in payload:
+        return payload
+    return {**payload, key: columns(payload[key], fields)}
+
+
+def response(payload, fmt, status=200):
+    """Encode a (shaped) payload as a Flask response"""
+    if fmt == 'msgpack':
+        body, mimetype = msgpack.packb(payload, use_bin_type=True), 'application/msgpack'
+    else:
+        body, mimetype = orjson.dumps(payload), 'application/json'
+    resp = Response(body, status=status, mimetype=mimetype)
+    resp.vary.add('Accept')
+    return resp
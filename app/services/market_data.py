@@ -2,90 +2,121 @@
 import time
 import random
 import math
+import threading
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from app.services import candle_engine, indicators, order_book, price_models, price_process, resample
+from app.services.asset_search import AssetSearchIndex
+from app.services.candle_series import CandleSeries
+from app.services.candle_store import CandleStore
+from app.services.market_cache import MarketCache
+from app.services.market_calendar import market_calendar
+from app.services.market_factors import FactorModel
+from app.services.market_snapshot import MarketSnapshot
+from app.services.shared_snapshot import BAR_TIMEFRAME, SharedSnapshot
+from app.services.symbols import SYMBOLS, registry
 
 
 class MarketDataService:
     """Generate realistic mock market data for trading simulator"""
     
-    # Market hours (simulated US stock market times)
-    MARKET_OPEN_HOUR = 9  # 9:30 AM EST
-    MARKET_OPEN_MINUTE = 30
-    MARKET_CLOSE_HOUR = 16  # 4:00 PM EST
-    MARKET_CLOSE_MINUTE = 0
-    
-    # Volatility patterns by time of day (simulated)
-    
-    # 50 Fake Training Assets (legal-safe, parody names)
-    SYMBOLS = {
-        'stocks': [
-            {'symbol': 'SMBY', 'name': 'SmartBuy', 'sector': 'Retail Electronics', 'class': 'stock', 'volatility': 'medium', 'tier': 'free'},
-            {'symbol': 'PRTC', 'name': 'PearTech', 'sector': 'Consumer Tech', 'class': 'stock', 'volatility': 'medium', 'tier': 'free'},
-            {'symbol': 'VLTR', 'name': 'Voltra Motors', 'sector': 'EV / Auto', 'class': 'stock', 'volatility': 'high', 'tier': 'gold'},
-            {'symbol': 'RNBX', 'name': 'RainBox', 'sector': 'E-comm / Cloud', 'class': 'stock', 'volatility': 'medium', 'tier': 'gold'},
-            {'symbol': 'STRM', 'name': 'Streamly', 'sector': 'Streaming', 'class': 'stock', 'volatility': 'medium', 'tier': 'gold'},
-            {'symbol': 'NRCP', 'name': 'NeuroChip', 'sector': 'Semiconductors', 'class': 'stock', 'volatility': 'high', 'tier': 'premium'},
-            {'symbol': 'FNDT', 'name': 'FindIt', 'sector': 'Search / Ads', 'class': 'stock', 'volatility': 'low', 'tier': 'premium'},
-            {'symbol': 'FNLK', 'name': 'FaceLink', 'sector': 'Social', 'class': 'stock', 'volatility': 'medium', 'tier': 'premium'},
-            {'symbol': 'CLND', 'name': 'CloudNest', 'sector': 'Cloud', 'class': 'stock', 'volatility': 'medium', 'tier': 'premium'},
-            {'symbol': 'PYWV', 'name': 'PayWave', 'sector': 'Fintech', 'class': 'stock', 'volatility': 'medium', 'tier': 'premium'},
-            {'symbol': 'MDCR', 'name': 'MediCore', 'sector': 'Healthcare', 'class': 'stock', 'volatility': 'low', 'tier': 'premium'},
-            {'symbol': 'ARLF', 'name': 'AeroLift', 'sector': 'Logistics', 'class': 'stock', 'volatility': 'medium', 'tier': 'premium'},
-            {'symbol': 'BLDF', 'name': 'BuildForge', 'sector': 'Industrial', 'class': 'stock', 'volatility': 'low', 'tier': 'premium'},
-            {'symbol': 'FRCT', 'name': 'FreshCart', 'sector': 'Delivery', 'class': 'stock', 'volatility': 'medium', 'tier': 'premium'},
-            {'symbol': 'HMHV', 'name': 'HomeHaven', 'sector': 'Home Goods', 'class': 'stock', 'volatility': 'low', 'tier': 'premium'},
-            {'symbol': 'BYTS', 'name': 'ByteShield', 'sector': 'Cybersecurity', 'class': 'stock', 'volatility': 'high', 'tier': 'premium'},
-            {'symbol': 'SLRG', 'name': 'Solaris Grid', 'sector': 'Clean Energy', 'class': 'stock', 'volatility': 'high', 'tier': 'premium'},
-            {'symbol': 'NVBK', 'name': 'NovaBank', 'sector': 'Banking', 'class': 'stock', 'volatility': 'low', 'tier': 'premium'},
-            {'symbol': 'MTRL', 'name': 'MetroRail', 'sector': 'Transport', 'class': 'stock', 'volatility': 'low', 'tier': 'premium'},
-            {'symbol': 'CPOP', 'name': 'CinePop', 'sector': 'Entertainment', 'class': 'stock', 'volatility': 'medium', 'tier': 'premium'},
-        ],
-        'crypto': [
-            {'symbol': 'BTN', 'name': 'BitNova', 'sector': 'Store of Value', 'class': 'crypto', 'volatility': 'high', 'tier': 'free'},
-            {'symbol': 'ETHA', 'name': 'Ethera', 'sector': 'Smart Contracts', 'class': 'crypto', 'volatility': 'high', 'tier': 'gold'},
-            {'symbol': 'SOLR', 'name': 'Solari', 'sector': 'Fast L1', 'class': 'crypto', 'volatility': 'very-high', 'tier': 'gold'},
-            {'symbol': 'LUMT', 'name': 'LunaMint', 'sector': 'Payments', 'class': 'crypto', 'volatility': 'high', 'tier': 'gold'},
-            {'symbol': 'RPLX', 'name': 'RippleX', 'sector': 'Transfers', 'class': 'crypto', 'volatility': 'medium', 'tier': 'gold'},
-            {'symbol': 'PUPC', 'name': 'PupCoin', 'sector': 'Meme', 'class': 'crypto', 'volatility': 'very-high', 'tier': 'premium'},
-            {'symbol': 'CLAF', 'name': 'ChainLeaf', 'sector': 'Green Chain', 'class': 'crypto', 'volatility': 'medium', 'tier': 'premium'},
-            {'symbol': 'VLT', 'name': 'VoltToken', 'sector': 'Utility', 'class': 'crypto', 'volatility': 'high', 'tier': 'premium'},
-            {'symbol': 'ASTR', 'name': 'AstraCoin', 'sector': 'L2', 'class': 'crypto', 'volatility': 'high', 'tier': 'premium'},
-            {'symbol': 'NBYT', 'name': 'NeoByte', 'sector': 'Compute', 'class': 'crypto', 'volatility': 'medium', 'tier': 'premium'},
-            {'symbol': 'ORBT', 'name': 'Orbit', 'sector': 'Interop', 'class': 'crypto', 'volatility': 'high', 'tier': 'premium'},
-            {'symbol': 'GLCR', 'name': 'Glacier', 'sector': 'Privacy', 'class': 'crypto', 'volatility': 'medium', 'tier': 'premium'},
-            {'symbol': 'KOI', 'name': 'Koi', 'sector': 'Community', 'class': 'crypto', 'volatility': 'medium', 'tier': 'premium'},
-            {'symbol': 'SAFF', 'name': 'Saffron', 'sector': 'DeFi', 'class': 'crypto', 'volatility': 'high', 'tier': 'premium'},
-            {'symbol': 'COBL', 'name': 'Cobalt', 'sector': 'Gaming', 'class': 'crypto', 'volatility': 'high', 'tier': 'premium'},
-        ],
-        'forex': [
-            {'symbol': 'USXEUR', 'name': 'USX / EURX', 'sector': 'FX Major', 'class': 'forex', 'volatility': 'low', 'tier': 'gold'},
-            {'symbol': 'USXYNK', 'name': 'USX / YENK', 'sector': 'FX Major', 'class': 'forex', 'volatility': 'low', 'tier': 'gold'},
-            {'symbol': 'GBPZUSX', 'name': 'GBPZ / USX', 'sector': 'FX Major', 'class': 'forex', 'volatility': 'low', 'tier': 'gold'},
-            {'symbol': 'CADYUSX', 'name': 'CADY / USX', 'sector': 'FX Major', 'class': 'forex', 'volatility': 'low', 'tier': 'premium'},
-            {'symbol': 'AUSYUSX', 'name': 'AUSY / USX', 'sector': 'FX Major', 'class': 'forex', 'volatility': 'low', 'tier': 'premium'},
-            {'symbol': 'EURXYNK', 'name': 'EURX / YENK', 'sector': 'FX Cross', 'class': 'forex', 'volatility': 'medium', 'tier': 'premium'},
-            {'symbol': 'CHFQUSX', 'name': 'CHFQ / USX', 'sector': 'FX Major', 'class': 'forex', 'volatility': 'low', 'tier': 'premium'},
-            {'symbol': 'USXNGNX', 'name': 'USX / NGNX', 'sector': 'FX Exotic', 'class': 'forex', 'volatility': 'medium', 'tier': 'premium'},
-            {'symbol': 'USXBRLX', 'name': 'USX / BRLX', 'sector': 'FX Exotic', 'class': 'forex', 'volatility': 'medium', 'tier': 'premium'},
-            {'symbol': 'USXINRX', 'name': 'USX / INRX', 'sector': 'FX Exotic', 'class': 'forex', 'volatility': 'medium', 'tier': 'premium'},
-        ],
-        'indices': [
-            {'symbol': 'TOP500', 'name': 'Top500', 'sector': 'Index', 'class': 'index', 'volatility': 'low', 'tier': 'gold'},
-            {'symbol': 'TCH100', 'name': 'Tech100', 'sector': 'Index', 'class': 'index', 'volatility': 'medium', 'tier': 'gold'},
-            {'symbol': 'MEGA30', 'name': 'Mega30', 'sector': 'Index', 'class': 'index', 'volatility': 'low', 'tier': 'premium'},
-            {'symbol': 'GE20', 'name': 'GreenEnergy20', 'sector': 'Index', 'class': 'index', 'volatility': 'medium', 'tier': 'premium'},
-            {'symbol': 'GLB40', 'name': 'Global40', 'sector': 'Index', 'class': 'index', 'volatility': 'low', 'tier': 'premium'},
-        ]
+    # Candle generation engines:
+    # 'seeded' = deterministic per-symbol price process (same prices on every worker)
+    # 'numpy' = vectorized random walk, 'python' = per-candle random loop
+    ENGINES = ('seeded', 'numpy', 'python')
+    
+    # Candle interval per timeframe (unknown timeframes fall back to 1d)
+    TIMEFRAME_INTERVALS = {
+        '1m': timedelta(minutes=1),
+        '5m': timedelta(minutes=5),
+        '15m': timedelta(minutes=15),
+        '1h': timedelta(hours=1),
+        '4h': timedelta(hours=4),
+        '1d': timedelta(days=1),
+        '1w': timedelta(weeks=1),
     }
     
+    # Timeframes aggregated from a finer seeded base series instead of being
+    # generated directly, so their OHLCV agrees bar for bar with the base
+    RESAMPLE_SOURCES = {'5m': '1m', '15m': '1m', '4h': '1h', '1d': '1h', '1w': '1h'}
+    
+    # Cap on base bars aggregated to fill a resampled rolling series
+    RESAMPLE_BASE_BARS = 25000
+    
+    # On-disk candle store (when MARKET_CANDLE_STORE_DIR is set): bars backfilled
+    # the first time a series is stored, and bars generated per append chunk
+    STORE_MAX_BACKFILL_BARS = 100000
+    STORE_CHUNK_BARS = 20000
+    
+    # Closes used for the RTT "stretched" range position
+    RANGE_LOOKBACK = 20
+    
+    # Bars behind the seeded engine's incremental indicators: MACD's signal
+    # line needs 26 + 9 = 35, the rest gives its EMAs room to settle
+    INDICATOR_WARMUP_BARS = 60
+    
+    # Rough per-candle memory footprint (dict + boxed values) for the cache cap
+    CANDLE_CACHE_BYTES = 400
+    RTT_CACHE_BYTES = 1000
+    
+    # Market hours, holidays and time-of-day volatility: see app/services/market_calendar.py
+    
+    # 50 Fake Training Assets (legal-safe, parody names) - see app/services/symbols.py
+    SYMBOLS = SYMBOLS
+    
+    def __init__(self, engine='seeded', cache_max_bytes=64 * 1024 * 1024, series_capacity=1000,
+                 store=None, store_history_days=3650, correlated=True, price_models_spec='default=legacy'):
+        self.engine = engine
+        self.price_models = price_models.ModelTable(price_models_spec)
+        self.cache = MarketCache(max_bytes=cache_max_bytes)
+        self.series_capacity = series_capacity
+        self.store = store  # CandleStore or None
+        self.store_history_days = store_history_days
+        self._series = {}  # (symbol, timeframe) -> CandleSeries
+        self._indicator_state = {}  # (symbol, timeframe) -> short CandleSeries with an IndicatorSet
+        self._series_lock = threading.Lock()
+        self.search_index = AssetSearchIndex(registry)
+        self._set_factor_model(correlated)
+    
+    def _set_factor_model(self, correlated):
+        """(Re)build the seeded pricing model and the snapshot that quotes from it"""
+        self.factors = FactorModel(
+            [asset.info for asset in registry.assets],
+            self._get_volatility_multiplier,
+            correlated=correlated,
+        )
+        self.snapshot = MarketSnapshot(self.factors)
+    
+    def init_app(self, app):
+        """Apply market settings from the Flask config"""
+        engine = app.config.get('MARKET_CANDLE_ENGINE', self.engine)
+        if engine not in self.ENGINES:
+            raise ValueError(f'Invalid MARKET_CANDLE_ENGINE: {engine}')
+        self.engine = engine
+        self.cache.max_bytes = int(app.config.get('MARKET_CACHE_MAX_BYTES', self.cache.max_bytes))
+        self.series_capacity = int(app.config.get('MARKET_SERIES_CAPACITY', self.series_capacity))
+        self.price_models = price_models.ModelTable(app.config.get('MARKET_PRICE_MODELS', self.price_models.spec))
+        store_dir = app.config.get('MARKET_CANDLE_STORE_DIR')
+        if store_dir:
+            self.store = CandleStore(store_dir)
+        self.store_history_days = int(app.config.get('MARKET_STORE_HISTORY_DAYS', self.store_history_days))
+        correlated = bool(app.config.get('MARKET_CORRELATED_ASSETS', self.factors.correlated))
+        if correlated != self.factors.correlated:
+            self._set_factor_model(correlated)
+            self.cache.clear()
+            with self._series_lock:
+                self._series.clear()
+                self._indicator_state.clear()
+        shared_path = app.config.get('MARKET_SHARED_SNAPSHOT_PATH')
+        if shared_path:
+            self.snapshot = SharedSnapshot(shared_path, self.snapshot)
+    
     def _get_asset_info(self, symbol):
         """Find asset info by symbol"""
-        for category in self.SYMBOLS.values():
-            for asset in category:
-                if asset['symbol'].upper() == symbol.upper():
-                    return asset
-        return None
+        asset = registry.get(symbol)
+        return asset.info if asset else None
     
     def _get_base_price(self, asset_class):
         """Get starting price based on asset class"""
@@ -115,62 +146,11 @@ class MarketDataService:
     
     def is_market_open(self, asset_class='stock'):
         """Check if market is currently open for given asset class"""
-        now = datetime.now(ZoneInfo('America/New_York'))
-        
-        # Crypto trades 24/7
-        if asset_class == 'crypto':
-            return True, "Crypto markets are open 24/7"
-        
-        # Forex closes only on weekends
-        if asset_class == 'forex':
-            if now.weekday() >= 5:  # Saturday or Sunday
-                return False, "Forex market closed on weekends"
-            return True, "Forex market open"
-        
-        # Stocks have specific hours
-        if asset_class in ['stock', 'index']:
-            # Check if weekend
-            if now.weekday() >= 5:
-                return False, "Stock market closed on weekends"
-            
-            # Check trading hours (9:30 AM - 4:00 PM EST)
-            market_open = now.replace(hour=self.MARKET_OPEN_HOUR, minute=self.MARKET_OPEN_MINUTE, second=0)
-            market_close = now.replace(hour=self.MARKET_CLOSE_HOUR, minute=self.MARKET_CLOSE_MINUTE, second=0)
-            
-            if now < market_open:
-                mins_until = int((market_open - now).total_seconds() / 60)
-                return False, f"Market opens in {mins_until} minutes"
-            elif now > market_close:
-                tomorrow = now + timedelta(days=1)
-                market_open_tmr = tomorrow.replace(hour=self.MARKET_OPEN_HOUR, minute=self.MARKET_OPEN_MINUTE)
-                hours_until = int((market_open_tmr - now).total_seconds() / 3600)
-                return False, f"Market closed. Opens in {hours_until} hours"
-            else:
-                mins_left = int((market_close - now).total_seconds() / 60)
-                return True, f"Market open ({mins_left} minutes remaining)"
-        
-        return True, "Market status unknown"
+        return market_calendar.status(asset_class, time.time() * 1000)
     
     def _get_time_of_day_volatility(self, timestamp):
         """Return volatility multiplier based on time of day (higher at open/close)"""
-        try:
-            dt = datetime.fromtimestamp(timestamp / 1000, tz=ZoneInfo('America/New_York'))
-            hour = dt.hour
-            
-            # Market open (9:30-10:30): High volatility
-            if 9 <= hour < 11:
-                return 1.5
-            # Lunch (11:30-13:00): Low volatility
-            elif 11 <= hour < 13:
-                return 0.7
-            # Market close (15:00-16:00): High volatility
-            elif 15 <= hour < 17:
-                return 1.4
-            # Otherwise normal
-            else:
-                return 1.0
-        except:
-            return 1.0
+        return market_calendar.volatility_at(timestamp)
     
     def _add_trend_bias(self, current_price, candle_index, total_candles, asset_class):
         """Add realistic trend patterns (not purely random walk)"""
@@ -188,38 +168,408 @@ class MarketDataService:
         
         return trend_strength
     
-    def get_candles(self, symbol, timeframe='1d', limit=120):
-        """Generate realistic mock candlestick data with market patterns"""
-        candles = []
+    def get_candles(self, symbol, timeframe='1d', limit=120, since=None, now_ms=None):
+        """Generate realistic mock candlestick data with market patterns.
         
+        With ``since`` (epoch ms) only candles whose time is >= since are
+        returned, so pollers can fetch just the delta. ``now_ms`` prices the
+        seeded engine's candles at another instant than the wall clock.
+        """
         # Get asset info
         asset_info = self._get_asset_info(symbol)
         if not asset_info:
             # Fallback for unknown symbols
             asset_info = {'class': 'stock', 'volatility': 'medium'}
         
+        if timeframe not in self.TIMEFRAME_INTERVALS:
+            timeframe = '1d'
+        interval = self.TIMEFRAME_INTERVALS[timeframe]
+        
+        if self.engine == 'seeded':
+            return self._get_candles_seeded(symbol, asset_info, timeframe, interval, limit, since, now_ms)
+        if self.engine == 'python':
+            candles = self._get_candles_python(asset_info, timeframe, interval, limit)
+        else:
+            candles = self._get_candles_numpy(asset_info, timeframe, interval, limit)
+        if since is not None:
+            candles = [c for c in candles if c['time'] >= since]
+        return candles
+    
+    def _get_candles_seeded(self, symbol, asset_info, timeframe, interval, limit, since=None, now_ms=None):
+        """Deterministic candles aligned to timeframe buckets (last one still forming).
+        
+        Completed bars come from the rolling series and are cached until the
+        bucket rolls over; the forming bar is cached per price tick. Cached
+        candle dicts are shared - don't mutate.
+        """
+        if limit <= 0:
+            return []
+        
+        symbol = symbol.upper()
+        interval_ms = int(interval.total_seconds() * 1000)
+        now_ms = int(now_ms if now_ms is not None else time.time() * 1000)
+        last_bucket = price_process.bucket_index(timeframe, interval_ms, now_ms)
+        
+        # Delta request: only the completed bars at/after `since` plus the forming bar
+        if since is not None:
+            since_bucket = price_process.bucket_index(timeframe, interval_ms, since)
+            if since_bucket > last_bucket - limit:
+                count = max(0, last_bucket - max(since_bucket, last_bucket - limit + 1))
+                return self._history_candles(
+                    symbol, asset_info, timeframe, interval_ms, last_bucket, count,
+                ) + self._live_candle(symbol, asset_info, timeframe, interval_ms, last_bucket, now_ms)
+        
+        history_key = ('history', symbol, timeframe, limit, last_bucket)
+        history = self.cache.get(history_key, now_ms)
+        if history is None:
+            history = self._history_candles(symbol, asset_info, timeframe, interval_ms, last_bucket, limit - 1)
+            self.cache.put(
+                history_key, history,
+                expires_at_ms=int(price_process.bucket_start(timeframe, interval_ms, last_bucket + 1)),
+                size=len(history) * self.CANDLE_CACHE_BYTES,
+            )
+        
+        return history + self._live_candle(symbol, asset_info, timeframe, interval_ms, last_bucket, now_ms)
+    
+    def get_candle_range(self, symbol, timeframe='1d', start_ms=None, end_ms=None, limit=120, newest=True):
+        """Candles with start_ms <= time <= end_ms (either bound optional), at most ``limit``.
+        
+        ``newest`` keeps the newest ``limit`` candles of the range, otherwise
+        the oldest. With the seeded engine only the requested buckets are
+        computed (rolling series, candle store or direct generation); the
+        forming candle is included when the range reaches it.
+        """
+        if limit <= 0:
+            return []
+        asset_info = self._get_asset_info(symbol) or {'class': 'stock', 'volatility': 'medium'}
+        if timeframe not in self.TIMEFRAME_INTERVALS:
+            timeframe = '1d'
+        
+        if self.engine != 'seeded':
+            # Random-walk engines have no addressable history: filter a fresh window
+            candles = [
+                c for c in self.get_candles(symbol, timeframe, limit=self.series_capacity)
+                if (start_ms is None or c['time'] >= start_ms) and (end_ms is None or c['time'] <= end_ms)
+            ]
+            return candles[-limit:] if newest else candles[:limit]
+        
+        symbol = symbol.upper()
+        interval_ms = int(self.TIMEFRAME_INTERVALS[timeframe].total_seconds() * 1000)
+        now_ms = int(time.time() * 1000)
+        last_bucket = price_process.bucket_index(timeframe, interval_ms, now_ms)
+        
+        # Buckets whose start time lies inside the range
+        last = last_bucket if end_ms is None else min(last_bucket, price_process.bucket_index(timeframe, interval_ms, end_ms))
+        if start_ms is None:
+            first = last - limit + 1
+        else:
+            first = price_process.bucket_index(timeframe, interval_ms, start_ms - 1) + 1
+        # History starts at the epoch: the first bucket opening at or after it
+        first = max(first, price_process.bucket_index(timeframe, interval_ms, -1) + 1)
+        if first > last:
+            return []
+        if newest:
+            first = max(first, last - limit + 1)
+        else:
+            last = min(last, first + limit - 1)
+        
+        candles = []
+        history_last = min(last, last_bucket - 1)
+        if first <= history_last:
+            range_key = ('range', symbol, timeframe, first, history_last)
+            candles = self.cache.get(range_key, now_ms)
+            if candles is None:
+                candles = self._range_candles(symbol, asset_info, timeframe, interval_ms, first, history_last, last_bucket)
+                self.cache.put(
+                    range_key, candles,
+                    expires_at_ms=int(price_process.bucket_start(timeframe, interval_ms, last_bucket + 1)),
+                    size=len(candles) * self.CANDLE_CACHE_BYTES,
+                )
+        if last == last_bucket:
+            candles = candles + self._live_candle(symbol, asset_info, timeframe, interval_ms, last_bucket, now_ms)
+        return candles
+    
+    def candles_version(self, timeframe='1d', end_ms=None):
+        """(version token, last-modified ms) for a candle page, without generating it.
+        
+        Completed bars only change when the bucket rolls over; a page that
+        can reach the forming candle (no ``end_ms`` before its bucket) also
+        changes every price tick. None for the random-walk engines, whose
+        output is new on every call.
+        """
+        if self.engine != 'seeded':
+            return None
+        if timeframe not in self.TIMEFRAME_INTERVALS:
+            timeframe = '1d'
+        interval_ms = int(self.TIMEFRAME_INTERVALS[timeframe].total_seconds() * 1000)
+        now_ms = int(time.time() * 1000)
+        last_bucket = price_process.bucket_index(timeframe, interval_ms, now_ms)
+        forming_start = int(price_process.bucket_start(timeframe, interval_ms, last_bucket))
+        if end_ms is None or end_ms >= forming_start:
+            tick = price_process.tick_time(now_ms)
+            return f'{last_bucket}.{tick}', tick
+        return str(last_bucket), forming_start
+    
+    def get_bars(self, symbol, timeframe, first_bucket, last_bucket, now_ms=None):
+        """Seeded OHLCV arrays for an inclusive bucket range (seeded engine only).
+        
+        Completed bars come from the candle store when it covers them, like
+        live history. With ``now_ms`` inside the last bucket, that bar is the
+        one forming at that time.
+        """
+        asset_info = self._get_asset_info(symbol) or {'class': 'stock', 'volatility': 'medium'}
+        symbol = symbol.upper()
+        interval_ms = int(self.TIMEFRAME_INTERVALS[timeframe].total_seconds() * 1000)
+        if now_ms is None:
+            return self._completed_bars(symbol, asset_info, timeframe, interval_ms, first_bucket, last_bucket)
+        return self._seeded_bars(symbol, asset_info, timeframe, interval_ms, first_bucket, last_bucket, now_ms)
+    
+    def get_forming_bars(self, symbol, timeframe, first_bucket, last_bucket):
+        """Seeded bars of a bucket range as they stood at every price tick inside it.
+        
+        OHLCV arrays with one row per tick (row i at the first bucket's start
+        + i * TICK_MS), each equal to the forming bar ``get_bars`` builds for
+        that tick. Resampled timeframes fold the completed source bars of the
+        bucket into the source bar forming at each tick.
+        """
+        asset_info = self._get_asset_info(symbol) or {'class': 'stock', 'volatility': 'medium'}
+        symbol = symbol.upper()
+        interval_ms = int(self.TIMEFRAME_INTERVALS[timeframe].total_seconds() * 1000)
+        start = int(price_process.bucket_start(timeframe, interval_ms, first_bucket))
+        buckets = last_bucket - first_bucket + 1
+        ticks = start + price_process.TICK_MS * np.arange(buckets * interval_ms // price_process.TICK_MS, dtype=np.int64)
+        
+        source = self.RESAMPLE_SOURCES.get(timeframe)
+        if source is None:
+            return price_process.forming_bars(
+                symbol,
+                asset_info['class'],
+                self._get_volatility_multiplier(asset_info.get('volatility', 'medium')),
+                timeframe,
+                interval_ms,
+                ticks,
+                model=self.factors,
+            )
+        
+        source_ms = int(self.TIMEFRAME_INTERVALS[source].total_seconds() * 1000)
+        first = price_process.bucket_index(source, source_ms, start)
+        count = interval_ms // source_ms  # source bars per bucket
+        completed = self._seeded_bars(symbol, asset_info, source, source_ms, first, first + buckets * count - 1)
+        forming = self.get_forming_bars(symbol, source, first, first + buckets * count - 1)
+        
+        # Per tick: its bucket, its source bar within the bucket, and aggregates
+        # of the completed source bars before that one
+        k = np.arange(ticks.size) // (source_ms // price_process.TICK_MS)
+        b, j = k // count, k % count
+        
+        def before(values, accumulate, initial):
+            grid = accumulate(values.reshape(buckets, count), axis=1)
+            return np.concatenate((np.full((buckets, 1), initial, dtype=grid.dtype), grid), axis=1)[b, j]
+        
+        return {
+            'time': completed['time'][b * count],
+            'open': completed['open'][b * count],
+            'high': np.maximum(before(completed['high'], np.maximum.accumulate, -np.inf), forming['high']),
+            'low': np.minimum(before(completed['low'], np.minimum.accumulate, np.inf), forming['low']),
+            'close': forming['close'],
+            'volume': before(completed['volume'], np.cumsum, 0) + forming['volume'],
+        }
+    
+    def _range_candles(self, symbol, asset_info, timeframe, interval_ms, first_bucket, last_bucket, forming_bucket):
+        """Completed candles for an inclusive bucket range"""
+        decimals = 4 if asset_info['class'] == 'forex' else 2
+        bars = None
+        if forming_bucket - first_bucket <= self._series_capacity(timeframe):
+            with self._series_lock:
+                rolling = self._rolling_series(symbol, asset_info, timeframe, interval_ms)
+                if rolling is not None:
+                    rolling.advance(forming_bucket - 1)
+                    bars = rolling.window(first_bucket, last_bucket)
+        if bars is None:
+            bars = self._completed_bars(symbol, asset_info, timeframe, interval_ms, first_bucket, last_bucket)
+        return candle_engine.to_candle_dicts(bars, decimals)
+    
+    def _history_candles(self, symbol, asset_info, timeframe, interval_ms, last_bucket, count):
+        """Newest ``count`` completed candles before the forming bucket"""
+        if count <= 0:
+            return []
+        decimals = 4 if asset_info['class'] == 'forex' else 2
+        
+        if count > self._series_capacity(timeframe):
+            series = self._completed_bars(
+                symbol, asset_info, timeframe, interval_ms, last_bucket - count, last_bucket - 1,
+            )
+            return candle_engine.to_candle_dicts(series, decimals)
+        
+        with self._series_lock:
+            rolling = self._rolling_series(symbol, asset_info, timeframe, interval_ms)
+            if rolling is not None:
+                rolling.advance(last_bucket - 1)
+                bars = rolling.tail(count)
+        if rolling is None:
+            bars = self._completed_bars(
+                symbol, asset_info, timeframe, interval_ms, last_bucket - count, last_bucket - 1,
+            )
+        return candle_engine.to_candle_dicts(bars, decimals)
+    
+    def _rolling_series(self, symbol, asset_info, timeframe, interval_ms):
+        """Rolling candle series for symbol/timeframe; hold _series_lock.
+        
+        None for symbols outside the registry: series are kept for the life of
+        the process, so arbitrary symbols must not be able to add them.
+        """
+        rolling = self._series.get((symbol, timeframe))
+        if rolling is None:
+            if registry.get(symbol) is None:
+                return None
+            rolling = CandleSeries(
+                self._series_capacity(timeframe),
+                lambda first, last: self._completed_bars(symbol, asset_info, timeframe, interval_ms, first, last),
+            )
+            self._series[(symbol, timeframe)] = rolling
+        return rolling
+    
+    def _indicator_series(self, symbol, asset_info, timeframe, interval_ms):
+        """Short series feeding incremental indicators for a registry symbol; hold _series_lock.
+        
+        Only INDICATOR_WARMUP_BARS deep, so a cold RTT call generates a few
+        dozen bars (a few thousand base bars when resampled) instead of a
+        full-capacity chart series.
+        """
+        rolling = self._indicator_state.get((symbol, timeframe))
+        if rolling is None:
+            rolling = CandleSeries(
+                self.INDICATOR_WARMUP_BARS,
+                lambda first, last: self._completed_bars(symbol, asset_info, timeframe, interval_ms, first, last),
+                indicators=indicators.IndicatorSet(),
+            )
+            self._indicator_state[(symbol, timeframe)] = rolling
+        return rolling
+    
+    def _live_candle(self, symbol, asset_info, timeframe, interval_ms, last_bucket, now_ms):
+        """The forming candle as a one-item list, cached per price tick"""
+        tick = price_process.tick_time(now_ms)
+        live_key = ('live', symbol, timeframe, last_bucket, tick)
+        live = self.cache.get(live_key, now_ms)
+        if live is None and timeframe == BAR_TIMEFRAME and isinstance(self.snapshot, SharedSnapshot):
+            bar = self.snapshot.bar(symbol, now_ms)
+            if bar is not None and bar['time'] == price_process.bucket_start(timeframe, interval_ms, last_bucket):
+                live = [bar]
+        if live is None:
+            series = self._seeded_bars(
+                symbol, asset_info, timeframe, interval_ms, last_bucket, last_bucket, now_ms,
+            )
+            decimals = 4 if asset_info['class'] == 'forex' else 2
+            live = candle_engine.to_candle_dicts(series, decimals)
+            self.cache.put(
+                live_key, live,
+                expires_at_ms=tick + price_process.TICK_MS,
+                size=self.CANDLE_CACHE_BYTES,
+            )
+        return live
+    
+    def _completed_bars(self, symbol, asset_info, timeframe, interval_ms, first_bucket, last_bucket):
+        """Completed OHLCV arrays for a bucket range, from the store when it covers them"""
+        if self.store is not None:
+            bars = self._stored_bars(symbol, asset_info, timeframe, interval_ms, first_bucket, last_bucket)
+            if bars is not None:
+                return bars
+        return self._seeded_bars(symbol, asset_info, timeframe, interval_ms, first_bucket, last_bucket)
+    
+    def _stored_bars(self, symbol, asset_info, timeframe, interval_ms, first_bucket, last_bucket):
+        """Range read from the candle store, or None when it can't cover the range.
+        
+        The store is first brought up to the newest completed bar. A series is
+        backfilled with store_history_days of history on first use; after a
+        long gap only the newest STORE_MAX_BACKFILL_BARS are appended, and
+        ranges that fall into the hole are generated instead.
+        """
+        completed = price_process.bucket_index(timeframe, interval_ms, time.time() * 1000) - 1
+        backfill = min(self.STORE_MAX_BACKFILL_BARS, max(1, self.store_history_days * 86400000 // interval_ms))
+        start = completed - backfill + 1
+        span = self.store.time_range(symbol, timeframe)
+        if span is not None:
+            start = max(start, price_process.bucket_index(timeframe, interval_ms, span[1]) + 1)
+        
+        for chunk in range(start, completed + 1, self.STORE_CHUNK_BARS):
+            bars = self._seeded_bars(
+                symbol, asset_info, timeframe, interval_ms, chunk, min(completed, chunk + self.STORE_CHUNK_BARS - 1),
+            )
+            self.store.append(symbol, timeframe, bars)
+        
+        bars = self.store.read_range(
+            symbol, timeframe,
+            int(price_process.bucket_start(timeframe, interval_ms, first_bucket)),
+            int(price_process.bucket_start(timeframe, interval_ms, last_bucket + 1)),
+        )
+        if len(bars['time']) != last_bucket - first_bucket + 1:
+            return None
+        return bars
+    
+    def _series_capacity(self, timeframe):
+        """Rolling series size; resampled timeframes are bounded by RESAMPLE_BASE_BARS"""
+        source = self.RESAMPLE_SOURCES.get(timeframe)
+        if source is None:
+            return self.series_capacity
+        ratio = self.TIMEFRAME_INTERVALS[timeframe] // self.TIMEFRAME_INTERVALS[source]
+        return max(1, min(self.series_capacity, self.RESAMPLE_BASE_BARS // ratio))
+    
+    def _seeded_bars(self, symbol, asset_info, timeframe, interval_ms, first_bucket, last_bucket, now_ms=None):
+        """Seeded OHLCV arrays for an inclusive bucket range (completed bars by default)"""
+        if now_ms is None:
+            now_ms = int(price_process.bucket_start(timeframe, interval_ms, last_bucket + 1))
+        
+        source = self.RESAMPLE_SOURCES.get(timeframe)
+        if source is not None:
+            source_ms = int(self.TIMEFRAME_INTERVALS[source].total_seconds() * 1000)
+            first_start = int(price_process.bucket_start(timeframe, interval_ms, first_bucket))
+            end = int(price_process.bucket_start(timeframe, interval_ms, last_bucket + 1))
+            bars = self._seeded_bars(
+                symbol, asset_info, source, source_ms,
+                price_process.bucket_index(source, source_ms, first_start),
+                price_process.bucket_index(source, source_ms, min(now_ms, end - 1)),
+                now_ms,
+            )
+            return resample.resample_ohlcv(bars, timeframe, interval_ms)
+        
+        return price_process.generate_bars(
+            symbol,
+            asset_info['class'],
+            self._get_volatility_multiplier(asset_info.get('volatility', 'medium')),
+            timeframe,
+            interval_ms,
+            first_bucket=first_bucket,
+            last_bucket=last_bucket,
+            now_ms=now_ms,
+            model=self.factors,
+        )
+    
+    def _get_candles_numpy(self, asset_info, timeframe, interval, limit):
+        """Vectorized candle generation (see candle_engine)"""
+        interval_ms = int(interval.total_seconds() * 1000)
+        now_ms = int(time.time() * 1000)
+        times_ms = now_ms - interval_ms * np.arange(limit, 0, -1, dtype=np.int64)
+        
+        series = candle_engine.generate_ohlcv(
+            times_ms,
+            base_price=self._get_base_price(asset_info['class']),
+            volatility_mult=self._get_volatility_multiplier(asset_info.get('volatility', 'medium')),
+            asset_class=asset_info['class'],
+            intraday=timeframe in candle_engine.INTRADAY_TIMEFRAMES,
+            model=self.price_models.select(asset_info['class'], asset_info.get('volatility', 'medium')),
+        )
+        
+        decimals = 4 if asset_info['class'] == 'forex' else 2
+        return candle_engine.to_candle_dicts(series, decimals)
+    
+    def _get_candles_python(self, asset_info, timeframe, interval, limit):
+        """Reference per-candle generation loop"""
+        candles = []
+        
         # Starting price based on asset class
         base_price = self._get_base_price(asset_info['class'])
         volatility_mult = self._get_volatility_multiplier(asset_info.get('volatility', 'medium'))
         
-        # Time interval
-        if timeframe == '1m':
-            interval = timedelta(minutes=1)
-        elif timeframe == '5m':
-            interval = timedelta(minutes=5)
-        elif timeframe == '15m':
-            interval = timedelta(minutes=15)
-        elif timeframe == '1h':
-            interval = timedelta(hours=1)
-        elif timeframe == '4h':
-            interval = timedelta(hours=4)
-        elif timeframe == '1d':
-            interval = timedelta(days=1)
-        elif timeframe == '1w':
-            interval = timedelta(weeks=1)
-        else:
-            interval = timedelta(days=1)
-        
         now = datetime.utcnow()
         current_price = base_price
         
@@ -303,6 +653,11 @@ class MarketDataService:
     
     def get_quote(self, symbol):
         """Get current price quote"""
+        if self.engine == 'seeded':
+            quote = self.snapshot.get(symbol)
+            if quote:
+                return quote
+        
         # Get the last candle
         candles = self.get_candles(symbol, timeframe='1d', limit=1)
         
@@ -312,35 +667,115 @@ class MarketDataService:
         last_candle = candles[0]
         price = last_candle['close']
         
-        # Add bid/ask spread (0.1% typical)
-        spread = price * 0.001
+        # Base spread model of the order book, on the class tick grid
+        asset_info = self._get_asset_info(symbol) or {'class': 'stock', 'volatility': 'medium'}
+        bid, ask = order_book.quote_sides(
+            price, asset_info['class'], self._get_volatility_multiplier(asset_info.get('volatility', 'medium')),
+        )
         
         return {
             'symbol': symbol.upper(),
             'price': price,
-            'bid': round(price - spread/2, 2),
-            'ask': round(price + spread/2, 2),
+            'bid': bid,
+            'ask': ask,
             'timestamp': last_candle['time']
         }
     
-    def search_assets(self, query='', asset_class='all'):
-        """Search for tradeable assets"""
-        results = []
+    def get_order_book(self, symbol, levels=order_book.LEVELS):
+        """Synthetic Level-2 book for a symbol, or None if it has no book.
         
-        # Search in relevant asset classes
-        if asset_class == 'all':
-            search_lists = list(self.SYMBOLS.values())
+        Only the seeded engine keeps a book (built per tick with the snapshot).
+        """
+        if self.engine != 'seeded':
+            return None
+        return self.snapshot.depth(symbol, levels)
+    
+    def simulate_fill(self, symbol, side, quantity):
+        """Market-order fill against the current book: {'price', 'filled', 'levels', 'last'} or None"""
+        if self.engine != 'seeded':
+            return None
+        return self.snapshot.fill(symbol, side, quantity)
+    
+    def get_quotes(self, symbols=None):
+        """Get current quotes for many symbols (all symbols when None)"""
+        if self.engine != 'seeded':
+            symbols = symbols if symbols is not None else self.snapshot.symbols
+            return [self.get_quote(symbol) for symbol in symbols]
+        
+        now_ms = time.time() * 1000
+        quotes = self.snapshot.get_many(symbols, now_ms=now_ms)
+        if symbols is not None and len(quotes) < len(symbols):
+            # Symbols outside the universe are priced individually, stamped
+            # with the batch's tick like the snapshot quotes
+            tick = price_process.tick_time(now_ms)
+            known = {quote['symbol'] for quote in quotes}
+            for symbol in symbols:
+                if symbol.upper() not in known:
+                    quote = self.get_quote(symbol)
+                    if 'timestamp' in quote:
+                        quote['timestamp'] = tick
+                    quotes.append(quote)
+        return quotes
+    
+    def search_assets(self, query='', asset_class='all'):
+        """Search for tradeable assets (ranked, top 10 when a query is given)"""
+        return self.search_index.search(query, asset_class, limit=10)
+    
+    def get_indicators(self, symbol, timeframe='1d'):
+        """Latest indicator values with the forming bar included, or None if there
+        isn't enough history.
+        
+        The seeded engine keeps incremental indicator state on a short
+        rolling series per registry symbol, so a call only folds in the bars
+        completed since the previous one. Other engines (and symbols outside
+        the registry) run the batch API over a fresh window.
+        """
+        asset_info = self._get_asset_info(symbol) or {'class': 'stock', 'volatility': 'medium'}
+        if timeframe not in self.TIMEFRAME_INTERVALS:
+            timeframe = '1d'
+        
+        if self.engine != 'seeded' or registry.get(symbol) is None:
+            candles = self.get_candles(symbol, timeframe=timeframe, limit=30)
+            if len(candles) < 15:
+                return None
+            closes = np.array([c['close'] for c in candles])
+            highs = np.array([c['high'] for c in candles])
+            lows = np.array([c['low'] for c in candles])
+            macd_line, macd_signal, macd_hist = indicators.macd(closes)
+            bb_middle, bb_upper, bb_lower = indicators.bollinger(closes)
+            values = {
+                'rsi': indicators.rsi(closes)[-1],
+                'ma9': indicators.sma(closes, 9)[-1],
+                'ma21': indicators.sma(closes, 21)[-1],
+                'macd': macd_line[-1],
+                'macd_signal': macd_signal[-1],
+                'macd_hist': macd_hist[-1],
+                'atr': indicators.atr(highs, lows, closes)[-1],
+                'bb_middle': bb_middle[-1],
+                'bb_upper': bb_upper[-1],
+                'bb_lower': bb_lower[-1],
+            }
+            values = {k: None if math.isnan(v) else float(v) for k, v in values.items()}
+            recent = closes[-self.RANGE_LOOKBACK:].tolist()
         else:
-            search_lists = [self.SYMBOLS.get(asset_class, [])]
-        
-        query_lower = query.lower() if query else ''
-        
-        for symbol_list in search_lists:
-            for asset in symbol_list:
-                if not query_lower or query_lower in asset['symbol'].lower() or query_lower in asset['name'].lower():
-                    results.append(asset)
-        
-        return results if not query else results[:10]
+            symbol = symbol.upper()
+            interval_ms = int(self.TIMEFRAME_INTERVALS[timeframe].total_seconds() * 1000)
+            now_ms = int(time.time() * 1000)
+            last_bucket = price_process.bucket_index(timeframe, interval_ms, now_ms)
+            live = self._live_candle(symbol, asset_info, timeframe, interval_ms, last_bucket, now_ms)[0]
+            decimals = 4 if asset_info['class'] == 'forex' else 2
+            with self._series_lock:
+                rolling = self._indicator_series(symbol, asset_info, timeframe, interval_ms)
+                rolling.advance(last_bucket - 1)
+                values = rolling.indicators.peek(live['high'], live['low'], live['close'])
+                history = rolling.tail(self.RANGE_LOOKBACK - 1)['close']
+            recent = np.round(history, decimals).tolist() + [live['close']]
+        
+        values['current_price'] = recent[-1]
+        values['prev_price'] = recent[-2] if len(recent) >= 2 else recent[-1]
+        values['range_high'] = max(recent)
+        values['range_low'] = min(recent)
+        return values
     
     def get_rtt_coaching(self, symbol, side='buy', free_mode=False):
         """
@@ -348,10 +783,8 @@ class MarketDataService:
         Returns trade recommendation with reasoning and point bias
         If free_mode=True, provides analysis without restrictive warnings
         """
-        # Get historical data for indicators
-        candles = self.get_candles(symbol, timeframe='1d', limit=30)
-        
-        if len(candles) < 15:
+        analysis = self._rtt_analysis(symbol)
+        if analysis is None:
             return {
                 'action': 'HOLD',
                 'tag': 'insufficient-data',
@@ -362,23 +795,46 @@ class MarketDataService:
                 'ma21': None,
                 'coaching_tips': []
             }
+        return self._rtt_for_side(analysis, side, free_mode)
+    
+    def get_rtt_coaching_many(self, symbols, side='buy', free_mode=False):
+        """RTT coaching for a watchlist, as (symbol, coaching) pairs"""
+        return [(symbol.upper(), self.get_rtt_coaching(symbol, side, free_mode)) for symbol in symbols]
+    
+    def _rtt_analysis(self, symbol):
+        """Side-independent RTT analysis, cached per daily bucket and price tick.
         
-        # Calculate RSI(14)
-        rsi = self._calculate_rsi([c['close'] for c in candles], 14)
-        
-        # Calculate moving averages
-        closes = [c['close'] for c in candles]
-        ma9 = self._calculate_sma(closes, 9)
-        ma21 = self._calculate_sma(closes, 21)
-        
-        current_price = closes[-1]
-        prev_price = closes[-2] if len(closes) >= 2 else current_price
+        Indicators include the forming daily bar, so the result can only be
+        reused until the next price tick; every side/free-mode variant within
+        the tick is derived from the same cached analysis. Don't mutate.
+        """
+        symbol = symbol.upper()
+        now_ms = int(time.time() * 1000)
+        tick = price_process.tick_time(now_ms)
+        day_ms = int(self.TIMEFRAME_INTERVALS['1d'].total_seconds() * 1000)
+        key = ('rtt', symbol, price_process.bucket_index('1d', day_ms, now_ms), tick)
+        analysis = self.cache.get(key, now_ms)
+        if analysis is None:
+            analysis = self._build_rtt_analysis(symbol)
+            self.cache.put(key, analysis, expires_at_ms=tick + price_process.TICK_MS, size=self.RTT_CACHE_BYTES)
+        # Cached as False so insufficient data isn't recomputed within the tick
+        return analysis or None
+    
+    def _build_rtt_analysis(self, symbol):
+        # Indicators over daily bars (forming bar included)
+        values = self.get_indicators(symbol, timeframe='1d')
+        if values is None or values['rsi'] is None:
+            return False
+        
+        rsi = values['rsi']
+        ma9 = values['ma9']
+        ma21 = values['ma21']
+        current_price = values['current_price']
+        prev_price = values['prev_price']
         
         # Calculate range position (stretched)
-        lookback = min(20, len(closes))
-        recent = closes[-lookback:]
-        hi = max(recent)
-        lo = min(recent)
+        hi = values['range_high']
+        lo = values['range_low']
         range_size = hi - lo if hi > lo else 1
         stretched = (current_price - lo) / range_size  # 0..1
         
@@ -387,77 +843,106 @@ class MarketDataService:
         asset_class = asset_info.get('class', 'stock') if asset_info else 'stock'
         is_open, market_msg = self.is_market_open(asset_class)
         
-        # Check time of day for stock/index trading
-        coaching_tips = []
-        now = datetime.now(ZoneInfo('America/New_York'))
-        hour = now.hour
-        
-        # Time-of-day warnings (only if not free mode)
-        if not free_mode and asset_class in ['stock', 'index']:
+        # Time-of-day warning for stock/index trading (shown outside free mode)
+        session_tip = None
+        hour = market_calendar.local_hour(time.time() * 1000)
+        if asset_class in ['stock', 'index']:
             if not is_open:
-                coaching_tips.append(f"⏰ {market_msg}")
+                session_tip = f"⏰ {market_msg}"
             elif 9 <= hour < 10:
-                coaching_tips.append("🌅 Market just opened - High volatility! Use smaller position sizes.")
+                session_tip = "🌅 Market just opened - High volatility! Use smaller position sizes."
             elif 15 <= hour <= 16:
-                coaching_tips.append("🌆 Market closing soon - Volatility spikes. Consider waiting for next session.")
+                session_tip = "🌆 Market closing soon - Volatility spikes. Consider waiting for next session."
         
-        # RTT Decision Logic (with wider thresholds to avoid flip-flopping)
-        action = 'HOLD'
+        # RTT signal (with wider thresholds to avoid flip-flopping)
         tag = 'neutral'
+        # Overbought (75+ RSI - raised from 72 for more stability)
+        if rsi >= 75:
+            tag = 'overbought'
+        # Oversold (25- RSI - lowered from 28 for more stability)
+        elif rsi <= 25:
+            tag = 'oversold'
+        # Trend up + price above MA9 (requires clearer confirmation)
+        elif ma9 and ma21 and ma9 > ma21 * 1.02 and current_price >= ma9 * 1.005 and stretched > 0.60:
+            tag = 'uptrend'
+        # Trend down (requires clearer confirmation)
+        elif ma9 and ma21 and ma9 < ma21 * 0.98 and current_price < ma9 * 0.995:
+            tag = 'downtrend'
+        # Near resistance (raised threshold from 0.90)
+        elif stretched > 0.92:
+            tag = 'near-resistance'
+        
+        # Strong momentum (raised threshold from 3% to 5% to catch only significant moves)
+        momentum = None
+        if abs(current_price - prev_price) / prev_price > 0.05:
+            momentum = 'up' if current_price > prev_price else 'down'
+        
+        return {
+            'tag': tag,
+            'rsi': rsi,
+            'ma9': ma9,
+            'ma21': ma21,
+            'current_price': current_price,
+            'momentum': momentum,
+            'session_tip': session_tip,
+            'market_open': is_open,
+            'market_status': market_msg,
+        }
+    
+    def _rtt_for_side(self, analysis, side, free_mode):
+        """Action, reason, score bias and tips for one side of a cached analysis"""
+        tag = analysis['tag']
+        rsi = analysis['rsi']
+        ma9 = analysis['ma9']
+        ma21 = analysis['ma21']
+        
+        coaching_tips = []
+        if not free_mode and analysis['session_tip']:
+            coaching_tips.append(analysis['session_tip'])
+        
+        action = 'HOLD'
         reason = 'No strong signal. Focus on risk management and patience.'
         score_bias = 0
         
-        # Overbought warning (75+ RSI - raised from 72 for more stability)
-        if rsi >= 75:
+        if tag == 'overbought':
             action = "DON'T BUY" if side == 'buy' else "CONSIDER SELL"
-            tag = 'overbought'
             reason = f'RSI is high ({rsi:.0f}). Buying now often means you\'re late; wait for a pullback or cleaner entry.'
             score_bias = -2 if side == 'buy' else 2
             if not free_mode:
                 coaching_tips.append("📈 Overbought: Most beginners buy here and lose. Wait for a dip.")
         
-        # Oversold opportunity (25- RSI - lowered from 28 for more stability)
-        elif rsi <= 25:
+        elif tag == 'oversold':
             action = 'CAUTIOUS BUY' if side == 'buy' else "DON'T SELL"
-            tag = 'oversold'
             reason = f'RSI is low ({rsi:.0f}). Could bounce, but use small size + a stop-loss.'
             score_bias = 1 if side == 'buy' else -1
             if not free_mode:
                 coaching_tips.append("📉 Oversold: Could bounce, but set a STOP LOSS below recent low!")
         
-        # Trend up + price above MA9 (requires clearer confirmation)
-        elif ma9 and ma21 and ma9 > ma21 * 1.02 and current_price >= ma9 * 1.005 and stretched > 0.60:
+        elif tag == 'uptrend':
             action = 'BUY (trend)' if side == 'buy' else 'HOLD'
-            tag = 'uptrend'
             reason = 'Trend looks up (MA9 > MA21). Price is above MA9 — better odds than random entries. Still size small.'
             score_bias = 3 if side == 'buy' else 0
             if not free_mode:
                 coaching_tips.append("✅ Uptrend confirmed. Use 1-2% position size. Set stop below MA9.")
         
-        # Trend down warning (requires clearer confirmation)
-        elif ma9 and ma21 and ma9 < ma21 * 0.98 and current_price < ma9 * 0.995:
+        elif tag == 'downtrend':
             action = "DON'T BUY" if side == 'buy' else 'CONSIDER SELL'
-            tag = 'downtrend'
             reason = 'Trend looks down (MA9 < MA21). Better to wait — most beginners lose trying to catch falling moves.'
             score_bias = -2 if side == 'buy' else 1
             if not free_mode:
                 coaching_tips.append("⚠️ Downtrend: Don't try to catch a falling knife!")
         
-        # Near resistance (raised threshold from 0.90)
-        elif stretched > 0.92:
+        elif tag == 'near-resistance':
             action = 'WAIT'
-            tag = 'near-resistance'
             reason = 'Price is near recent highs. If it fails here, it can drop fast. Wait for breakout confirmation (and then a retest).'
             score_bias = -1
             if not free_mode:
                 coaching_tips.append("🚧 Near resistance: Wait for clear breakout + retest.")
         
-        # Strong momentum check (raised threshold from 3% to 5% to catch only significant moves)
-        if abs(current_price - prev_price) / prev_price > 0.05:  # 5%+ move (not 3%)
-            if current_price > prev_price:
-                coaching_tips.append("🚀 Strong upward momentum - but don't chase! Wait for pullback.")
-            else:
-                coaching_tips.append("💥 Strong downward move - let it settle before entering.")
+        if analysis['momentum'] == 'up':
+            coaching_tips.append("🚀 Strong upward momentum - but don't chase! Wait for pullback.")
+        elif analysis['momentum'] == 'down':
+            coaching_tips.append("💥 Strong downward move - let it settle before entering.")
         
         # Position sizing advice (always show)
         if side == 'buy' and not free_mode:
@@ -474,45 +959,8 @@ class MarketDataService:
             'rsi': round(rsi, 1) if rsi else None,
             'ma9': round(ma9, 2) if ma9 else None,
             'ma21': round(ma21, 2) if ma21 else None,
-            'current_price': round(current_price, 2),
+            'current_price': round(analysis['current_price'], 2),
             'coaching_tips': coaching_tips,
-            'market_open': is_open,
-            'market_status': market_msg
+            'market_open': analysis['market_open'],
+            'market_status': analysis['market_status']
         }
-    
-    def _calculate_rsi(self, prices, period=14):
-        """Calculate RSI indicator"""
-        if len(prices) < period + 1:
-            return 50  # Neutral if not enough data
-        
-        gains = []
-        losses = []
-        
-        for i in range(1, len(prices)):
-            change = prices[i] - prices[i-1]
-            if change >= 0:
-                gains.append(change)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(abs(change))
-        
-        if len(gains) < period:
-            return 50
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
-    
-    def _calculate_sma(self, prices, period):
-        """Calculate Simple Moving Average"""
-        if len(prices) < period:
-            return None
-        return sum(prices[-period:]) / period
@@ -0,0 +1,218 @@
+"""Correlated multi-asset pricing - sector factors and index baskets.
+
+Every symbol's log price is a weighted sum of unit seeded noise paths
+(``price_process.log_level``): the Cholesky factor of a sector-factor
+correlation matrix mixes a few shared factor paths into the symbol's sector
+factor, and the symbol's own path carries the idiosyncratic part::
+
+    level = vol * (loading * sum_k L[sector, k] * F_k + sqrt(1 - loading^2) * e_symbol)
+
+The mix has unit variance, so each symbol keeps its old marginal behaviour
+while stocks in one sector (and, more weakly, the whole market) move together.
+Indices are weighted baskets of their constituents' price relatives.
+
+Prices stay a pure function of (symbol, time): the whole-market snapshot
+evaluates every path once per tick, a candle series only the paths its symbol
+needs, and both accumulate in the same order so they agree bit for bit.
+"""
+import numpy as np
+
+from app.services import price_process
+
+
+FACTORS = ('tech', 'cyclical', 'defensive', 'crypto', 'usd')
+
+# Correlation between factor paths (order of FACTORS)
+FACTOR_CORRELATION = np.array([
+    [1.00, 0.70, 0.50, 0.35, -0.10],
+    [0.70, 1.00, 0.60, 0.25, -0.10],
+    [0.50, 0.60, 1.00, 0.10, -0.05],
+    [0.35, 0.25, 0.10, 1.00, -0.15],
+    [-0.10, -0.10, -0.05, -0.15, 1.00],
+])
+FACTOR_CHOLESKY = np.linalg.cholesky(FACTOR_CORRELATION)
+
+# Sector -> (factor, loading); loading^2 is the share of variance from the factor
+SECTOR_FACTORS = {
+    'Retail Electronics': ('tech', 0.55),
+    'Consumer Tech': ('tech', 0.70),
+    'EV / Auto': ('cyclical', 0.55),
+    'E-comm / Cloud': ('tech', 0.70),
+    'Streaming': ('tech', 0.60),
+    'Semiconductors': ('tech', 0.75),
+    'Search / Ads': ('tech', 0.70),
+    'Social': ('tech', 0.65),
+    'Cloud': ('tech', 0.70),
+    'Fintech': ('tech', 0.60),
+    'Healthcare': ('defensive', 0.60),
+    'Logistics': ('cyclical', 0.65),
+    'Industrial': ('cyclical', 0.70),
+    'Delivery': ('cyclical', 0.55),
+    'Home Goods': ('defensive', 0.60),
+    'Cybersecurity': ('tech', 0.65),
+    'Clean Energy': ('cyclical', 0.50),
+    'Banking': ('cyclical', 0.65),
+    'Transport': ('cyclical', 0.65),
+    'Entertainment': ('defensive', 0.50),
+    'Meme': ('crypto', 0.50),
+    'FX Cross': ('usd', 0.0),
+}
+
+# Fallback by asset class; forex loads on the dollar with the sign of the USX leg
+CLASS_FACTORS = {
+    'stock': ('cyclical', 0.60),
+    'crypto': ('crypto', 0.75),
+    'forex': ('usd', 0.70),
+}
+
+# Index -> {constituent: weight}; weights sum to 1
+INDEX_BASKETS = {
+    'TOP500': {'PRTC': 0.16, 'FNDT': 0.14, 'RNBX': 0.12, 'NRCP': 0.10, 'FNLK': 0.10,
+               'CLND': 0.08, 'NVBK': 0.08, 'MDCR': 0.08, 'BLDF': 0.07, 'VLTR': 0.07},
+    'TCH100': {'PRTC': 0.20, 'NRCP': 0.18, 'FNDT': 0.16, 'CLND': 0.14, 'FNLK': 0.12,
+               'BYTS': 0.10, 'STRM': 0.10},
+    'MEGA30': {'PRTC': 0.25, 'FNDT': 0.20, 'RNBX': 0.20, 'NVBK': 0.15, 'MDCR': 0.20},
+    'GE20': {'SLRG': 0.40, 'VLTR': 0.35, 'MTRL': 0.25},
+    'GLB40': {'SMBY': 0.10, 'ARLF': 0.15, 'BLDF': 0.15, 'NVBK': 0.15, 'MTRL': 0.15,
+              'HMHV': 0.10, 'CPOP': 0.10, 'FRCT': 0.10},
+}
+
+
+def factor_loading(symbol, sector, asset_class):
+    """(factor, signed loading) for a symbol"""
+    factor, loading = SECTOR_FACTORS.get(sector) or CLASS_FACTORS.get(asset_class, ('cyclical', 0.0))
+    if factor == 'usd':
+        if symbol.endswith('USX'):
+            loading = -loading  # USX is the quote currency: a stronger dollar lowers the price
+        elif not symbol.startswith('USX'):
+            loading = 0.0
+    return factor, loading
+
+
+class FactorModel:
+    """Prices for a fixed asset universe driven by shared factor paths.
+
+    ``weights[i, k]`` is symbol i's coefficient on unit path k; a path is a
+    (seed, crypto) pair evaluated with ``price_process.log_level``. With
+    ``correlated=False`` every symbol uses only its own path (independent walks).
+    """
+
+    def __init__(self, assets, volatility_multiplier, correlated=True):
+        """
+        Args:
+            assets: asset dicts with 'symbol', 'sector', 'class' and 'volatility'
+            volatility_multiplier: callable(volatility_label) -> float
+            correlated: mix in sector factors and price indices as baskets
+        """
+        self.correlated = correlated
+        self.symbols = [asset['symbol'].upper() for asset in assets]
+        self.rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+        classes = [asset['class'] for asset in assets]
+        self.asset_classes = classes
+        self.volatility = np.array([volatility_multiplier(asset.get('volatility', 'medium')) for asset in assets])
+        self.forex = np.array([c == 'forex' for c in classes])
+        self.base = np.array([price_process.base_price(s, c) for s, c in zip(self.symbols, classes)])
+
+        paths = {}  # (seed, crypto) -> column
+        entries = []  # (row, column, weight)
+
+        def column(seed, crypto):
+            return paths.setdefault((seed, crypto), len(paths))
+
+        for i, (symbol, asset) in enumerate(zip(self.symbols, assets)):
+            vol = self.volatility[i]
+            crypto = asset['class'] == 'crypto'
+            loading = 0.0
+            if correlated:
+                factor, loading = factor_loading(symbol, asset.get('sector'), asset['class'])
+                f = FACTORS.index(factor)
+                for k in range(f + 1):
+                    if FACTOR_CHOLESKY[f, k] != 0.0 and loading != 0.0:
+                        seed = price_process.stable_seed('factor', FACTORS[k])
+                        entries.append((i, column(seed, crypto), vol * loading * FACTOR_CHOLESKY[f, k]))
+            entries.append((i, column(price_process.stable_seed(symbol), crypto), vol * np.sqrt(1.0 - loading ** 2)))
+
+        self.path_seeds = np.array([seed for seed, _ in paths], dtype=np.uint64)
+        self.path_crypto = np.array([crypto for _, crypto in paths], dtype=bool)
+        self.weights = np.zeros((len(self.symbols), len(paths)))
+        for i, k, w in entries:
+            self.weights[i, k] = w
+        # Per symbol: path columns in accumulation order
+        self._columns = [np.flatnonzero(row) for row in self.weights]
+
+        # Index rows -> (constituent rows, weights)
+        self.baskets = {}
+        if correlated:
+            for symbol, members in INDEX_BASKETS.items():
+                if symbol in self.rows and all(m in self.rows for m in members):
+                    self.baskets[self.rows[symbol]] = (
+                        [self.rows[m] for m in members], np.array(list(members.values())),
+                    )
+
+    def __contains__(self, symbol):
+        return symbol.upper() in self.rows
+
+    def _levels(self, rows, unit):
+        """Log levels of ``rows`` from unit path values ``unit(column)``.
+
+        Accumulates column by column in ascending order; the snapshot does
+        the same across all symbols at once, so results match exactly.
+        """
+        levels = []
+        for i in rows:
+            level = 0.0
+            for k in self._columns[i]:
+                level = level + self.weights[i, k] * unit(k)
+            levels.append(level)
+        return levels
+
+    def log_levels(self, symbol, times_ms):
+        """Log price offsets from the base price for one symbol at each time (epoch ms)"""
+        row = self.rows[symbol.upper()]
+        times_ms = np.asarray(times_ms, dtype=np.int64)
+        members = self.baskets.get(row)
+        rows = members[0] if members else [row]
+
+        cache = {}
+
+        def unit(k):
+            if k not in cache:
+                cache[k] = price_process.log_level(
+                    int(self.path_seeds[k]), times_ms, 1.0, bool(self.path_crypto[k]),
+                )
+            return cache[k]
+
+        levels = self._levels(rows, unit)
+        if not members:
+            return np.zeros(times_ms.shape) + levels[0]
+        return self._basket_level(levels, members[1])
+
+    @staticmethod
+    def _basket_level(member_levels, weights):
+        """Log level of a basket of price relatives exp(level_i)"""
+        total = 0.0
+        for level, w in zip(member_levels, weights):
+            total = total + w * np.exp(level)
+        return np.log(total)
+
+    def prices(self, symbol, times_ms):
+        """Prices for one symbol at each time (epoch ms)"""
+        row = self.rows[symbol.upper()]
+        return np.maximum(0.01, self.base[row] * np.exp(self.log_levels(symbol, times_ms)))
+
+    def prices_at(self, time_ms):
+        """Prices for the whole universe (order of ``symbols``) at one time.
+
+        All factor and idiosyncratic paths are evaluated in one batched
+        ``log_level`` call, then mixed column by column across every symbol.
+        """
+        times = np.full(len(self.path_seeds), int(time_ms), dtype=np.int64)
+        unit = price_process.log_level(self.path_seeds, times, 1.0, self.path_crypto)
+
+        levels = np.zeros(len(self.symbols))
+        for k in range(len(unit)):
+            levels = levels + self.weights[:, k] * unit[k]
+        # Symbols without path k add an exact 0.0, leaving their sum unchanged
+        for row, (members, weights) in self.baskets.items():
+            levels[row] = self._basket_level([levels[m:m + 1] for m in members], weights)[0]
+        return np.maximum(0.01, self.base * np.exp(levels))
@@ -0,0 +1,261 @@
+"""Market replay - past sessions served through a virtual clock.
+
+A ``ReplayBuffer`` holds one symbol's completed bars for a past window,
+computed once (from the candle store or the seeded process, exactly like
+live history) and shared by every replay of that window in the process. The
+forming bar is precomputed a bucket at a time - its state at every price tick
+in one vectorized pass - so a cursor read is an index into shared arrays.
+
+A ``ReplaySession`` is only (window, speed, wall-clock start), and all of it
+is encoded in the session id. Any worker can serve any session without
+shared state, and an idle cursor costs nothing: its virtual time is
+``start + (now - started_at) * speed``, stopping at the window end.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.services import candle_engine, order_book, price_process
+
+
+class ReplayError(ValueError):
+    """Invalid replay request or session id"""
+
+
+class ReplayBuffer:
+    """Completed bars of one symbol/timeframe window, shared by its replays"""
+
+    # Forming bars are built for about CHUNK_TICKS ticks at a time (whole
+    # buckets); chunks are kept per buffer up to FORMING_MAX_TICKS rows
+    CHUNK_TICKS = 4096
+    FORMING_MAX_TICKS = 65536
+
+    def __init__(self, service, symbol, timeframe, first_bucket, last_bucket):
+        self.service = service
+        self.symbol = symbol.upper()
+        self.timeframe = timeframe
+        self.interval_ms = int(service.TIMEFRAME_INTERVALS[timeframe].total_seconds() * 1000)
+        self.first_bucket = first_bucket
+        self.last_bucket = last_bucket
+        self.start_ms = int(price_process.bucket_start(timeframe, self.interval_ms, first_bucket))
+        self.end_ms = int(price_process.bucket_start(timeframe, self.interval_ms, last_bucket + 1))
+
+        info = service._get_asset_info(self.symbol) or {'class': 'stock', 'volatility': 'medium'}
+        self.asset_class = info['class']
+        self.volatility_mult = service._get_volatility_multiplier(info.get('volatility', 'medium'))
+        self.decimals = 4 if self.asset_class == 'forex' else 2
+        bars = service.get_bars(self.symbol, timeframe, first_bucket, last_bucket)
+        self.candles = candle_engine.to_candle_dicts(bars, self.decimals)
+        bucket_ticks = self.interval_ms // price_process.TICK_MS
+        self._chunk_buckets = max(1, self.CHUNK_TICKS // bucket_ticks)
+        self._chunk_ticks = self._chunk_buckets * bucket_ticks
+        self._forming = OrderedDict()  # chunk -> per-tick forming bar rows
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.candles)
+
+    def completed(self, virtual_ms):
+        """Number of window bars completed at ``virtual_ms``"""
+        if virtual_ms >= self.end_ms:
+            return len(self.candles)
+        bucket = price_process.bucket_index(self.timeframe, self.interval_ms, virtual_ms)
+        return max(0, min(len(self.candles), bucket - self.first_bucket))
+
+    def forming(self, virtual_ms):
+        """Candle forming at ``virtual_ms``, or None outside the window"""
+        if virtual_ms >= self.end_ms or virtual_ms < self.start_ms:
+            return None
+        tick = price_process.tick_time(virtual_ms)
+        index = (tick - self.start_ms) // price_process.TICK_MS
+        chunk = index // self._chunk_ticks
+        times, prices, volumes = self._forming_chunk(chunk)
+        i = index - chunk * self._chunk_ticks
+        o, h, l, c = prices[i].tolist()
+        return {'time': int(times[i]), 'open': o, 'high': h, 'low': l, 'close': c, 'volume': int(volumes[i])}
+
+    def _forming_chunk(self, chunk):
+        """(times, rounded OHLC rows, volumes) of the forming bar at each tick of a chunk of buckets"""
+        with self._lock:
+            rows = self._forming.get(chunk)
+            if rows is not None:
+                self._forming.move_to_end(chunk)
+                return rows
+        first = self.first_bucket + chunk * self._chunk_buckets
+        last = min(self.last_bucket, first + self._chunk_buckets - 1)
+        bars = self.service.get_forming_bars(self.symbol, self.timeframe, first, last)
+        # Same rounding as candle_engine.to_candle_dicts
+        prices = np.round(np.stack((bars['open'], bars['high'], bars['low'], bars['close']), axis=1), self.decimals)
+        rows = (bars['time'], prices, bars['volume'])
+        with self._lock:
+            self._forming[chunk] = rows
+            while len(self._forming) > 1 and len(self._forming) * self._chunk_ticks > self.FORMING_MAX_TICKS:
+                self._forming.popitem(last=False)
+        return rows
+
+
+class ReplaySession:
+    """One replay cursor over a shared buffer; all state is in its id"""
+
+    __slots__ = ('buffer', 'speed', 'started_ms')
+
+    def __init__(self, buffer, speed, started_ms):
+        self.buffer = buffer
+        self.speed = speed
+        self.started_ms = int(started_ms)
+
+    @property
+    def id(self):
+        b = self.buffer
+        return f'{b.symbol}_{b.timeframe}_{b.first_bucket}_{b.last_bucket}_{self.speed:g}_{self.started_ms}'
+
+    def virtual_time(self, now_ms=None):
+        """Virtual clock (epoch ms), capped at the window end"""
+        now_ms = now_ms if now_ms is not None else time.time() * 1000
+        elapsed = max(0.0, now_ms - self.started_ms) * self.speed
+        return int(min(self.buffer.end_ms, self.buffer.start_ms + elapsed))
+
+    def finished(self, now_ms=None):
+        return self.virtual_time(now_ms) >= self.buffer.end_ms
+
+    def candles(self, limit=120, since=None, now_ms=None):
+        """Candles as the live endpoint would have returned them at the virtual time.
+
+        Completed bars first, then the forming bar (until the window ends).
+        With ``since`` only candles whose time is >= since are returned.
+        """
+        if limit <= 0:
+            return []
+        virtual_ms = self.virtual_time(now_ms)
+        buffer = self.buffer
+        forming = buffer.forming(virtual_ms)
+        done = buffer.completed(virtual_ms)
+        first = max(0, done - limit + (1 if forming else 0))
+        if since is not None:
+            first = max(first, buffer.completed(since))
+        candles = buffer.candles[first:done]
+        if forming is not None and (since is None or forming['time'] >= since):
+            candles = candles + [forming]
+        return candles
+
+    def quote(self, now_ms=None):
+        """Quote at the virtual time: the last price with the base spread model"""
+        virtual_ms = self.virtual_time(now_ms)
+        buffer = self.buffer
+        candle = buffer.forming(virtual_ms)
+        if candle is None:
+            candle = buffer.candles[-1]
+        price = candle['close']
+        bid, ask = order_book.quote_sides(price, buffer.asset_class, buffer.volatility_mult)
+        return {
+            'symbol': buffer.symbol,
+            'price': price,
+            'bid': bid,
+            'ask': ask,
+            'timestamp': price_process.tick_time(virtual_ms),
+        }
+
+    def state(self, now_ms=None):
+        """Session description for the API"""
+        buffer = self.buffer
+        return {
+            'id': self.id,
+            'symbol': buffer.symbol,
+            'timeframe': buffer.timeframe,
+            'start': buffer.start_ms,
+            'end': buffer.end_ms,
+            'bars': len(buffer),
+            'speed': self.speed,
+            'started_at': self.started_ms,
+            'virtual_time': self.virtual_time(now_ms),
+            'finished': self.finished(now_ms),
+        }
+
+
+class ReplayManager:
+    """Creates and resolves replay sessions; buffers live in the service's cache"""
+
+    def __init__(self, service, max_bars=20000, max_speed=100.0):
+        self.service = service
+        self.max_bars = max_bars
+        self.max_speed = max_speed
+
+    def init_app(self, app):
+        """Apply replay settings from the Flask config"""
+        self.max_bars = int(app.config.get('MARKET_REPLAY_MAX_BARS', self.max_bars))
+        self.max_speed = float(app.config.get('MARKET_REPLAY_MAX_SPEED', self.max_speed))
+
+    def create(self, symbol, timeframe, start_ms, end_ms=None, bars=None, speed=1.0, now_ms=None):
+        """New session replaying ``symbol`` from ``start_ms`` to ``end_ms`` (or for ``bars`` bars).
+
+        Raises ReplayError for unknown symbols, bad speeds or windows that
+        are not entirely in the past.
+        """
+        now_ms = int(now_ms if now_ms is not None else time.time() * 1000)
+        if timeframe not in self.service.TIMEFRAME_INTERVALS:
+            raise ReplayError(f'Unknown timeframe: {timeframe}')
+        interval_ms = int(self.service.TIMEFRAME_INTERVALS[timeframe].total_seconds() * 1000)
+        first = price_process.bucket_index(timeframe, interval_ms, start_ms)
+        if end_ms is not None:
+            last = price_process.bucket_index(timeframe, interval_ms, end_ms - 1)
+        elif bars is not None:
+            last = first + int(bars) - 1
+        else:
+            last = first + self.window_limit(timeframe) - 1
+        # Only completed history can be replayed
+        last = min(last, price_process.bucket_index(timeframe, interval_ms, now_ms) - 1)
+        return self._session(symbol, timeframe, first, last, speed, now_ms)
+
+    def window_limit(self, timeframe):
+        """Most bars one window may hold.
+
+        Resampled timeframes are built from base bars, so they get the same
+        ``RESAMPLE_BASE_BARS // ratio`` bound as the service's rolling series.
+        """
+        service = self.service
+        source = service.RESAMPLE_SOURCES.get(timeframe)
+        if source is None:
+            return self.max_bars
+        ratio = service.TIMEFRAME_INTERVALS[timeframe] // service.TIMEFRAME_INTERVALS[source]
+        return max(1, min(self.max_bars, service.RESAMPLE_BASE_BARS // ratio))
+
+    def get(self, session_id):
+        """Session for an id from ``create``; raises ReplayError if it is malformed"""
+        try:
+            symbol, timeframe, first, last, speed, started = session_id.split('_')
+            return self._session(symbol, timeframe, int(first), int(last), float(speed), int(started))
+        except ValueError as e:
+            raise ReplayError(str(e) if isinstance(e, ReplayError) else 'Invalid replay session') from None
+
+    def _session(self, symbol, timeframe, first, last, speed, started_ms):
+        if self.service.engine != 'seeded':
+            raise ReplayError('Replay needs the seeded candle engine')
+        if timeframe not in self.service.TIMEFRAME_INTERVALS:
+            raise ReplayError(f'Unknown timeframe: {timeframe}')
+        if self.service._get_asset_info(symbol) is None:
+            raise ReplayError(f'Unknown symbol: {symbol}')
+        if not 1.0 <= speed <= self.max_speed:
+            raise ReplayError(f'Speed must be between 1 and {self.max_speed:g}')
+        if last < first:
+            raise ReplayError('Replay window must end in the past')
+        limit = self.window_limit(timeframe)
+        if last - first + 1 > limit:
+            raise ReplayError(f'Replay window is limited to {limit} {timeframe} bars')
+        return ReplaySession(self.buffer(symbol, timeframe, first, last), speed, started_ms)
+
+    def buffer(self, symbol, timeframe, first_bucket, last_bucket):
+        """Shared buffer for a window, built on first use.
+
+        Buffers go in the service's market cache; history never changes,
+        so they only leave it by LRU eviction.
+        """
+        symbol = symbol.upper()
+        cache = self.service.cache
+        key = ('replay', symbol, timeframe, first_bucket, last_bucket)
+        buffer = cache.get(key)
+        if buffer is None:
+            buffer = ReplayBuffer(self.service, symbol, timeframe, first_bucket, last_bucket)
+            cache.put(key, buffer, expires_at_ms=float('inf'), size=len(buffer) * self.service.CANDLE_CACHE_BYTES)
+        return buffer
@@ -0,0 +1,119 @@
+"""Market-wide quote snapshot - every symbol priced in one vectorized pass"""
+import threading
+import time
+
+import numpy as np
+
+from app.services import order_book, price_process
+
+
+class MarketSnapshot:
+    """Quotes for the whole asset universe at the current price tick.
+
+    The first read in a new tick prices every symbol with a single
+    ``FactorModel.prices_at`` call (one batched path evaluation plus the
+    factor mix) and rebuilds the synthetic order book, whose touch gives
+    the bid/ask; later reads in the same tick are dict lookups. Prices match
+    the seeded candles bit for bit.
+
+    The stored tick only moves forward. Reads pinned to an older tick (a
+    ``now_ms`` in the past) are priced on the side with a throwaway book, so
+    they can't roll the snapshot back under concurrent current-time readers.
+    """
+
+    def __init__(self, model):
+        """
+        Args:
+            model: ``market_factors.FactorModel`` pricing the asset universe
+        """
+        self.model = model
+        self.symbols = model.symbols
+        self._forex = model.forex
+        self.book = order_book.OrderBook(model.symbols, model.asset_classes, model.volatility)
+        self._mids = {}  # recent tick -> mid prices, for the book's regime lookback
+
+        self.tick = None
+        self._quotes = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, now_ms=None):
+        """Recompute all quotes if the price tick has moved forward; returns the tick of ``now_ms``"""
+        now_ms = now_ms if now_ms is not None else time.time() * 1000
+        tick = price_process.tick_time(now_ms)
+        if self.tick is not None and tick <= self.tick:
+            return tick
+
+        with self._lock:
+            if self.tick is None or tick > self.tick:
+                self._quotes = self._build(tick, self.book, self._mid)
+                self._mids = {t: p for t, p in self._mids.items() if tick - order_book.REGIME_LOOKBACK_MS <= t <= tick}
+                self.tick = tick
+        return tick
+
+    def _prices(self, tick):
+        """Prices at a tick with the candle path's rounding (np.round, 4 decimals for forex)"""
+        prices = self.model.prices_at(tick)
+        return np.where(self._forex, np.round(prices, 4), np.round(prices, 2))
+
+    def _mid(self, tick):
+        """Rounded prices at a tick, reusing the last minute of ticks"""
+        prices = self._mids.get(tick)
+        if prices is None:
+            prices = self._prices(tick)
+            self._mids[tick] = prices
+        return prices
+
+    def _past(self, tick):
+        """(quotes, book) at an older tick, leaving the stored tick alone"""
+        book = order_book.OrderBook(self.symbols, self.model.asset_classes, self.model.volatility)
+        return self._build(tick, book, self._prices), book
+
+    def _quotes_at(self, tick):
+        with self._lock:
+            if tick == self.tick:
+                return self._quotes
+        return self._past(tick)[0]
+
+    def _build(self, tick, book, mid):
+        prices = mid(tick)
+        reference = mid(tick - order_book.REGIME_LOOKBACK_MS)
+        book.update(tick, prices, reference)
+        bids, asks = book.touch()
+
+        quotes = {}
+        for symbol, price, bid, ask in zip(self.symbols, prices.tolist(), bids.tolist(), asks.tolist()):
+            quotes[symbol] = {
+                'symbol': symbol,
+                'price': price,
+                'bid': bid,
+                'ask': ask,
+                'timestamp': tick,
+            }
+        return quotes
+
+    def get(self, symbol, now_ms=None):
+        """Quote for one symbol, or None if it isn't in the universe"""
+        return self._quotes_at(self.refresh(now_ms)).get(symbol.upper())
+
+    def depth(self, symbol, levels=None, now_ms=None):
+        """Order book levels for one symbol at the current tick, or None"""
+        tick = self.refresh(now_ms)
+        with self._lock:
+            if tick == self.tick:
+                return self.book.depth(symbol, levels)
+        return self._past(tick)[1].depth(symbol, levels)
+
+    def fill(self, symbol, side, quantity, now_ms=None):
+        """Simulated market-order fill against the current book (see ``OrderBook.fill``)"""
+        tick = self.refresh(now_ms)
+        with self._lock:
+            if tick == self.tick:
+                return self.book.fill(symbol, side, quantity)
+        return self._past(tick)[1].fill(symbol, side, quantity)
+
+    def get_many(self, symbols=None, now_ms=None):
+        """Quotes for the given symbols (all when None), skipping unknown ones"""
+        quotes = self._quotes_at(self.refresh(now_ms))
+        if symbols is None:
+            return list(quotes.values())
+        return [quotes[s.upper()] for s in symbols if s.upper() in quotes]
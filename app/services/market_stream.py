@@ -0,0 +1,206 @@
+"""Server-Sent Events market stream - one shared producer per process.
+
+A single daemon thread wakes on every price tick, refreshes the market
+snapshot, serializes each quote (and each subscribed candle delta) once, and
+fans the frames out to subscriber queues. Slow clients never block the
+producer: each queue is bounded and the oldest frame is dropped when it is
+full (quotes are snapshots, so the newest frame supersedes older ones).
+
+Replay subscribers (see market_replay.py) get their session's quote and
+candles at its virtual time on the same ticks, then an ``end`` event once
+the window is over.
+
+Streams hold a connection open, so serve them from a threaded or async
+gunicorn worker class (gthread/gevent), not sync workers.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+
+from app.services import price_process
+
+
+logger = logging.getLogger(__name__)
+
+
+class StreamFullError(Exception):
+    """Raised when the per-process stream connection cap is reached"""
+
+
+class Subscription:
+    """One SSE client: its symbol filter and bounded outbox"""
+
+    def __init__(self, hub, symbols, timeframe, queue_size, replay=None):
+        self.hub = hub
+        self.symbols = symbols  # None = all symbols
+        self.timeframe = timeframe
+        self.replay = replay  # ReplaySession or None
+        self.replay_sent = None  # time of the newest replay candle sent
+        self.replay_done = False
+        self.outbox = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def push(self, frame):
+        """Enqueue a frame, dropping the oldest one if the client is behind"""
+        while True:
+            try:
+                self.outbox.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self.outbox.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def events(self):
+        """Generator of SSE-formatted frames; unsubscribes when the client leaves"""
+        try:
+            yield f'retry: {price_process.TICK_MS}\n\n'
+            while True:
+                try:
+                    yield self.outbox.get(timeout=self.hub.heartbeat_seconds)
+                except queue.Empty:
+                    yield ': heartbeat\n\n'
+        finally:
+            self.hub.unsubscribe(self)
+
+
+class MarketStreamHub:
+    """Shared quote/candle producer for all SSE connections in this process"""
+
+    def __init__(self, service, max_connections=8, queue_size=16, heartbeat_seconds=15):
+        self.service = service
+        self.max_connections = max_connections
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def init_app(self, app):
+        """Apply stream settings from the Flask config"""
+        self.max_connections = int(app.config.get('MARKET_STREAM_MAX_CONNECTIONS', self.max_connections))
+        self.heartbeat_seconds = int(app.config.get('MARKET_STREAM_HEARTBEAT_SECONDS', self.heartbeat_seconds))
+
+    @property
+    def connections(self):
+        return len(self._subscribers)
+
+    def subscribe(self, symbols=None, timeframe=None, replay=None):
+        """Register a client; raises StreamFullError at the connection cap.
+
+        With ``replay`` (a ReplaySession) the client follows that session
+        instead of the live market.
+        """
+        symbols = [s.upper() for s in symbols] if symbols else None
+        if timeframe is not None and timeframe not in self.service.TIMEFRAME_INTERVALS:
+            timeframe = None
+        sub = Subscription(self, symbols, timeframe, self.queue_size, replay)
+        with self._lock:
+            if len(self._subscribers) >= self.max_connections:
+                raise StreamFullError('Too many market streams on this server, try again shortly.')
+            self._subscribers.add(sub)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='market-stream', daemon=True)
+                self._thread.start()
+
+        # Send the current state right away instead of waiting for the next tick;
+        # if that fails the client never gets its generator, so free the slot here
+        try:
+            self.publish([sub])
+        except Exception:
+            self.unsubscribe(sub)
+            raise
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def _run(self):
+        while True:
+            now_ms = time.time() * 1000
+            next_tick = price_process.tick_time(now_ms) + price_process.TICK_MS
+            time.sleep(max(0.0, (next_tick - now_ms) / 1000))
+            with self._lock:
+                subscribers = list(self._subscribers)
+            if not subscribers:
+                continue
+            try:
+                self.publish(subscribers)
+            except Exception:
+                logger.exception('Market stream publish failed')
+
+    def publish(self, subscribers):
+        """Serialize this tick's frames once and fan them out"""
+        replays = [sub for sub in subscribers if sub.replay is not None]
+        if replays:
+            now_ms = time.time() * 1000
+            for sub in replays:
+                self._publish_replay(sub, now_ms)
+            subscribers = [sub for sub in subscribers if sub.replay is None]
+            if not subscribers:
+                return
+
+        self.service.snapshot.refresh()
+        tick = self.service.snapshot.tick
+        quote_json = {
+            quote['symbol']: json.dumps(quote, separators=(',', ':'))
+            for quote in self.service.snapshot.get_many()
+        }
+        all_quotes = None
+        candle_json = {}
+
+        for sub in subscribers:
+            if sub.symbols is None:
+                if all_quotes is None:
+                    all_quotes = self._frame('quotes', tick, 'quotes', quote_json.values())
+                sub.push(all_quotes)
+                symbols = list(quote_json)
+            else:
+                symbols = [s for s in sub.symbols if s in quote_json]
+                sub.push(self._frame('quotes', tick, 'quotes', (quote_json[s] for s in symbols)))
+
+            if sub.timeframe:
+                for symbol in symbols:
+                    key = (symbol, sub.timeframe)
+                    if key not in candle_json:
+                        candle_json[key] = self._candles_json(symbol, sub.timeframe)
+                sub.push(self._frame(
+                    'candles', tick, 'series', (candle_json[(s, sub.timeframe)] for s in symbols),
+                ))
+
+    def _publish_replay(self, sub, now_ms):
+        """Quote and new candles of a replay session at its virtual time"""
+        if sub.replay_done:
+            return
+        session = sub.replay
+        quote = session.quote(now_ms)
+        candles = session.candles(since=sub.replay_sent, now_ms=now_ms)
+        tick = quote['timestamp']
+        sub.push(self._frame('quotes', tick, 'quotes', [json.dumps(quote, separators=(',', ':'))]))
+        if candles:
+            sub.replay_sent = candles[-1]['time']
+            series = json.dumps(
+                {'symbol': session.buffer.symbol, 'timeframe': session.buffer.timeframe, 'candles': candles},
+                separators=(',', ':'),
+            )
+            sub.push(self._frame('candles', tick, 'series', [series]))
+        if session.finished(now_ms):
+            sub.push(f'event: end\ndata: {json.dumps(session.state(now_ms), separators=(",", ":"))}\n\n')
+            sub.replay_done = True
+
+    @staticmethod
+    def _frame(event, tick, field, items):
+        return f'event: {event}\ndata: {{"timestamp":{tick},"{field}":[{",".join(items)}]}}\n\n'
+
+    def _candles_json(self, symbol, timeframe):
+        # Last completed bar + forming bar; clients merge by time
+        candles = self.service.get_candles(symbol, timeframe=timeframe, limit=2)
+        return json.dumps(
+            {'symbol': symbol, 'timeframe': timeframe, 'candles': candles},
+            separators=(',', ':'),
+        )
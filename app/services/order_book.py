@@ -0,0 +1,193 @@
+"""Synthetic Level-2 order book - depth and spreads for the whole universe per tick.
+
+Every symbol gets ``LEVELS`` bid and ask levels around its mid price, held
+in preallocated (symbols x levels) arrays and rebuilt in one vectorized pass
+per price tick:
+
+- Tick sizes and lot sizes depend on the asset class (forex quotes in pips).
+- The half spread is a per-class base in basis points, scaled by the
+  symbol's volatility label, the time-of-day volatility (stocks/indices),
+  the volatility regime (size of the last minute's move) and widened while
+  the symbol's market is closed.
+- Level sizes are a per-class notional that grows with distance from the
+  touch, with hashed noise keyed by (symbol, tick), so every worker builds
+  the same book for the same tick.
+"""
+import math
+
+import numpy as np
+
+from app.services import price_process
+from app.services.market_calendar import market_calendar
+
+
+LEVELS = 10
+
+TICK_SIZES = {'stock': 0.01, 'index': 0.05, 'crypto': 0.01, 'forex': 0.0001}
+LOT_SIZES = {'stock': 1.0, 'index': 1.0, 'crypto': 0.0001, 'forex': 1000.0}
+
+# Half spread at the touch in basis points, for a 'medium' (1.5%) volatility label
+BASE_HALF_SPREAD_BPS = {'stock': 2.0, 'index': 1.0, 'crypto': 4.0, 'forex': 0.5}
+REFERENCE_VOLATILITY = 0.015
+
+# Notional per level at the touch; deeper levels hold more
+LEVEL_NOTIONAL = {'stock': 50000.0, 'index': 250000.0, 'crypto': 100000.0, 'forex': 1000000.0}
+LEVEL_GROWTH = 0.5
+
+# Volatility regime: |1-minute log move| per unit of volatility multiplier that
+# counts as normal; bigger moves widen the spread by sqrt(ratio), capped
+REGIME_UNIT = 0.005
+MAX_REGIME_WIDEN = 3.0
+REGIME_LOOKBACK_MS = 60 * 1000
+
+# Closed markets: wider and thinner
+CLOSED_WIDEN = 3.0
+CLOSED_DEPTH = 0.3
+
+_STREAM_SIZE = 11
+
+
+def tick_decimals(tick_size):
+    return max(0, -int(math.floor(math.log10(tick_size) + 1e-9)))
+
+
+def touch_prices(mid, half_spread, tick_size, decimals):
+    """Best bid/ask: mid -/+ half spread snapped outwards to the tick grid (arrays or scalars)"""
+    scale = 10.0 ** decimals
+    bid = np.round(np.floor((mid - half_spread) / tick_size + 1e-9) * tick_size * scale) / scale
+    ask = np.round(np.ceil((mid + half_spread) / tick_size - 1e-9) * tick_size * scale) / scale
+    return bid, ask
+
+
+def quote_sides(price, asset_class, volatility_mult=REFERENCE_VOLATILITY):
+    """(bid, ask) for a single price with the base spread model (no depth, no regime)"""
+    tick_size = TICK_SIZES.get(asset_class, TICK_SIZES['stock'])
+    bps = BASE_HALF_SPREAD_BPS.get(asset_class, BASE_HALF_SPREAD_BPS['stock'])
+    half = price * bps * 1e-4 * volatility_mult / REFERENCE_VOLATILITY
+    bid, ask = touch_prices(np.float64(price), half, tick_size, tick_decimals(tick_size))
+    return float(bid), float(ask)
+
+
+class OrderBook:
+    """Preallocated book for a fixed symbol list, rebuilt per tick by ``update``"""
+
+    def __init__(self, symbols, asset_classes, volatility_mults, levels=LEVELS):
+        self.symbols = list(symbols)
+        self.rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.levels = levels
+        self.asset_classes = list(asset_classes)
+        n = len(self.symbols)
+
+        classes = self.asset_classes
+        self.tick_size = np.array([TICK_SIZES.get(c, TICK_SIZES['stock']) for c in classes])
+        self.decimals = np.array([tick_decimals(t) for t in self.tick_size])
+        self.lot_size = np.array([LOT_SIZES.get(c, LOT_SIZES['stock']) for c in classes])
+        self._lot_decimals = np.array([tick_decimals(lot) for lot in self.lot_size])
+        vol = np.asarray(volatility_mults, dtype=np.float64)
+        self.volatility = vol
+        self.base_half = np.array([BASE_HALF_SPREAD_BPS.get(c, 2.0) for c in classes]) * 1e-4 * vol / REFERENCE_VOLATILITY
+        self.notional = np.array([LEVEL_NOTIONAL.get(c, LEVEL_NOTIONAL['stock']) for c in classes])
+        self.session_tod = np.array([c in ('stock', 'index') for c in classes])
+        self._class_masks = {c: np.array([x == c for x in classes]) for c in set(classes)}
+        self._seeds = np.array([price_process.stable_seed(s, 'book') for s in self.symbols], dtype=np.uint64)[:, None]
+        self._depth_scale = (1.0 + LEVEL_GROWTH * np.arange(levels))[None, :]
+        self._level_index = np.arange(levels)[None, :]
+
+        self.tick = None
+        self.mid = np.zeros(n)
+        self.bid_price = np.zeros((n, levels))
+        self.bid_size = np.zeros((n, levels))
+        self.ask_price = np.zeros((n, levels))
+        self.ask_size = np.zeros((n, levels))
+        self.half_spread = np.zeros(n)
+
+    def update(self, tick, mid, reference):
+        """Rebuild every level for ``tick``.
+
+        Args:
+            tick: price tick (epoch ms)
+            mid: mid prices (symbol order)
+            reference: mid prices ``REGIME_LOOKBACK_MS`` earlier, for the regime
+        """
+        mid = np.asarray(mid, dtype=np.float64)
+        widen = np.ones(mid.size)
+        widen[self.session_tod] = market_calendar.volatility_at(tick)
+        closed = np.zeros(mid.size, dtype=bool)
+        for asset_class, mask in self._class_masks.items():
+            if not market_calendar.is_open(asset_class, tick):
+                closed |= mask
+        widen[closed] *= CLOSED_WIDEN
+        move = np.abs(np.log(mid / np.asarray(reference, dtype=np.float64)))
+        widen *= np.clip(np.sqrt(move / (self.volatility * REGIME_UNIT)), 1.0, MAX_REGIME_WIDEN)
+
+        half = mid * self.base_half * widen
+        bid, ask = touch_prices(mid, half, self.tick_size, self.decimals)
+        step = np.maximum(1.0, np.ceil(half / self.tick_size)) * self.tick_size
+        offsets = self._level_index * step[:, None]
+        scale = 10.0 ** self.decimals[:, None]
+        self.bid_price[:] = np.maximum(np.round((bid[:, None] - offsets) * scale) / scale, self.tick_size[:, None])
+        self.ask_price[:] = np.round((ask[:, None] + offsets) * scale) / scale
+
+        # Sizes: notional / price in lots, thinner when the market is closed
+        noise = price_process.hash_uniform(
+            self._seeds, _STREAM_SIZE, (tick // price_process.TICK_MS) * 2 * self.levels + np.arange(2 * self.levels)[None, :],
+        )
+        depth = (self.notional / mid)[:, None] * self._depth_scale
+        depth = np.where(closed[:, None], depth * CLOSED_DEPTH, depth)
+        lots = self.lot_size[:, None]
+        lot_scale = 10.0 ** self._lot_decimals[:, None]
+        self.bid_size[:] = np.round(np.maximum(1.0, np.floor(depth * (0.5 + noise[:, :self.levels]) / lots)) * lots * lot_scale) / lot_scale
+        self.ask_size[:] = np.round(np.maximum(1.0, np.floor(depth * (0.5 + noise[:, self.levels:]) / lots)) * lots * lot_scale) / lot_scale
+
+        self.mid[:] = mid
+        self.half_spread[:] = half
+        self.tick = tick
+
+    def touch(self):
+        """(best bid, best ask) arrays in symbol order"""
+        return self.bid_price[:, 0], self.ask_price[:, 0]
+
+    def depth(self, symbol, levels=None):
+        """Book snapshot for one symbol, or None if it isn't in the book"""
+        row = self.rows.get(symbol.upper())
+        if row is None or self.tick is None:
+            return None
+        levels = min(self.levels, levels or self.levels)
+        bid, ask = self.bid_price[row, 0], self.ask_price[row, 0]
+        decimals = int(self.decimals[row])
+        return {
+            'symbol': self.symbols[row],
+            'timestamp': self.tick,
+            'tick_size': float(self.tick_size[row]),
+            'mid': float(self.mid[row]),
+            'spread': round(float(ask - bid), decimals),
+            'bids': np.stack((self.bid_price[row, :levels], self.bid_size[row, :levels]), axis=1).tolist(),
+            'asks': np.stack((self.ask_price[row, :levels], self.ask_size[row, :levels]), axis=1).tolist(),
+        }
+
+    def fill(self, symbol, side, quantity):
+        """Walk the book for a market order: {'price': VWAP, 'filled', 'levels', 'last'} or None.
+
+        Buys lift the asks, sells hit the bids; ``last`` is the worst level
+        price reached. ``filled`` is less than ``quantity`` when the order is
+        larger than the visible depth.
+        """
+        row = self.rows.get(symbol.upper())
+        if row is None or self.tick is None or quantity <= 0:
+            return None
+        if side == 'buy':
+            prices, sizes = self.ask_price[row], self.ask_size[row]
+        else:
+            prices, sizes = self.bid_price[row], self.bid_size[row]
+        before = np.concatenate(([0.0], np.cumsum(sizes)[:-1]))
+        taken = np.clip(quantity - before, 0.0, sizes)
+        filled = float(taken.sum())
+        if filled <= 0:
+            return None
+        levels = int(np.count_nonzero(taken))
+        return {
+            'price': float((taken * prices).sum() / filled),
+            'filled': filled,
+            'levels': levels,
+            'last': float(prices[levels - 1]),
+        }
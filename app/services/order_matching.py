@@ -0,0 +1,360 @@
+"""Order matching - resting limit/stop orders and stop-loss/take-profit exits.
+
+Every resting trigger sits in its symbol's ``TriggerBook``: one heap per
+(quote side, direction). A buy limit rests below the ask and fires once the
+ask falls to it, a long's stop-loss rests below the bid, its take-profit
+above it, and so on. On each price tick a book pops only the triggers the
+new quote crossed - O(log n + k) instead of a scan of every open trade.
+Triggers of cancelled or closed trades are dropped lazily when they surface.
+
+A tick's fills are written together in one transaction: conditional bulk
+UPDATEs for entry fills and for exits, and one for the affected portfolios
+(each split into chunks of ``WRITE_CHUNK`` rows).
+The ``status`` guards turn a fill into a no-op when a manual close or
+cancel, the sweeper or an engine on another host got there first.
+
+One process per host matches: every worker starts the engine thread, but
+only the one holding an exclusive lock on ``ORDER_MATCHING_LOCK_PATH``
+runs it; the others stand by and take over if that worker exits. The
+leader indexes orders placed through any worker by loading the trades
+created since its last look on every tick, and rebuilds its books from
+the database every ``reload_seconds``.
+"""
+import heapq
+import itertools
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import and_, case, func, or_, update
+
+from app.extensions import db
+from app.models.portfolio import Portfolio
+from app.models.trade import Trade
+from app.services import price_process
+from app.services.balance_ledger import cents
+
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, every process matches
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Trades per bulk UPDATE; a CASE over many more ids gets slow on SQLite
+WRITE_CHUNK = 500
+
+ABOVE = 'above'  # fires when the quote price >= level
+BELOW = 'below'  # fires when the quote price <= level
+
+# kind -> trade side -> (quote field tested, direction)
+TRIGGERS = {
+    'limit': {'buy': ('ask', BELOW), 'sell': ('bid', ABOVE)},
+    'stop': {'buy': ('ask', ABOVE), 'sell': ('bid', BELOW)},
+    'stop_loss': {'buy': ('bid', BELOW), 'sell': ('ask', ABOVE)},
+    'take_profit': {'buy': ('bid', ABOVE), 'sell': ('ask', BELOW)},
+}
+ENTRY_KINDS = ('limit', 'stop')
+EXIT_KINDS = ('stop_loss', 'take_profit')
+
+Trigger = namedtuple('Trigger', 'seq trade_id user_id symbol side kind level size entry_price')
+Fill = namedtuple('Fill', 'trigger price')
+
+
+class TriggerBook:
+    """Resting triggers of one symbol, in one heap per (quote field, direction)"""
+
+    def __init__(self):
+        self._heaps = {(field, direction): [] for field in ('bid', 'ask') for direction in (ABOVE, BELOW)}
+
+    def __len__(self):
+        return sum(len(heap) for heap in self._heaps.values())
+
+    def push(self, field, direction, level, seq, key):
+        # Min-heaps: ABOVE by level, BELOW by -level, so the next trigger to fire is on top
+        heapq.heappush(self._heaps[(field, direction)], (level if direction == ABOVE else -level, seq, key))
+
+    def crossed(self, quote):
+        """Pop every entry the quote crossed: [(seq, key, fill price)]"""
+        out = []
+        for (field, direction), heap in self._heaps.items():
+            price = quote[field]
+            bound = price if direction == ABOVE else -price
+            while heap and heap[0][0] <= bound:
+                _, seq, key = heapq.heappop(heap)
+                out.append((seq, key, price))
+        return out
+
+
+class MatchingEngine:
+    """Per-process matching of resting orders and exits against the market snapshot"""
+
+    def __init__(self, service, reload_seconds=60, lock_path=None):
+        self.service = service
+        self.reload_seconds = reload_seconds
+        self.lock_path = lock_path or os.path.join(tempfile.gettempdir(), 'tradetutor-order-matching.lock')
+        self.enabled = True
+        self.leader = False
+        self.app = None
+        self._books = defaultdict(TriggerBook)
+        self._triggers = {}  # (trade id, kind) -> Trigger
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._lock_file = None
+        self._loaded_at = None
+        self._last_id = 0  # newest trade id looked at
+        self.fills = 0
+
+    def init_app(self, app):
+        """Apply matching settings from the Flask config"""
+        self.app = app
+        self.enabled = bool(app.config.get('ORDER_MATCHING_ENABLED', self.enabled))
+        self.reload_seconds = int(app.config.get('ORDER_MATCHING_RELOAD_SECONDS', self.reload_seconds))
+        self.lock_path = app.config.get('ORDER_MATCHING_LOCK_PATH') or self.lock_path
+
+    def start(self):
+        """Start the matching thread (once per process; it matches only while leader); no-op when disabled"""
+        if not self.enabled or self.app is None:
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='order-matching', daemon=True)
+                self._thread.start()
+
+    # --- Index ---
+
+    def add(self, trade):
+        """Index a pending order's entry trigger or an open position's exits"""
+        symbol = trade.symbol.upper()
+        base = dict(
+            trade_id=trade.id, user_id=trade.user_id, symbol=symbol, side=trade.side,
+            size=Decimal(trade.size), entry_price=Decimal(trade.entry_price),
+        )
+        if trade.status == 'pending':
+            levels = {trade.order_type: trade.trigger_price}
+        elif trade.status == 'open':
+            levels = {'stop_loss': trade.stop_loss, 'take_profit': trade.take_profit}
+        else:
+            return self.remove(trade.id)
+
+        with self._lock:
+            self._drop(trade.id)
+            for kind, level in levels.items():
+                if level is None or kind not in TRIGGERS:
+                    continue
+                trigger = Trigger(seq=next(self._seq), kind=kind, level=Decimal(level), **base)
+                field, direction = TRIGGERS[kind][trade.side]
+                self._triggers[(trade.id, kind)] = trigger
+                self._books[symbol].push(field, direction, float(level), trigger.seq, (trade.id, kind))
+
+    def remove(self, trade_id):
+        """Forget a trade's triggers (cancelled, closed or filled elsewhere)"""
+        with self._lock:
+            self._drop(trade_id)
+
+    def _drop(self, trade_id):
+        # Heap entries stay behind and are skipped when popped
+        for kind in TRIGGERS:
+            self._triggers.pop((trade_id, kind), None)
+
+    def load(self):
+        """Rebuild every book from the database: pending orders and open positions with exits"""
+        last_id = self._newest_id()
+        trades = _resting().filter(Trade.id <= last_id).all()
+        with self._lock:
+            self._books.clear()
+            self._triggers.clear()
+        for trade in trades:
+            self.add(trade)
+        self._last_id = last_id
+        self._loaded_at = time.time()
+        return len(trades)
+
+    def load_new(self):
+        """Index the resting trades created since the last look; returns how many"""
+        last_id = self._newest_id()
+        if last_id <= self._last_id:
+            return 0
+        trades = _resting().filter(Trade.id > self._last_id, Trade.id <= last_id).all()
+        for trade in trades:
+            self.add(trade)
+        self._last_id = last_id
+        return len(trades)
+
+    @staticmethod
+    def _newest_id():
+        return db.session.query(func.max(Trade.id)).scalar() or 0
+
+    @property
+    def resting(self):
+        return len(self._triggers)
+
+    # --- Matching ---
+
+    def match(self, quotes):
+        """Pop the triggers crossed by ``quotes`` (quote dicts); returns [Fill]"""
+        fills = []
+        with self._lock:
+            for quote in quotes:
+                book = self._books.get(quote.get('symbol'))
+                if not book:
+                    continue
+                for seq, key, price in book.crossed(quote):
+                    trigger = self._triggers.get(key)
+                    if trigger is None or trigger.seq != seq:
+                        continue  # stale entry
+                    # A position exits once: its other exit goes with it
+                    self._drop(trigger.trade_id)
+                    fills.append(Fill(trigger, Decimal(str(price))))
+        return fills
+
+    def step(self, now_ms=None):
+        """Match the current snapshot and write the fills; returns the applied fills"""
+        if self._loaded_at is None or time.time() - self._loaded_at >= self.reload_seconds:
+            self.load()
+        else:
+            self.load_new()
+        with self._lock:
+            # add() is public: books may be indexed from other threads meanwhile
+            symbols = [symbol for symbol, book in self._books.items() if book]
+        if not symbols:
+            return []
+        quotes = self.service.snapshot.get_many(symbols, now_ms=now_ms)
+        fills = self.match(quotes)
+        if not fills:
+            return []
+        return self.apply(fills)
+
+    def apply(self, fills):
+        """Write fills (see ``apply_fills``) and index the exits of positions they opened"""
+        applied = apply_fills(fills)
+        opened_ids = [f.trigger.trade_id for f in applied if f.trigger.kind in ENTRY_KINDS]
+        if opened_ids:
+            for trade in Trade.query.filter(Trade.id.in_(opened_ids)).all():
+                self.add(trade)
+        self.fills += len(applied)
+        return applied
+
+    def _acquire(self):
+        """Try to become this host's matching process; True once this process holds the lock"""
+        if fcntl is None:
+            return True
+        f = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._lock_file = f  # held for the life of the process
+        return True
+
+    def _run(self):
+        while not self._acquire():
+            time.sleep(self.reload_seconds)
+        self.leader = True
+        logger.info('Order matching running in process %s', os.getpid())
+        while True:
+            now_ms = time.time() * 1000
+            next_tick = price_process.tick_time(now_ms) + price_process.TICK_MS
+            time.sleep(max(0.0, (next_tick - now_ms) / 1000))
+            with self.app.app_context():
+                try:
+                    self.step()
+                except Exception:
+                    logger.exception('Order matching step failed')
+                    db.session.rollback()
+                    self._loaded_at = None  # rebuild from the database next tick
+
+
+def apply_fills(fills):
+    """Write fills in one transaction; returns those that took effect.
+
+    Entry fills open the trade at the fill price and settle a buy's cash
+    reserve (reserved at the trigger price). Exits close the position like
+    a manual close. Rows another worker already moved are left alone.
+    """
+    now = datetime.utcnow()
+    credits = defaultdict(Decimal)
+    applied = []
+
+    entries = {f.trigger.trade_id: f for f in fills if f.trigger.kind in ENTRY_KINDS}
+    for chunk in _chunks(entries):
+        opened = db.session.execute(
+            update(Trade)
+            .where(Trade.id.in_(chunk), Trade.status == 'pending')
+            .values(
+                status='open',
+                entry_price=case({i: entries[i].price for i in chunk}, value=Trade.id),
+                entry_time=now,
+            )
+            .returning(Trade.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        for trade_id in opened:
+            fill = entries[trade_id]
+            t = fill.trigger
+            if t.side == 'buy':
+                # Refund the reserve (debited at the trigger price) less the actual cost
+                credits[t.user_id] += cents(t.level * t.size) - cents(fill.price * t.size)
+            applied.append(fill)
+
+    exits = {f.trigger.trade_id: f for f in fills if f.trigger.kind in EXIT_KINDS}
+    pnl = {}
+    for trade_id, fill in exits.items():
+        t = fill.trigger
+        if t.side == 'buy':
+            pnl[trade_id] = cents((fill.price - t.entry_price) * t.size)
+        else:
+            pnl[trade_id] = cents((t.entry_price - fill.price) * t.size)
+    for chunk in _chunks(exits):
+        closed = db.session.execute(
+            update(Trade)
+            .where(Trade.id.in_(chunk), Trade.status == 'open')
+            .values(
+                status='closed',
+                exit_price=case({i: exits[i].price for i in chunk}, value=Trade.id),
+                pnl=case({i: pnl[i] for i in chunk}, value=Trade.id),
+                exit_reason=case({i: exits[i].trigger.kind for i in chunk}, value=Trade.id),
+                exit_time=now,
+            )
+            .returning(Trade.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        for trade_id in closed:
+            fill = exits[trade_id]
+            t = fill.trigger
+            # Same settlement as a manual close: principal + P&L for longs, P&L for shorts
+            credits[t.user_id] += (cents(t.entry_price * t.size) if t.side == 'buy' else 0) + pnl[trade_id]
+            applied.append(fill)
+
+    credits = {user_id: amount for user_id, amount in credits.items() if amount}
+    for chunk in _chunks(credits):
+        db.session.execute(
+            update(Portfolio)
+            .where(Portfolio.user_id.in_(chunk))
+            .values(balance=Portfolio.balance + case({u: credits[u] for u in chunk}, value=Portfolio.user_id), updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    return applied
+
+
+def _resting():
+    """Query for pending orders and open positions with an exit"""
+    return Trade.query.filter(or_(
+        Trade.status == 'pending',
+        and_(Trade.status == 'open', or_(Trade.stop_loss.isnot(None), Trade.take_profit.isnot(None))),
+    ))
+
+
+def _chunks(keys):
+    keys = list(keys)
+    for i in range(0, len(keys), WRITE_CHUNK):
+        yield keys[i:i + WRITE_CHUNK]
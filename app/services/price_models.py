@@ -0,0 +1,236 @@
+"""Pluggable price processes for the random-walk candle engine.
+
+A model turns ``n`` candles into per-candle growth factors (close / open);
+``candle_engine.generate_ohlcv`` compounds them into a price path and adds
+wicks and volume. Every model is vectorized over the whole series and is
+scaled so the per-candle log-return std is ``STEP_SCALE * volatility_mult``
+(times the time-of-day factor), like the original loop's Gaussian moves.
+
+- ``legacy``: the original mix - Gaussian moves, spikes, sine trend, momentum
+- ``gbm``: geometric Brownian motion
+- ``merton``: GBM plus compound-Poisson log-normal jumps (fat tails)
+- ``regime``: two-state Markov regime-switching volatility (calm / turbulent)
+- ``garch``: GARCH(1,1) conditional variance (volatility clustering)
+
+Models are picked per asset class and volatility label by a ``ModelTable``
+built from a spec such as ``"default=gbm,crypto=merton,stock:high=garch"``.
+"""
+import math
+
+import numpy as np
+
+
+# Per-candle log-return std per unit of volatility multiplier
+STEP_SCALE = 0.3
+
+
+class PriceModel:
+    """Base class: per-candle growth factors for a series"""
+
+    name = None
+
+    def growth(self, n, volatility_mult, rng, tod=None, asset_class='stock'):
+        """Close/open ratio of each of ``n`` candles.
+
+        Args:
+            n: number of candles
+            volatility_mult: volatility multiplier of the asset's label
+            rng: ``numpy.random.Generator``
+            tod: optional per-candle time-of-day volatility factors
+            asset_class: 'stock', 'crypto', 'forex' or 'index'
+        """
+        sigma = STEP_SCALE * volatility_mult * (np.ones(n) if tod is None else tod)
+        return np.exp(self.log_returns(n, sigma, rng))
+
+    def log_returns(self, n, sigma, rng):
+        """Per-candle log returns for per-candle volatility ``sigma`` (array)"""
+        raise NotImplementedError
+
+
+class LegacyModel(PriceModel):
+    """Original engine: Gaussian moves with 5% spikes, sine trend bias and momentum carry"""
+
+    name = 'legacy'
+
+    def growth(self, n, volatility_mult, rng, tod=None, asset_class='stock'):
+        tod = np.ones(n) if tod is None else tod
+
+        # Countdown index (limit .. 1) to match the loop's trend cycle phase
+        countdown = np.arange(n, 0, -1)
+        trend_bias = np.sin((countdown % 40) / 40 * 2 * np.pi) * 0.05
+        if asset_class == 'crypto':
+            trend_bias *= 2.0
+
+        # Gaussian move (30% of volatility as std dev) with 5% spike events
+        gaussian = rng.standard_normal(n) * STEP_SCALE
+        spikes = rng.random(n) < 0.05
+        gaussian[spikes] *= rng.uniform(2.0, 3.0, spikes.sum())
+
+        # Moves are proportional to the current price, so the path is a product
+        returns = volatility_mult * tod * (gaussian + trend_bias)
+
+        # Momentum carry on every candle but the first
+        momentum = 1 + 0.3 * rng.random(n)
+        momentum[0] = 1.0
+        returns *= momentum
+
+        return np.maximum(1 + returns, 1e-6)
+
+
+class GBM(PriceModel):
+    """Geometric Brownian motion; ``drift`` is the per-candle expected simple return"""
+
+    name = 'gbm'
+
+    def __init__(self, drift=0.0):
+        self.drift = drift
+
+    def log_returns(self, n, sigma, rng):
+        return self.drift - 0.5 * sigma ** 2 + sigma * rng.standard_normal(n)
+
+
+class MertonJump(PriceModel):
+    """Merton jump-diffusion.
+
+    Jumps arrive with probability ~``intensity`` per candle; log jump sizes
+    are normal with mean/std given in units of the candle's sigma. The
+    diffusion variance is reduced so the total variance stays sigma^2, and
+    the drift is compensated so the expected growth is 1.
+    """
+
+    name = 'merton'
+
+    def __init__(self, intensity=0.02, jump_mean=-0.5, jump_std=4.0):
+        self.intensity = intensity
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+
+    def log_returns(self, n, sigma, rng):
+        jump_var = self.intensity * (self.jump_mean ** 2 + self.jump_std ** 2)
+        diffusion = sigma * math.sqrt(max(1.0 - jump_var, 0.05))
+        counts = rng.poisson(self.intensity, n)
+        jumps = sigma * (counts * self.jump_mean + np.sqrt(counts) * self.jump_std * rng.standard_normal(n))
+        mu, sd = self.jump_mean * sigma, self.jump_std * sigma
+        compensator = self.intensity * (np.exp(mu + 0.5 * sd ** 2) - 1)
+        return -0.5 * diffusion ** 2 - compensator + diffusion * rng.standard_normal(n) + jumps
+
+
+class RegimeSwitching(PriceModel):
+    """Two-state Markov chain switching between calm and turbulent volatility.
+
+    Regime durations are geometric, so the state path is drawn as run
+    lengths and expanded with ``np.repeat``. Regime multipliers are
+    normalized so the stationary variance is sigma^2.
+    """
+
+    name = 'regime'
+
+    def __init__(self, calm=0.7, turbulent=2.0, stay_calm=0.98, stay_turbulent=0.90):
+        self.calm = calm
+        self.turbulent = turbulent
+        self.stay = (stay_calm, stay_turbulent)
+
+    def states(self, n, rng):
+        """0/1 (calm/turbulent) regime of each candle"""
+        leave = 1.0 - np.array(self.stay)
+        p_turbulent = leave[0] / leave.sum()
+        state = int(rng.random() < p_turbulent)
+        # Enough alternating runs to cover n candles with high probability; top up if not
+        runs = max(8, int(n * leave.max() * 2) + 8)
+        out = []
+        covered = 0
+        while covered < n:
+            order = (state + np.arange(runs)) % 2
+            lengths = rng.geometric(leave[order])
+            out.append(np.repeat(order, lengths))
+            covered += int(lengths.sum())
+            state = 1 - int(order[-1])
+        return np.concatenate(out)[:n]
+
+    def log_returns(self, n, sigma, rng):
+        leave = 1.0 - np.array(self.stay)
+        p_turbulent = leave[0] / leave.sum()
+        norm = math.sqrt((1 - p_turbulent) * self.calm ** 2 + p_turbulent * self.turbulent ** 2)
+        scale = np.where(self.states(n, rng) == 1, self.turbulent, self.calm) / norm
+        step = sigma * scale
+        return -0.5 * step ** 2 + step * rng.standard_normal(n)
+
+
+class Garch(PriceModel):
+    """GARCH(1,1): var[t] = omega + alpha * r[t-1]^2 + beta * var[t-1].
+
+    omega is set so the unconditional variance is sigma^2. With r = sqrt(var) * z
+    the variance is the linear recursion var[t] = omega + (alpha z[t-1]^2 + beta) var[t-1],
+    evaluated in blocks with cumulative products instead of a Python loop.
+    """
+
+    name = 'garch'
+
+    def __init__(self, alpha=0.08, beta=0.90):
+        self.alpha = alpha
+        self.beta = beta
+
+    def variances(self, z, sigma):
+        """Conditional variance path for standard shocks ``z``"""
+        n = z.size
+        unconditional = sigma ** 2 * np.ones(n)
+        omega = unconditional * (1 - self.alpha - self.beta)
+        coeff = np.empty(n)
+        coeff[0] = 0.0
+        coeff[1:] = self.alpha * z[:-1] ** 2 + self.beta
+        # The coefficient on var[t-1] is in unconditional units; rescale for time-of-day
+        coeff[1:] *= unconditional[1:] / unconditional[:-1]
+
+        var = np.empty(n)
+        if not n:
+            return var
+        block = 64  # products of 64 coefficients stay well inside float range
+        prev = unconditional[0]
+        for t in range(0, n, block):
+            c = coeff[t:t + block].copy()
+            if t == 0:
+                c[0] = 1.0
+                w = np.concatenate(([0.0], omega[1:block]))
+            else:
+                w = omega[t:t + block]
+            products = np.cumprod(c)
+            segment = products * (prev + np.cumsum(w / products))
+            var[t:t + segment.size] = segment
+            prev = segment[-1]
+        return var
+
+    def log_returns(self, n, sigma, rng):
+        z = rng.standard_normal(n)
+        var = self.variances(z, np.asarray(sigma, dtype=np.float64))
+        return -0.5 * var + np.sqrt(var) * z
+
+
+MODELS = {model.name: model for model in (LegacyModel, GBM, MertonJump, RegimeSwitching, Garch)}
+
+
+class ModelTable:
+    """Price model per asset class / volatility label.
+
+    Spec entries are ``key=model`` with key ``class:label``, ``class`` or
+    ``default``; the most specific match wins.
+    """
+
+    def __init__(self, spec='default=legacy'):
+        self.spec = spec
+        self._models = {}
+        for entry in spec.split(','):
+            entry = entry.strip()
+            if not entry:
+                continue
+            key, _, name = entry.partition('=')
+            name = name.strip().lower()
+            if name not in MODELS:
+                raise ValueError(f'Unknown price model: {name}')
+            self._models[key.strip().lower()] = MODELS[name]()
+        self._models.setdefault('default', LegacyModel())
+
+    def select(self, asset_class, volatility_label='medium'):
+        models = self._models
+        return (models.get(f'{asset_class}:{volatility_label}')
+                or models.get(asset_class)
+                or models['default'])
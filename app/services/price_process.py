@@ -0,0 +1,268 @@
+"""Deterministic seeded price process.
+
+Every price is a pure function of (symbol, time), so any worker can compute
+any candle in O(1) without shared state or a path to replay:
+
+- The log price is a sum of value-noise octaves on a 1-minute lattice
+  (spacings 1m, 2m, 4m, ... ~4 years). Lattice values come from a
+  counter-based hash of (symbol seed, octave, lattice index), and octave
+  amplitudes grow with sqrt(spacing) so the path behaves like a bounded
+  random walk around the symbol's base price.
+- Candle wicks and volume are keyed by (symbol, timeframe, bucket index).
+- Live prices are quantized to ``TICK_MS`` so every worker quotes the same
+  price within a tick.
+"""
+import hashlib
+
+import numpy as np
+
+from app.services.candle_engine import INTRADAY_TIMEFRAMES, time_of_day_volatility
+
+
+TICK_MS = 5000
+LATTICE_MS = 60 * 1000
+OCTAVES = 22
+
+# Octaves up to 1h spacing get time-of-day volatility; 64m+ carry the trend
+INTRADAY_OCTAVES = 6
+
+# Scales unit-amplitude noise so the 1-day log move std is ~30% of the
+# asset's volatility multiplier (same as one legacy daily candle)
+_LEVEL_SCALE = 0.3 / 85.0
+
+# Base price ranges by asset class (same as MarketDataService._get_base_price)
+BASE_PRICE_RANGES = {
+    'crypto': (400, 32000),
+    'forex': (0.5, 2.2),
+    'index': (800, 5200),
+    'stock': (12, 420),
+}
+
+# Epoch-aligned buckets start on Thursday; shift weekly bars to Monday
+BUCKET_OFFSETS_MS = {
+    '1w': 4 * 24 * 3600 * 1000,
+}
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+# Hash streams
+_STREAM_LEVEL = 1
+_STREAM_SPIKE = 2
+_STREAM_BASE = 3
+_STREAM_WICK = 4
+_STREAM_VOLUME = 5
+
+
+def stable_seed(*parts):
+    """64-bit seed from string parts, stable across processes and restarts"""
+    digest = hashlib.blake2b('|'.join(str(p) for p in parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _splitmix64(x):
+    x = x + _GOLDEN
+    x = (x ^ (x >> np.uint64(30))) * _MIX_1
+    x = (x ^ (x >> np.uint64(27))) * _MIX_2
+    return x ^ (x >> np.uint64(31))
+
+
+def hash_uniform(seed, stream, index):
+    """Uniform [0, 1) floats keyed by (seed, stream, index)"""
+    index = np.asarray(index, dtype=np.int64).astype(np.uint64)
+    stream = np.asarray(stream, dtype=np.int64).astype(np.uint64)
+    with np.errstate(over='ignore'):
+        key = _splitmix64(np.asarray(seed, dtype=np.uint64) ^ _splitmix64(stream * _GOLDEN + index))
+    return (key >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def hash_normal(seed, stream, index):
+    """Standard normal floats keyed by (seed, stream, index) via Box-Muller"""
+    index = np.asarray(index, dtype=np.int64)
+    u1 = 1.0 - hash_uniform(seed, stream, index * 2)
+    u2 = hash_uniform(seed, stream, index * 2 + 1)
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2 * np.pi * u2)
+
+
+def base_price(symbol, asset_class):
+    """Deterministic starting price for a symbol within its class range"""
+    low, high = BASE_PRICE_RANGES.get(asset_class, BASE_PRICE_RANGES['stock'])
+    u = float(hash_uniform(stable_seed(symbol.upper()), _STREAM_BASE, 0))
+    return low + (high - low) * u
+
+
+def _lattice_values(seed, octaves, index, crypto):
+    """Noise values at lattice nodes.
+
+    ``octaves`` and ``index`` are parallel arrays; ``seed`` and ``crypto``
+    are scalars or arrays parallel to them.
+    """
+    spacing = np.left_shift(1, octaves)
+    values = hash_normal(seed, _STREAM_LEVEL + (octaves << 8), index) * np.sqrt(spacing)
+
+    # Occasional spike events (5% chance of a 2-3x larger value)
+    u = hash_uniform(seed, _STREAM_SPIKE + (octaves << 8), index)
+    values = np.where(u < 0.05, values * (2.0 + u * 20.0), values)
+
+    intraday = octaves < INTRADAY_OCTAVES
+    values[intraday] *= time_of_day_volatility(index[intraday] * spacing[intraday] * LATTICE_MS)
+    values[~intraday & crypto] *= 2.0  # Crypto has more dramatic trends
+    return values
+
+
+def log_level(seed, times_ms, volatility_mult, crypto=False):
+    """Log price offset from the base price at each time (epoch ms).
+
+    ``seed``, ``volatility_mult`` and ``crypto`` are either scalars (one
+    symbol at many times) or arrays parallel to ``times_ms`` (one point per
+    symbol, e.g. a market-wide snapshot). Both forms give bit-identical
+    results for the same (symbol, time).
+    """
+    position = np.asarray(times_ms, dtype=np.float64) / LATTICE_MS
+    n = position.size
+    if not n:
+        return np.zeros(position.shape)
+    per_point = np.ndim(seed) > 0
+    if per_point:
+        point_seeds = np.repeat(np.asarray(seed, dtype=np.uint64), 2)
+        point_crypto = np.repeat(np.broadcast_to(np.asarray(crypto, dtype=bool), (n,)), 2)
+
+    octaves = np.arange(OCTAVES, dtype=np.int64)
+    x = position[None, :] / np.left_shift(1, octaves)[:, None]
+    index = np.floor(x).astype(np.int64)
+    frac = x - index
+
+    # Collect every lattice node needed, then hash them all in one pass.
+    # Dense octaves share nodes between points; sparse ones fetch both ends.
+    node_octaves, node_index, node_seeds, node_crypto = [], [], [], []
+    left = np.empty(index.shape, dtype=np.int64)
+    offset = 0
+    for octave in range(OCTAVES):
+        row = index[octave]
+        lo = int(row[0]) if n == 1 else int(row.min())
+        span = int(row.max()) - lo + 2
+        if not per_point and span <= 2 * n:
+            nodes = np.arange(lo, lo + span)
+            left[octave] = offset + row - lo
+        else:
+            nodes = np.empty(2 * n, dtype=np.int64)
+            nodes[0::2] = row
+            nodes[1::2] = row + 1
+            left[octave] = offset + np.arange(0, 2 * n, 2)
+            if per_point:
+                node_seeds.append(point_seeds)
+                node_crypto.append(point_crypto)
+        node_index.append(nodes)
+        node_octaves.append(np.full(nodes.size, octave, dtype=np.int64))
+        offset += nodes.size
+
+    values = _lattice_values(
+        np.concatenate(node_seeds) if per_point else seed,
+        np.concatenate(node_octaves),
+        np.concatenate(node_index),
+        np.concatenate(node_crypto) if per_point else bool(crypto),
+    )
+    lhs = values[left]
+    rhs = values[left + 1]
+    level = (lhs + (rhs - lhs) * frac).sum(axis=0)
+    return level * volatility_mult * _LEVEL_SCALE
+
+
+def price_at(symbol, asset_class, volatility_mult, times_ms):
+    """Deterministic price for a symbol at each time (epoch ms)"""
+    seed = stable_seed(symbol.upper())
+    level = log_level(seed, times_ms, volatility_mult, asset_class == 'crypto')
+    return np.maximum(0.01, base_price(symbol, asset_class) * np.exp(level))
+
+
+def tick_time(now_ms):
+    """Quantize a wall-clock time to the start of its price tick"""
+    return (int(now_ms) // TICK_MS) * TICK_MS
+
+
+def bucket_index(timeframe, interval_ms, time_ms):
+    """Index of the timeframe bucket containing ``time_ms``"""
+    return (int(time_ms) - BUCKET_OFFSETS_MS.get(timeframe, 0)) // interval_ms
+
+
+def bucket_start(timeframe, interval_ms, index):
+    """Epoch ms at which bucket ``index`` opens (scalar or array)"""
+    return np.asarray(index, dtype=np.int64) * interval_ms + BUCKET_OFFSETS_MS.get(timeframe, 0)
+
+
+def generate_bars(symbol, asset_class, volatility_mult, timeframe, interval_ms,
+                  first_bucket, last_bucket, now_ms, model=None):
+    """OHLCV arrays for buckets ``first_bucket`` .. ``last_bucket`` (inclusive).
+
+    Each bar opens at the level of its bucket start and closes at the level of
+    the next bucket start, or at the current tick for the bar still forming.
+    Symbols in ``model`` (a ``market_factors.FactorModel``) take their prices
+    from it; others follow their own independent path.
+    """
+    symbol = symbol.upper()
+    buckets = np.arange(first_bucket, last_bucket + 1, dtype=np.int64)
+    n = buckets.size
+
+    times_ms = bucket_start(timeframe, interval_ms, buckets)
+    edges = np.empty(n + 1, dtype=np.int64)
+    edges[:n] = times_ms
+    edges[n] = times_ms[-1] + interval_ms if n else 0
+    edges = np.minimum(edges, tick_time(now_ms))
+
+    prices = _edge_prices(symbol, asset_class, volatility_mult, edges, model)
+    return _bars(symbol, timeframe, buckets, times_ms, prices[:-1], prices[1:])
+
+
+def forming_bars(symbol, asset_class, volatility_mult, timeframe, interval_ms, ticks_ms, model=None):
+    """Forming bar at each price tick in ``ticks_ms`` (sorted), for whichever bucket contains it.
+
+    Row i equals the last row of ``generate_bars(..., now_ms=ticks_ms[i])``;
+    all ticks and bucket opens are priced in one vectorized call.
+    """
+    symbol = symbol.upper()
+    ticks_ms = np.asarray(ticks_ms, dtype=np.int64)
+    buckets = (ticks_ms - BUCKET_OFFSETS_MS.get(timeframe, 0)) // interval_ms
+    opens, row = np.unique(buckets, return_inverse=True)
+    starts = bucket_start(timeframe, interval_ms, opens)
+    edges = np.concatenate((starts, ticks_ms))
+
+    prices = _edge_prices(symbol, asset_class, volatility_mult, edges, model)
+    return _bars(symbol, timeframe, buckets, starts[row], prices[:opens.size][row], prices[opens.size:])
+
+
+def _edge_prices(symbol, asset_class, volatility_mult, edges, model):
+    if model is not None and symbol in model:
+        return model.prices(symbol, edges)
+    level = log_level(stable_seed(symbol), edges, volatility_mult, asset_class == 'crypto')
+    return np.maximum(0.01, base_price(symbol, asset_class) * np.exp(level))
+
+
+def _bars(symbol, timeframe, buckets, times_ms, open_, close):
+    """OHLCV arrays from per-bar open/close prices: hashed wicks and volume"""
+    n = buckets.size
+
+    # Wicks: 5-15% of the body, 10% chance of a 2-4x spike wick
+    bar_seed = stable_seed(symbol, timeframe)
+    u = hash_uniform(bar_seed, _STREAM_WICK, buckets)
+    wick_ratio = 0.05 + u * 0.10
+    spike = hash_uniform(bar_seed, _STREAM_WICK + (1 << 8), buckets)
+    wick_ratio = np.where(spike < 0.1, wick_ratio * (2.0 + spike * 20.0), wick_ratio)
+    body = np.abs(close - open_)
+    wick = np.where(body > 0, body * wick_ratio, open_ * 0.001)
+
+    high = np.maximum(open_, close) + wick
+    low = np.maximum(0.01, np.minimum(open_, close) - wick)
+
+    tod = time_of_day_volatility(times_ms) if timeframe in INTRADAY_TIMEFRAMES else np.ones(n)
+    base_volume = 500000 + np.floor(hash_uniform(bar_seed, _STREAM_VOLUME, buckets) * 1500001)
+    volume = (base_volume * (1 + tod)).astype(np.int64)
+
+    return {
+        'time': times_ms,
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume,
+    }
@@ -0,0 +1,29 @@
+"""OHLCV resampling - aggregate a finer bar series into a coarser timeframe"""
+import numpy as np
+
+from app.services.candle_series import COLUMNS
+from app.services.price_process import BUCKET_OFFSETS_MS, bucket_start
+
+
+def resample_ohlcv(bars, timeframe, interval_ms):
+    """Aggregate time-sorted OHLCV arrays into ``timeframe`` buckets.
+
+    Vectorized group-by on the bucket index: open is the first bar's open,
+    close the last bar's close, high/low the extremes and volume the sum.
+    Buckets without any input bar are skipped. Bar times become bucket starts.
+    """
+    times = bars['time']
+    if times.size == 0:
+        return {name: bars[name][:0] for name in COLUMNS}
+
+    buckets = (times - BUCKET_OFFSETS_MS.get(timeframe, 0)) // interval_ms
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.append(starts[1:], times.size) - 1
+    return {
+        'time': bucket_start(timeframe, interval_ms, buckets[starts]),
+        'open': bars['open'][starts],
+        'high': np.maximum.reduceat(bars['high'], starts),
+        'low': np.minimum.reduceat(bars['low'], starts),
+        'close': bars['close'][ends],
+        'volume': np.add.reduceat(bars['volume'], starts),
+    }
@@ -0,0 +1,296 @@
+"""Shared market snapshot - one producer process, every worker reads the same board.
+
+The producer (a sidecar process started from the gunicorn master, see
+gunicorn.conf.py) prices the whole universe once per tick and publishes each
+symbol's quote and forming 1m bar into a memory-mapped file (put it on
+/dev/shm): a header followed by one fixed-width record per symbol.
+
+Writes are guarded by a seqlock: the writer makes the sequence number odd,
+rewrites the records, then makes it even again. Readers copy the records
+and retry if the sequence was odd or changed meanwhile, so they never see a
+half-written tick and never block the writer.
+
+Seeded prices are a pure function of time, so a worker whose board is
+missing, stale or laid out for another symbol list computes the tick itself
+and still quotes the same prices.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+
+from app.services import price_process
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'TTQUOTE1'
+HEADER = np.dtype([
+    ('magic', 'S8'),
+    ('seq', '<u8'),
+    ('tick', '<i8'),
+    ('layout', '<u8'),  # stable hash of the symbol list
+    ('count', '<u4'),
+    ('record_size', '<u4'),
+])
+RECORD = np.dtype([
+    ('price', '<f8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('bar_time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<i8'),
+])
+
+# Timeframe of the forming bar published per symbol
+BAR_TIMEFRAME = '1m'
+
+
+def layout_hash(symbols):
+    return price_process.stable_seed('quote-board', *symbols)
+
+
+class QuoteBoard:
+    """Writer side: owns the mapped file and publishes one tick at a time"""
+
+    def __init__(self, path, symbols):
+        self.symbols = list(symbols)
+        # Build the new board beside the old one and rename it into place: readers
+        # still mapping a previous board keep valid (stale) pages and re-attach
+        tmp = f'{path}.{os.getpid()}.tmp'
+        header = np.zeros(1, dtype=HEADER)
+        header['magic'] = MAGIC
+        header['layout'] = layout_hash(self.symbols)
+        header['count'] = len(self.symbols)
+        header['record_size'] = RECORD.itemsize
+        header['tick'] = -1
+        with open(tmp, 'wb') as f:
+            f.write(header.tobytes())
+            f.write(np.zeros(len(self.symbols), dtype=RECORD).tobytes())
+        os.replace(tmp, path)
+        self._header = np.memmap(path, dtype=HEADER, mode='r+', shape=(1,))
+        self._records = np.memmap(path, dtype=RECORD, mode='r+', offset=HEADER.itemsize, shape=(len(self.symbols),))
+
+    def publish(self, tick, records):
+        """Replace every record (a RECORD array in symbol order) for ``tick``"""
+        header = self._header
+        header['seq'] += 1  # odd: write in progress
+        self._records[:] = records
+        header['tick'] = tick
+        header['seq'] += 1  # even: consistent
+
+
+class SharedSnapshot:
+    """Reader side with ``MarketSnapshot``'s interface.
+
+    Quotes come from the board when it holds the current tick, otherwise
+    from the local ``fallback`` snapshot. Quote dicts are rebuilt once per
+    tick; the board read itself is a seqlock-checked copy of the records.
+    Like ``MarketSnapshot`` the stored tick only moves forward: reads pinned
+    to an older tick go to the fallback, which prices them on the side.
+    """
+
+    RETRIES = 100
+
+    def __init__(self, path, fallback):
+        self.path = path
+        self.fallback = fallback
+        self.symbols = fallback.symbols
+        self.rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._layout = layout_hash(self.symbols)
+        self._header = None
+        self._records = None
+        self._inode = None
+
+        self.tick = None
+        self._quotes = {}
+        self._bars = None  # records of the current tick when it came from the board
+        self._lock = threading.Lock()
+        self.board_ticks = 0
+        self.local_ticks = 0
+
+    def _attach(self):
+        """Map the board if it exists and matches this symbol list"""
+        try:
+            inode = os.stat(self.path).st_ino
+            header = np.memmap(self.path, dtype=HEADER, mode='r', shape=(1,))
+        except (OSError, ValueError):
+            return False
+        h = header[0]
+        if (h['magic'] != MAGIC or h['layout'] != self._layout
+                or h['count'] != len(self.symbols) or h['record_size'] != RECORD.itemsize):
+            return False
+        self._header = header
+        self._records = np.memmap(self.path, dtype=RECORD, mode='r', offset=HEADER.itemsize, shape=(len(self.symbols),))
+        self._inode = inode
+        return True
+
+    def _replaced(self):
+        """True when a new board was renamed over the one mapped here (producer restart)"""
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except OSError:
+            return False
+
+    def _read(self):
+        """(tick, records copy) from the board, or None if it is unavailable or busy"""
+        if self._header is None and not self._attach():
+            return None
+        header = self._header
+        for _ in range(self.RETRIES):
+            seq = int(header['seq'][0])
+            if seq & 1:
+                continue
+            tick = int(header['tick'][0])
+            records = np.array(self._records)
+            if int(header['seq'][0]) == seq:
+                return tick, records
+        return None
+
+    def refresh(self, now_ms=None):
+        """Load a newer tick from the board (or compute it locally); returns the tick of ``now_ms``"""
+        now_ms = now_ms if now_ms is not None else time.time() * 1000
+        tick = price_process.tick_time(now_ms)
+        if self.tick is not None and tick <= self.tick:
+            return tick
+
+        with self._lock:
+            if self.tick is None or tick > self.tick:
+                self._load(tick, now_ms)
+        return tick
+
+    def _current(self, tick):
+        """(quotes, bars) held for ``tick``, or None when it is older than the stored tick"""
+        with self._lock:
+            if tick == self.tick:
+                return self._quotes, self._bars
+        return None
+
+    def _load(self, tick, now_ms):
+        board = self._read()
+        if board is not None and board[0] != tick and self._replaced():
+            self._header = None
+            board = self._read()
+        if board is not None and board[0] == tick:
+            records = board[1]
+            self._quotes = {
+                symbol: {
+                    'symbol': symbol,
+                    'price': price,
+                    'bid': bid,
+                    'ask': ask,
+                    'timestamp': tick,
+                }
+                for symbol, price, bid, ask in zip(
+                    self.symbols, records['price'].tolist(), records['bid'].tolist(), records['ask'].tolist(),
+                )
+            }
+            self._bars = records
+            self.board_ticks += 1
+        else:
+            self.fallback.refresh(now_ms)
+            self._quotes = {quote['symbol']: quote for quote in self.fallback.get_many(now_ms=now_ms)}
+            self._bars = None
+            self.local_ticks += 1
+        self.tick = tick
+
+    def get(self, symbol, now_ms=None):
+        """Quote for one symbol, or None if it isn't in the universe"""
+        current = self._current(self.refresh(now_ms))
+        if current is None:
+            return self.fallback.get(symbol, now_ms)
+        return current[0].get(symbol.upper())
+
+    def get_many(self, symbols=None, now_ms=None):
+        """Quotes for the given symbols (all when None), skipping unknown ones"""
+        current = self._current(self.refresh(now_ms))
+        if current is None:
+            return self.fallback.get_many(symbols, now_ms)
+        quotes = current[0]
+        if symbols is None:
+            return list(quotes.values())
+        return [quotes[s.upper()] for s in symbols if s.upper() in quotes]
+
+    def depth(self, symbol, levels=None, now_ms=None):
+        """Order book levels (the board carries only the touch; depth is built locally)"""
+        return self.fallback.depth(symbol, levels, now_ms)
+
+    def fill(self, symbol, side, quantity, now_ms=None):
+        return self.fallback.fill(symbol, side, quantity, now_ms)
+
+    def bar(self, symbol, now_ms=None):
+        """Forming ``BAR_TIMEFRAME`` candle dict from the board, or None if it isn't there"""
+        current = self._current(self.refresh(now_ms))
+        row = self.rows.get(symbol.upper())
+        if current is None or current[1] is None or row is None:
+            return None
+        r = current[1][row]
+        return {
+            'time': int(r['bar_time']),
+            'open': float(r['open']),
+            'high': float(r['high']),
+            'low': float(r['low']),
+            'close': float(r['close']),
+            'volume': int(r['volume']),
+        }
+
+
+def build_records(service, tick):
+    """RECORD array for every symbol at ``tick`` using the service's local pricing"""
+    snapshot = service.snapshot
+    records = np.zeros(len(snapshot.symbols), dtype=RECORD)
+    quotes = snapshot.get_many(now_ms=tick)
+    records['price'] = [q['price'] for q in quotes]
+    records['bid'] = [q['bid'] for q in quotes]
+    records['ask'] = [q['ask'] for q in quotes]
+    for i, symbol in enumerate(snapshot.symbols):
+        # Priced at ``tick`` like the quotes, so the bar's close matches the record's price
+        candles = service.get_candles(symbol, timeframe=BAR_TIMEFRAME, limit=1, now_ms=tick)
+        if candles:
+            bar = candles[-1]
+            records[i]['bar_time'] = bar['time']
+            records[i]['open'] = bar['open']
+            records[i]['high'] = bar['high']
+            records[i]['low'] = bar['low']
+            records[i]['close'] = bar['close']
+            records[i]['volume'] = bar['volume']
+    return records
+
+
+def run_producer(path, service, stop=None):
+    """Publish every tick to the board at ``path`` until ``stop`` (an Event) is set"""
+    board = QuoteBoard(path, service.snapshot.symbols)
+    logger.info('Market snapshot producer publishing to %s', path)
+    while stop is None or not stop.is_set():
+        now_ms = time.time() * 1000
+        tick = price_process.tick_time(now_ms)
+        try:
+            board.publish(tick, build_records(service, tick))
+        except Exception:
+            logger.exception('Market snapshot publish failed')
+        now_ms = time.time() * 1000
+        time.sleep(max(0.0, (tick + price_process.TICK_MS - now_ms) / 1000))
+
+
+def _producer_main(path, config_name):
+    # This process is the writer: build the service without attaching it to the board
+    os.environ.pop('MARKET_SHARED_SNAPSHOT_PATH', None)
+    from app import create_app
+    from app.blueprints.api.routes import market_service
+    create_app(config_name)
+    run_producer(path, market_service)
+
+
+def start_producer_process(path, config_name='production'):
+    """Start the producer as a separate (spawned) process; returns the Process"""
+    process = multiprocessing.get_context('spawn').Process(
+        target=_producer_main, args=(path, config_name), name='market-snapshot-producer', daemon=True,
+    )
+    process.start()
+    return process
@@ -0,0 +1,127 @@
+"""Symbol registry - the tradeable asset universe and O(1) lookups over it"""
+from collections import namedtuple
+from types import MappingProxyType
+
+
+# 50 Fake Training Assets (legal-safe, parody names)
+SYMBOLS = {
+    'stocks': [
+        {'symbol': 'SMBY', 'name': 'SmartBuy', 'sector': 'Retail Electronics', 'class': 'stock', 'volatility': 'medium', 'tier': 'free'},
+        {'symbol': 'PRTC', 'name': 'PearTech', 'sector': 'Consumer Tech', 'class': 'stock', 'volatility': 'medium', 'tier': 'free'},
+        {'symbol': 'VLTR', 'name': 'Voltra Motors', 'sector': 'EV / Auto', 'class': 'stock', 'volatility': 'high', 'tier': 'gold'},
+        {'symbol': 'RNBX', 'name': 'RainBox', 'sector': 'E-comm / Cloud', 'class': 'stock', 'volatility': 'medium', 'tier': 'gold'},
+        {'symbol': 'STRM', 'name': 'Streamly', 'sector': 'Streaming', 'class': 'stock', 'volatility': 'medium', 'tier': 'gold'},
+        {'symbol': 'NRCP', 'name': 'NeuroChip', 'sector': 'Semiconductors', 'class': 'stock', 'volatility': 'high', 'tier': 'premium'},
+        {'symbol': 'FNDT', 'name': 'FindIt', 'sector': 'Search / Ads', 'class': 'stock', 'volatility': 'low', 'tier': 'premium'},
+        {'symbol': 'FNLK', 'name': 'FaceLink', 'sector': 'Social', 'class': 'stock', 'volatility': 'medium', 'tier': 'premium'},
+        {'symbol': 'CLND', 'name': 'CloudNest', 'sector': 'Cloud', 'class': 'stock', 'volatility': 'medium', 'tier': 'premium'},
+        {'symbol': 'PYWV', 'name': 'PayWave', 'sector': 'Fintech', 'class': 'stock', 'volatility': 'medium', 'tier': 'premium'},
+        {'symbol': 'MDCR', 'name': 'MediCore', 'sector': 'Healthcare', 'class': 'stock', 'volatility': 'low', 'tier': 'premium'},
+        {'symbol': 'ARLF', 'name': 'AeroLift', 'sector': 'Logistics', 'class': 'stock', 'volatility': 'medium', 'tier': 'premium'},
+        {'symbol': 'BLDF', 'name': 'BuildForge', 'sector': 'Industrial', 'class': 'stock', 'volatility': 'low', 'tier': 'premium'},
+        {'symbol': 'FRCT', 'name': 'FreshCart', 'sector': 'Delivery', 'class': 'stock', 'volatility': 'medium', 'tier': 'premium'},
+        {'symbol': 'HMHV', 'name': 'HomeHaven', 'sector': 'Home Goods', 'class': 'stock', 'volatility': 'low', 'tier': 'premium'},
+        {'symbol': 'BYTS', 'name': 'ByteShield', 'sector': 'Cybersecurity', 'class': 'stock', 'volatility': 'high', 'tier': 'premium'},
+        {'symbol': 'SLRG', 'name': 'Solaris Grid', 'sector': 'Clean Energy', 'class': 'stock', 'volatility': 'high', 'tier': 'premium'},
+        {'symbol': 'NVBK', 'name': 'NovaBank', 'sector': 'Banking', 'class': 'stock', 'volatility': 'low', 'tier': 'premium'},
+        {'symbol': 'MTRL', 'name': 'MetroRail', 'sector': 'Transport', 'class': 'stock', 'volatility': 'low', 'tier': 'premium'},
+        {'symbol': 'CPOP', 'name': 'CinePop', 'sector': 'Entertainment', 'class': 'stock', 'volatility': 'medium', 'tier': 'premium'},
+    ],
+    'crypto': [
+        {'symbol': 'BTN', 'name': 'BitNova', 'sector': 'Store of Value', 'class': 'crypto', 'volatility': 'high', 'tier': 'free'},
+        {'symbol': 'ETHA', 'name': 'Ethera', 'sector': 'Smart Contracts', 'class': 'crypto', 'volatility': 'high', 'tier': 'gold'},
+        {'symbol': 'SOLR', 'name': 'Solari', 'sector': 'Fast L1', 'class': 'crypto', 'volatility': 'very-high', 'tier': 'gold'},
+        {'symbol': 'LUMT', 'name': 'LunaMint', 'sector': 'Payments', 'class': 'crypto', 'volatility': 'high', 'tier': 'gold'},
+        {'symbol': 'RPLX', 'name': 'RippleX', 'sector': 'Transfers', 'class': 'crypto', 'volatility': 'medium', 'tier': 'gold'},
+        {'symbol': 'PUPC', 'name': 'PupCoin', 'sector': 'Meme', 'class': 'crypto', 'volatility': 'very-high', 'tier': 'premium'},
+        {'symbol': 'CLAF', 'name': 'ChainLeaf', 'sector': 'Green Chain', 'class': 'crypto', 'volatility': 'medium', 'tier': 'premium'},
+        {'symbol': 'VLT', 'name': 'VoltToken', 'sector': 'Utility', 'class': 'crypto', 'volatility': 'high', 'tier': 'premium'},
+        {'symbol': 'ASTR', 'name': 'AstraCoin', 'sector': 'L2', 'class': 'crypto', 'volatility': 'high', 'tier': 'premium'},
+        {'symbol': 'NBYT', 'name': 'NeoByte', 'sector': 'Compute', 'class': 'crypto', 'volatility': 'medium', 'tier': 'premium'},
+        {'symbol': 'ORBT', 'name': 'Orbit', 'sector': 'Interop', 'class': 'crypto', 'volatility': 'high', 'tier': 'premium'},
+        {'symbol': 'GLCR', 'name': 'Glacier', 'sector': 'Privacy', 'class': 'crypto', 'volatility': 'medium', 'tier': 'premium'},
+        {'symbol': 'KOI', 'name': 'Koi', 'sector': 'Community', 'class': 'crypto', 'volatility': 'medium', 'tier': 'premium'},
+        {'symbol': 'SAFF', 'name': 'Saffron', 'sector': 'DeFi', 'class': 'crypto', 'volatility': 'high', 'tier': 'premium'},
+        {'symbol': 'COBL', 'name': 'Cobalt', 'sector': 'Gaming', 'class': 'crypto', 'volatility': 'high', 'tier': 'premium'},
+    ],
+    'forex': [
+        {'symbol': 'USXEUR', 'name': 'USX / EURX', 'sector': 'FX Major', 'class': 'forex', 'volatility': 'low', 'tier': 'gold'},
+        {'symbol': 'USXYNK', 'name': 'USX / YENK', 'sector': 'FX Major', 'class': 'forex', 'volatility': 'low', 'tier': 'gold'},
+        {'symbol': 'GBPZUSX', 'name': 'GBPZ / USX', 'sector': 'FX Major', 'class': 'forex', 'volatility': 'low', 'tier': 'gold'},
+        {'symbol': 'CADYUSX', 'name': 'CADY / USX', 'sector': 'FX Major', 'class': 'forex', 'volatility': 'low', 'tier': 'premium'},
+        {'symbol': 'AUSYUSX', 'name': 'AUSY / USX', 'sector': 'FX Major', 'class': 'forex', 'volatility': 'low', 'tier': 'premium'},
+        {'symbol': 'EURXYNK', 'name': 'EURX / YENK', 'sector': 'FX Cross', 'class': 'forex', 'volatility': 'medium', 'tier': 'premium'},
+        {'symbol': 'CHFQUSX', 'name': 'CHFQ / USX', 'sector': 'FX Major', 'class': 'forex', 'volatility': 'low', 'tier': 'premium'},
+        {'symbol': 'USXNGNX', 'name': 'USX / NGNX', 'sector': 'FX Exotic', 'class': 'forex', 'volatility': 'medium', 'tier': 'premium'},
+        {'symbol': 'USXBRLX', 'name': 'USX / BRLX', 'sector': 'FX Exotic', 'class': 'forex', 'volatility': 'medium', 'tier': 'premium'},
+        {'symbol': 'USXINRX', 'name': 'USX / INRX', 'sector': 'FX Exotic', 'class': 'forex', 'volatility': 'medium', 'tier': 'premium'},
+    ],
+    'indices': [
+        {'symbol': 'TOP500', 'name': 'Top500', 'sector': 'Index', 'class': 'index', 'volatility': 'low', 'tier': 'gold'},
+        {'symbol': 'TCH100', 'name': 'Tech100', 'sector': 'Index', 'class': 'index', 'volatility': 'medium', 'tier': 'gold'},
+        {'symbol': 'MEGA30', 'name': 'Mega30', 'sector': 'Index', 'class': 'index', 'volatility': 'low', 'tier': 'premium'},
+        {'symbol': 'GE20', 'name': 'GreenEnergy20', 'sector': 'Index', 'class': 'index', 'volatility': 'medium', 'tier': 'premium'},
+        {'symbol': 'GLB40', 'name': 'Global40', 'sector': 'Index', 'class': 'index', 'volatility': 'low', 'tier': 'premium'},
+    ]
+}
+
+
+# Compact immutable record per asset; `info` is the public dict served by the API
+Asset = namedtuple('Asset', ['symbol', 'name', 'sector', 'asset_class', 'volatility', 'tier', 'info'])
+
+
+class SymbolRegistry:
+    """Frozen index over the asset universe, built once at import time.
+
+    - ``get(symbol)``: case-insensitive symbol -> Asset in O(1)
+    - ``by_category``: SYMBOLS category ('stocks', 'crypto', ...) -> tuple of Assets
+    - ``by_class``: asset class ('stock', 'crypto', ...) -> tuple of Assets
+    - ``by_tier``: market tier label ('free', 'gold', 'premium') -> frozenset of symbols
+    """
+
+    def __init__(self, symbols_by_category):
+        by_symbol = {}
+        by_category = {}
+        by_class = {}
+        by_tier = {}
+        for category, assets in symbols_by_category.items():
+            records = []
+            for info in assets:
+                record = Asset(
+                    symbol=info['symbol'].upper(),
+                    name=info['name'],
+                    sector=info['sector'],
+                    asset_class=info['class'],
+                    volatility=info['volatility'],
+                    tier=info['tier'],
+                    info=info,
+                )
+                by_symbol[record.symbol] = record
+                records.append(record)
+                by_class.setdefault(record.asset_class, []).append(record)
+                by_tier.setdefault(record.tier, set()).add(record.symbol)
+            by_category[category] = tuple(records)
+
+        self._by_symbol = MappingProxyType(by_symbol)
+        self.assets = tuple(by_symbol.values())
+        self.by_category = MappingProxyType(by_category)
+        self.by_class = MappingProxyType({k: tuple(v) for k, v in by_class.items()})
+        self.by_tier = MappingProxyType({k: frozenset(v) for k, v in by_tier.items()})
+
+    def __contains__(self, symbol):
+        return symbol.upper() in self._by_symbol
+
+    def __len__(self):
+        return len(self._by_symbol)
+
+    def get(self, symbol):
+        """Asset record for a symbol (any case), or None"""
+        return self._by_symbol.get(symbol.upper())
+
+    @staticmethod
+    def symbol_set(symbols):
+        """Normalize a symbol list to an uppercase frozenset for membership checks"""
+        return frozenset(s.upper() for s in symbols)
+
+
+registry = SymbolRegistry(SYMBOLS)
@@ -0,0 +1,114 @@
+"""SL/TP sweeper - close every open trade whose stop-loss or take-profit was hit.
+
+A backstop for the matching engine (order_matching.py) that
+needs no resident state: a sweep loads all open trades with an exit in one
+column query, evaluates them as numpy arrays against the current snapshot
+quote of their symbol, and closes the hits through ``apply_fills`` - a bulk
+UPDATE of trades plus one aggregated balance UPDATE across the affected
+portfolios, in a single transaction. Both UPDATEs are conditional on the
+trade still being open, so sweeps are safe alongside the API, the matching
+engine and other sweeps.
+
+Run it from cron with ``python sweep_trades.py`` (or ``--loop SECONDS``).
+"""
+import logging
+import time
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import Float, cast, or_
+
+from app.extensions import db
+from app.models.trade import Trade
+from app.services.order_matching import WRITE_CHUNK, Fill, Trigger, apply_fills
+
+
+logger = logging.getLogger(__name__)
+
+
+def load_open_exits():
+    """(id, symbol, side, stop-loss, take-profit) of every open trade with an exit.
+
+    Levels come back as floats (NULL as None) - only the hits need exact values.
+    """
+    return db.session.query(
+        Trade.id, Trade.symbol, Trade.side,
+        cast(Trade.stop_loss, Float), cast(Trade.take_profit, Float),
+    ).filter(
+        Trade.status == 'open',
+        or_(Trade.stop_loss.isnot(None), Trade.take_profit.isnot(None)),
+    ).all()
+
+
+def triggered(rows, quotes):
+    """Indices of ``rows`` hit by ``quotes`` ({symbol: quote}) and (kind, price) of each.
+
+    Longs exit at the bid, shorts at the ask. When a gap crosses both levels
+    the stop-loss wins.
+    """
+    _, symbols, sides, stops, targets = zip(*rows)
+    symbols = [symbol.upper() for symbol in symbols]
+    # None (no level, unknown symbol) becomes NaN, which never compares True
+    bid = np.array([quotes[s]['bid'] if s in quotes else None for s in symbols], dtype=float)
+    ask = np.array([quotes[s]['ask'] if s in quotes else None for s in symbols], dtype=float)
+    long = np.array(sides) == 'buy'
+    stop = np.array(stops, dtype=float)
+    target = np.array(targets, dtype=float)
+
+    price = np.where(long, bid, ask)
+    stop_hit = np.where(long, price <= stop, price >= stop)
+    target_hit = np.where(long, price >= target, price <= target)
+    hits = np.flatnonzero(stop_hit | target_hit)
+    kinds = np.where(stop_hit[hits], 'stop_loss', 'take_profit')
+    return hits, kinds, price[hits]
+
+
+def _exact(trade_ids):
+    """Exact (Decimal) fields of the given trades by id"""
+    exact = {}
+    for i in range(0, len(trade_ids), WRITE_CHUNK):
+        for row in db.session.query(
+            Trade.id, Trade.user_id, Trade.size, Trade.entry_price, Trade.stop_loss, Trade.take_profit,
+        ).filter(Trade.id.in_(trade_ids[i:i + WRITE_CHUNK])):
+            exact[row.id] = row
+    return exact
+
+
+def sweep(service, now_ms=None):
+    """Close every triggered open trade; returns counts and per-phase latency (ms)"""
+    started = time.perf_counter()
+    rows = load_open_exits()
+    loaded = time.perf_counter()
+
+    fills = []
+    symbols = sorted({row.symbol.upper() for row in rows})
+    if rows:
+        quotes = {quote['symbol']: quote for quote in service.snapshot.get_many(symbols, now_ms=now_ms)}
+        hits, kinds, prices = triggered(rows, quotes)
+        hits = [(rows[i], kind, price) for i, kind, price in zip(hits.tolist(), kinds.tolist(), prices.tolist())]
+        exact = _exact([row.id for row, _, _ in hits])
+        for row, kind, price in hits:
+            trade = exact[row.id]
+            trigger = Trigger(
+                seq=0, trade_id=row.id, user_id=trade.user_id, symbol=row.symbol.upper(), side=row.side,
+                kind=kind, level=trade.stop_loss if kind == 'stop_loss' else trade.take_profit,
+                size=trade.size, entry_price=trade.entry_price,
+            )
+            fills.append(Fill(trigger, Decimal(str(price))))
+    evaluated = time.perf_counter()
+
+    applied = apply_fills(fills) if fills else []
+    written = time.perf_counter()
+
+    result = {
+        'open': len(rows),
+        'symbols': len(symbols),
+        'triggered': len(fills),
+        'closed': len(applied),
+        'load_ms': round((loaded - started) * 1000, 2),
+        'evaluate_ms': round((evaluated - loaded) * 1000, 2),
+        'write_ms': round((written - evaluated) * 1000, 2),
+        'total_ms': round((written - started) * 1000, 2),
+    }
+    logger.info('Trade sweep: %s', result)
+    return result
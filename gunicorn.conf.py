@@ -7,7 +7,10 @@ bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
 
 # Workers — Render free tier: keep at 2; scale up on paid plans
 workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 4)))
-worker_class = "sync"
+# Threaded workers so long-lived SSE streams (/api/market/stream) don't pin a
+# whole process; keep MARKET_STREAM_MAX_CONNECTIONS below `threads`
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
 
 # Timeouts — generous for OpenAI coaching calls
 timeout = 120
@@ -20,3 +23,27 @@ loglevel = "info"
 
 # Reload on code changes (disable in production)
 reload = False
+
+
+# Shared market snapshot: one producer process prices every tick for all workers
+# (only when MARKET_SHARED_SNAPSHOT_PATH is set, e.g. /dev/shm/tradetutor-quotes)
+def on_starting(server):
+    path = os.environ.get('MARKET_SHARED_SNAPSHOT_PATH')
+    if path:
+        from app.services.shared_snapshot import start_producer_process
+        config_name = os.environ.get('FLASK_ENV', 'production')
+        server.market_producer = start_producer_process(path, config_name)
+
+
+# Resting orders and SL/TP exits: every worker starts the matching thread, but
+# only the worker holding ORDER_MATCHING_LOCK_PATH matches (the rest stand by)
+def post_worker_init(worker):
+    from app.blueprints.trading.routes import matching_engine
+    matching_engine.start()
+
+
+def on_exit(server):
+    producer = getattr(server, 'market_producer', None)
+    if producer is not None:
+        producer.terminate()
+        producer.join(5)
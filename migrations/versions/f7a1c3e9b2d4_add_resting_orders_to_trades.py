@@ -0,0 +1,30 @@
+"""add resting orders to trades
+
+Revision ID: f7a1c3e9b2d4
+Revises: e5c3a7b2f1d8
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'f7a1c3e9b2d4'
+down_revision = 'e5c3a7b2f1d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('trades', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('order_type', sa.String(length=10), nullable=False, server_default='market'))
+        batch_op.add_column(sa.Column('trigger_price', sa.Numeric(precision=15, scale=8), nullable=True))
+        batch_op.add_column(sa.Column('exit_reason', sa.String(length=20), nullable=True))
+        batch_op.create_index('ix_trades_status_symbol', ['status', 'symbol'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('trades', schema=None) as batch_op:
+        batch_op.drop_index('ix_trades_status_symbol')
+        batch_op.drop_column('exit_reason')
+        batch_op.drop_column('trigger_price')
+        batch_op.drop_column('order_type')
@@ -0,0 +1,83 @@
+"""
+Benchmark candle generation engines.
+
+Compares the per-candle Python loop against the vectorized NumPy engine,
+both for raw OHLCV arrays and for the API's list-of-dicts output, plus the
+deterministic seeded engine. The endpoint columns time what
+/api/market/candles actually sends: the candle dicts encoded to JSON, with
+the stdlib encoder (jsonify, as before orjson) for the Python loop and
+orjson for the NumPy engine. The seeded column is a cold request - no cached
+page and no rolling series - so it includes filling the series to capacity.
+
+The 20x target is checked against both arrays and the endpoint payload. Dict
+output is bounded by building one Python dict per candle (~0.5us each), which
+the Python loop pays too:
+    python scripts/bench_candles.py
+"""
+import json
+import sys
+import time
+import timeit
+from pathlib import Path
+
+import numpy as np
+import orjson
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import candle_engine
+from app.services.market_data import MarketDataService
+
+
+SIZES = [120, 500, 1000, 5000]
+TIMEFRAMES = ['1m', '1d']
+TARGET = 20.0
+
+
+def best_of(func, limit, repeat=5):
+    number = max(1, 20000 // limit)
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def seeded_cold(service, timeframe, limit):
+    """Seeded candles generated from scratch: no cached pages or rolling series from earlier calls"""
+    with service._series_lock:
+        service._series.clear()
+    return service.get_candles('SMBY', timeframe, limit)
+
+
+def main():
+    python_service = MarketDataService(engine='python')
+    numpy_service = MarketDataService(engine='numpy')
+    seeded_service = MarketDataService(engine='seeded', cache_max_bytes=0)
+
+    print(f"{'timeframe':>9} {'limit':>6} {'python ms':>10} {'arrays ms':>10} "
+          f"{'dicts ms':>10} {'seeded ms':>10} {'arrays x':>9} {'dicts x':>8} "
+          f"{'py+json ms':>11} {'np+orjson ms':>13} {'endpoint x':>11}")
+    misses = []
+    for timeframe in TIMEFRAMES:
+        interval_ms = int(MarketDataService.TIMEFRAME_INTERVALS[timeframe].total_seconds() * 1000)
+        intraday = timeframe in candle_engine.INTRADAY_TIMEFRAMES
+        for limit in SIZES:
+            times_ms = int(time.time() * 1000) - interval_ms * np.arange(limit, 0, -1, dtype=np.int64)
+
+            py = best_of(lambda: python_service.get_candles('SMBY', timeframe, limit), limit)
+            arrays = best_of(
+                lambda: candle_engine.generate_ohlcv(times_ms, 100.0, 0.015, 'stock', intraday),
+                limit,
+            )
+            dicts = best_of(lambda: numpy_service.get_candles('SMBY', timeframe, limit), limit)
+            seeded = best_of(lambda: seeded_cold(seeded_service, timeframe, limit), limit)
+            py_json = best_of(lambda: json.dumps(python_service.get_candles('SMBY', timeframe, limit)), limit)
+            np_json = best_of(lambda: orjson.dumps(numpy_service.get_candles('SMBY', timeframe, limit)), limit)
+            print(f"{timeframe:>9} {limit:>6} {py * 1000:>10.3f} {arrays * 1000:>10.3f} "
+                  f"{dicts * 1000:>10.3f} {seeded * 1000:>10.3f} {py / arrays:>8.1f}x {py / dicts:>7.1f}x "
+                  f"{py_json * 1000:>11.3f} {np_json * 1000:>13.3f} {py_json / np_json:>10.1f}x")
+            for output, speedup in (('arrays', py / arrays), ('endpoint', py_json / np_json)):
+                if limit >= 500 and speedup < TARGET:
+                    misses.append(f'{output} {timeframe}/{limit}: {speedup:.1f}x')
+    print(f"\n{TARGET:g}x target at 500+ candles: " + ('met' if not misses else 'missed for ' + ', '.join(misses)))
+
+
+if __name__ == '__main__':
+    main()
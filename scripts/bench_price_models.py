@@ -0,0 +1,45 @@
+"""
+Benchmark price models.
+
+Throughput of each model's growth factors alone and of a full OHLCV series
+through candle_engine.generate_ohlcv (1m candles, time-of-day volatility on):
+    python scripts/bench_price_models.py
+"""
+import sys
+import time
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import candle_engine, price_models
+
+
+SIZES = [1000, 10000, 100000]
+
+
+def best_of(func, n, repeat=5):
+    number = max(1, 200000 // n)
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main():
+    rng = np.random.default_rng(1)
+    print(f"{'model':>8} {'n':>7} {'growth ms':>10} {'ohlcv ms':>10} {'Mcandles/s':>11}")
+    for name, cls in price_models.MODELS.items():
+        model = cls()
+        for n in SIZES:
+            times_ms = int(time.time() * 1000) - 60000 * np.arange(n, 0, -1, dtype=np.int64)
+            tod = candle_engine.time_of_day_volatility(times_ms)
+            growth = best_of(lambda: model.growth(n, 0.015, rng, tod=tod), n)
+            ohlcv = best_of(
+                lambda: candle_engine.generate_ohlcv(times_ms, 100.0, 0.015, 'stock', True, rng=rng, model=model),
+                n,
+            )
+            print(f"{name:>8} {n:>7} {growth * 1000:>10.3f} {ohlcv * 1000:>10.3f} {n / ohlcv / 1e6:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
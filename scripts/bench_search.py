@@ -0,0 +1,74 @@
+"""
+Benchmark asset search against a synthetic universe.
+
+Builds 50 / 10k / 50k instrument universes and times the prebuilt index
+against the old linear substring scan:
+    python scripts/bench_search.py
+"""
+import random
+import sys
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.asset_search import AssetSearchIndex
+from app.services.symbols import SYMBOLS, SymbolRegistry
+
+
+SYLLABLES = ['ba', 'cor', 'dex', 'fin', 'gal', 'hy', 'ion', 'jet', 'kor', 'lum',
+             'max', 'neo', 'or', 'pix', 'qua', 'ro', 'sol', 'tek', 'ul', 'vo', 'wex', 'zen']
+SECTORS = ['Cloud', 'Banking', 'Retail', 'Semiconductors', 'Clean Energy', 'Gaming',
+           'Healthcare', 'Logistics', 'DeFi', 'Payments', 'FX Major', 'Index']
+CATEGORIES = [('stocks', 'stock'), ('crypto', 'crypto'), ('forex', 'forex'), ('indices', 'index')]
+QUERIES = ['neo', 'n', 'zenmax', 'clou', 'bank', 'ionx', 'solr', 'tekgal', 'qqqq', 'clean energy']
+
+
+def synthetic_symbols(count, seed=7):
+    rng = random.Random(seed)
+    universe = {category: [] for category, _ in CATEGORIES}
+    seen = set()
+    while len(seen) < count:
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+        symbol = (name[:3] + ''.join(rng.choice('ABCDEFGHJKLMNPQRSTUVWXYZ') for _ in range(2))).upper()
+        if symbol in seen:
+            continue
+        seen.add(symbol)
+        category, asset_class = rng.choice(CATEGORIES)
+        universe[category].append({
+            'symbol': symbol, 'name': name, 'sector': rng.choice(SECTORS),
+            'class': asset_class, 'volatility': 'medium', 'tier': 'premium',
+        })
+    return universe
+
+
+def linear_search(universe, query, limit=10):
+    """The original per-request substring scan"""
+    query_lower = query.lower()
+    results = []
+    for assets in universe.values():
+        for asset in assets:
+            if query_lower in asset['symbol'].lower() or query_lower in asset['name'].lower():
+                results.append(asset)
+    return results[:limit]
+
+
+def main():
+    universes = [('50 (real)', SYMBOLS), ('10k', synthetic_symbols(10000)), ('50k', synthetic_symbols(50000))]
+    for label, universe in universes:
+        started = time.perf_counter()
+        index = AssetSearchIndex(SymbolRegistry(universe))
+        build_ms = (time.perf_counter() - started) * 1000
+        print(f"\n{label}: {len(index)} assets, index built in {build_ms:.0f} ms")
+        print(f"{'query':>14} {'hits':>5} {'index us':>9} {'linear us':>10}")
+        for query in QUERIES:
+            number = 2000
+            indexed = timeit.timeit(lambda: index.search(query), number=number) / number
+            linear = timeit.timeit(lambda: linear_search(universe, query), number=20) / 20
+            hits = len(index.search(query))
+            print(f"{query:>14} {hits:>5} {indexed * 1e6:>9.1f} {linear * 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
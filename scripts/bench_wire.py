@@ -0,0 +1,62 @@
+"""
+Benchmark candle/quote wire formats.
+
+Compares payload size (raw and gzip) and encode time of the original
+jsonify output against orjson rows, columnar JSON and columnar MessagePack:
+    python scripts/bench_wire.py
+"""
+import gzip
+import json
+import sys
+import timeit
+from pathlib import Path
+
+import msgpack
+import orjson
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import market_codec
+from app.services.market_data import MarketDataService
+
+
+SIZES = [120, 1000]
+
+
+def jsonify_dumps(payload):
+    """What flask.jsonify sends by default (sorted keys, compact separators)"""
+    return json.dumps(payload, sort_keys=True, separators=(',', ':')).encode()
+
+
+ENCODERS = [
+    ('jsonify rows', lambda p, key, fields: jsonify_dumps(p)),
+    ('orjson rows', lambda p, key, fields: orjson.dumps(p)),
+    ('columnar json', lambda p, key, fields: orjson.dumps(market_codec.shape(p, 'columnar', key, fields))),
+    ('msgpack', lambda p, key, fields: msgpack.packb(market_codec.shape(p, 'msgpack', key, fields), use_bin_type=True)),
+]
+
+
+def report(label, payload, key, fields):
+    print(f"\n{label}")
+    print(f"{'format':>14} {'bytes':>9} {'gzip':>8} {'encode us':>10}")
+    for name, encode in ENCODERS:
+        body = encode(payload, key, fields)
+        number = 200
+        seconds = timeit.timeit(lambda: encode(payload, key, fields), number=number) / number
+        print(f"{name:>14} {len(body):>9} {len(gzip.compress(body)):>8} {seconds * 1e6:>10.1f}")
+
+
+def main():
+    service = MarketDataService()
+    for limit in SIZES:
+        candles = service.get_candles('VLTR', timeframe='1h', limit=limit)
+        payload = {'symbol': 'VLTR', 'candles': candles, 'prev_cursor': candles[0]['time'], 'next_cursor': None}
+        report(f"candles: VLTR 1h x {limit}", payload, 'candles', market_codec.CANDLE_FIELDS)
+
+    quotes = service.get_quotes()
+    payload = {'timestamp': service.snapshot.tick, 'quotes': quotes}
+    report(f"quotes: {len(quotes)} symbols", payload, 'quotes', market_codec.QUOTE_FIELDS)
+
+
+if __name__ == '__main__':
+    main()
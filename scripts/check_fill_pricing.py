@@ -0,0 +1,68 @@
+"""
+Sanity checks for server-side fill prices.
+
+Prices market orders of growing size - up to far beyond the book's depth -
+on one symbol of every asset class, on the seeded engine and on a
+random-walk engine. Every fill must be at least one tick, sells must fill
+at or below the bid and buys at or above the ask, and on the seeded engine
+(where one pinned time fixes the quote) a larger order must never fill at a
+better price than a smaller one. Exits non-zero on any failure:
+    python scripts/check_fill_pricing.py
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import order_book
+from app.services.fill_pricing import FillPricer
+from app.services.market_data import MarketDataService
+from app.services.symbols import registry
+
+
+QUANTITIES = [1, 1e3, 1e6, 1e8, 1e10, 1e12]
+
+
+def check_symbol(pricer, symbol, asset_class, now_ms, pinned):
+    tick_size = order_book.TICK_SIZES.get(asset_class, order_book.TICK_SIZES['stock'])
+    passed = True
+    for side in ('sell', 'buy'):
+        previous = None
+        for quantity in QUANTITIES:
+            fill = pricer.price(symbol, side, quantity, now_ms=now_ms)
+            problems = []
+            if fill is None:
+                problems.append('no fill')
+            else:
+                price = fill['price']
+                if price < tick_size:
+                    problems.append(f'below one tick ({tick_size:g})')
+                if side == 'sell' and price > fill['bid'] or side == 'buy' and price < fill['ask']:
+                    problems.append('better than the touch')
+                if pinned and previous is not None and (price > previous if side == 'sell' else price < previous):
+                    problems.append('better than a smaller order')
+                previous = price
+            ok = not problems
+            passed &= ok
+            shown = 'None' if fill is None else f"{fill['price']:.6g}"
+            print(f"  {'ok  ' if ok else 'FAIL'} {symbol:<8} {side:<4} {quantity:>8.0e}  {shown:>12}  {', '.join(problems)}")
+    return passed
+
+
+def main():
+    now_ms = time.time() * 1000
+    symbols = [records[0] for records in registry.by_class.values()]
+    passed = True
+    for engine in ('seeded', 'numpy'):
+        print(engine)
+        pricer = FillPricer(MarketDataService(engine=engine))
+        for record in symbols:
+            passed &= check_symbol(pricer, record.symbol, record.asset_class, now_ms, engine == 'seeded')
+
+    print('PASS' if passed else 'FAIL')
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
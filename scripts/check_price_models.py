@@ -0,0 +1,92 @@
+"""
+Distribution sanity checks for the price models.
+
+Draws a long series from each model and checks the statistics it is meant
+to have (per-candle std, expected growth, fat tails, volatility clustering),
+plus the vectorized GARCH recursion against a plain loop. Exits non-zero on
+any failure:
+    python scripts/check_price_models.py
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import price_models
+
+
+N = 400000
+VOLATILITY = 0.015
+SIGMA = price_models.STEP_SCALE * VOLATILITY
+
+
+def stats(log_returns):
+    centered = log_returns - log_returns.mean()
+    var = centered.var()
+    squared = centered ** 2 - var
+    return {
+        'std': log_returns.std(),
+        'growth': np.exp(log_returns).mean(),
+        'kurtosis': (centered ** 4).mean() / var ** 2 - 3,
+        'sq_autocorr': (squared[1:] * squared[:-1]).mean() / squared.var(),
+    }
+
+
+# model -> checks on (name, value, low, high)
+EXPECTED = {
+    'gbm': {'kurtosis': (-0.1, 0.1), 'sq_autocorr': (-0.02, 0.02)},
+    'merton': {'kurtosis': (2.0, None), 'sq_autocorr': (-0.02, 0.02)},
+    'regime': {'kurtosis': (0.3, None), 'sq_autocorr': (0.05, None)},
+    'garch': {'kurtosis': (0.3, None), 'sq_autocorr': (0.05, None)},
+}
+
+
+def check(label, value, low, high):
+    ok = (low is None or value >= low) and (high is None or value <= high)
+    bounds = f"[{'-inf' if low is None else low}, {'inf' if high is None else high}]"
+    print(f"  {'ok  ' if ok else 'FAIL'} {label:<12} {value:>10.4f}  {bounds}")
+    return ok
+
+
+def garch_loop(model, z, sigma):
+    """Reference GARCH(1,1) variance recursion"""
+    var = np.empty(z.size)
+    var[0] = sigma[0] ** 2
+    for t in range(1, z.size):
+        omega = sigma[t] ** 2 * (1 - model.alpha - model.beta)
+        var[t] = omega + (model.alpha * z[t - 1] ** 2 + model.beta) * var[t - 1] * sigma[t] ** 2 / sigma[t - 1] ** 2
+    return var
+
+
+def main():
+    rng = np.random.default_rng(2024)
+    passed = True
+    for name, expected in EXPECTED.items():
+        model = price_models.MODELS[name]()
+        values = stats(np.log(model.growth(N, VOLATILITY, rng)))
+        print(name)
+        passed &= check('std/sigma', values['std'] / SIGMA, 0.95, 1.05)
+        passed &= check('growth-1', (values['growth'] - 1) / SIGMA, -0.02, 0.02)
+        for key, (low, high) in expected.items():
+            passed &= check(key, values[key], low, high)
+
+    print('garch recursion')
+    model = price_models.Garch()
+    z = rng.standard_normal(5000)
+    sigma = SIGMA * (1 + 0.5 * np.sin(np.arange(5000) / 50.0))
+    error = np.max(np.abs(model.variances(z, sigma) / garch_loop(model, z, sigma) - 1))
+    passed &= check('max rel err', error, None, 1e-9)
+
+    print('regime occupancy')
+    model = price_models.RegimeSwitching()
+    leave = 1 - np.array(model.stay)
+    passed &= check('turbulent', model.states(N, rng).mean(), leave[0] / leave.sum() - 0.02, leave[0] / leave.sum() + 0.02)
+
+    print('PASS' if passed else 'FAIL')
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
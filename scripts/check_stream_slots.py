@@ -0,0 +1,70 @@
+"""
+Connection-slot checks for the market stream hub.
+
+Subscribes clients while publishing fails, at the connection cap and after
+clients leave, and checks that every slot is given back: a failed first
+publish must not leak the slot it took. Exits non-zero on any failure:
+    python scripts/check_stream_slots.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.market_data import MarketDataService
+from app.services.market_stream import MarketStreamHub, StreamFullError
+
+
+MAX_CONNECTIONS = 4
+
+
+class FailingHub(MarketStreamHub):
+    """Hub whose publish raises while ``failing`` is set"""
+
+    failing = False
+
+    def publish(self, subscribers):
+        if self.failing:
+            raise RuntimeError('publish failed')
+        return super().publish(subscribers)
+
+
+def check(label, ok):
+    print(f"  {'ok  ' if ok else 'FAIL'} {label}")
+    return ok
+
+
+def main():
+    hub = FailingHub(MarketDataService(), max_connections=MAX_CONNECTIONS)
+    passed = True
+
+    hub.failing = True
+    for _ in range(MAX_CONNECTIONS * 3):
+        try:
+            hub.subscribe(['SMBY'])
+        except (RuntimeError, StreamFullError):
+            pass
+    passed &= check('failed subscribes leave no connections', hub.connections == 0)
+
+    hub.failing = False
+    subs = [hub.subscribe(['SMBY']) for _ in range(MAX_CONNECTIONS)]
+    passed &= check('every slot usable after failures', hub.connections == MAX_CONNECTIONS)
+    try:
+        hub.subscribe(['SMBY'])
+        full = False
+    except StreamFullError:
+        full = True
+    passed &= check('cap still enforced', full and hub.connections == MAX_CONNECTIONS)
+
+    for sub in subs:
+        events = sub.events()
+        next(events)
+        events.close()
+    passed &= check('closed streams free their slots', hub.connections == 0)
+
+    print('PASS' if passed else 'FAIL')
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
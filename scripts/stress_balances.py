@@ -0,0 +1,172 @@
+"""
+Concurrency stress test for portfolio balances.
+
+Several worker processes (like gunicorn workers), each with a thread pool,
+fire hundreds of parallel trades per user through the trading API:
+
+1. buys worth about 1.5x each user's balance, mixed with short sells - the
+   balance must run out (some buys rejected) without going negative;
+2. a close for every open trade, each sent twice - exactly one must succeed.
+
+After each phase every user's balance must equal its starting balance plus
+realized P&L minus the cost of its open longs, to the cent. Exits non-zero
+on any mismatch:
+    python scripts/stress_balances.py [--users 4] [--trades 300] [--workers 4] [--threads 32]
+
+Uses a throwaway SQLite file unless DATABASE_URL is set; against a real
+database it only adds its own users and their trades.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SYMBOL = 'PRTC'
+SHORT_EVERY = 5  # every 5th order is a short sell
+
+_app = None
+
+
+def _init_worker():
+    global _app
+    from app import create_app
+    from app.extensions import limiter
+    _app = create_app('development')
+    limiter.enabled = False
+
+
+def _request(task):
+    user_id, path, body = task
+    with _app.test_client() as client:
+        with client.session_transaction() as session:
+            session['_user_id'] = user_id
+            session['_fresh'] = True
+        response = client.post(path, json=body)
+        return response.status_code, response.get_json()
+
+
+def _run_chunk(args):
+    tasks, threads = args
+    with ThreadPoolExecutor(threads) as pool:
+        return list(pool.map(_request, tasks))
+
+
+def fire(pool, tasks, workers, threads):
+    """Run ``tasks`` ((user id, path, body)) spread over the worker processes"""
+    chunks = [(tasks[i::workers], threads) for i in range(workers)]
+    results = []
+    for chunk in pool.map(_run_chunk, chunks):
+        results.extend(chunk)
+    return results
+
+
+def check_balances(app, user_ids, starting, phase):
+    """Compare every balance with the one implied by the user's trades; returns failures"""
+    from app.extensions import db
+    from app.models.portfolio import Portfolio
+    from app.models.trade import Trade
+    from app.services.balance_ledger import cents
+
+    failures = 0
+    with app.app_context():
+        db.session.expire_all()
+        for user_id in user_ids:
+            expected = starting
+            for trade in Trade.query.filter_by(user_id=user_id):
+                if trade.status == 'closed':
+                    expected += trade.pnl
+                elif trade.status == 'open' and trade.side == 'buy':
+                    expected -= cents(trade.entry_price * trade.size)
+            balance = Portfolio.query.filter_by(user_id=user_id).one().balance
+            ok = balance == expected and balance >= 0
+            failures += not ok
+            print(f'  {phase:<6} {user_id[:8]}  balance {balance:>12}  expected {expected:>12}  {"ok" if ok else "MISMATCH"}')
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--users', type=int, default=4)
+    parser.add_argument('--trades', type=int, default=300, help='orders per user')
+    parser.add_argument('--workers', type=int, default=4, help='processes')
+    parser.add_argument('--threads', type=int, default=32, help='threads per process')
+    args = parser.parse_args()
+
+    if 'DATABASE_URL' not in os.environ:
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'stress.db')
+    _init_worker()
+    app = _app
+
+    from app.blueprints.api.routes import market_service
+    from app.extensions import db
+    from app.models.portfolio import Portfolio
+    from app.models.user import User
+    from app.services.entitlements import get_starting_simcash
+
+    with app.app_context():
+        db.create_all()
+        run = uuid.uuid4().hex[:8]
+        users = [
+            User(email=f'stress-{run}-{i}@example.com', username=f'stress_{run}_{i}', password_hash='!', tier='pro')
+            for i in range(args.users)
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        user_ids = [user.id for user in users]
+        starting = Decimal(f'{int(get_starting_simcash(users[0]))}.00')
+        for user_id in user_ids:
+            db.session.add(Portfolio(user_id=user_id, balance=starting))
+        db.session.commit()
+        ask = market_service.get_quote(SYMBOL)['ask']
+
+    # Enough buys to spend about 1.5x the balance
+    buys = args.trades - args.trades // SHORT_EVERY
+    size = round(float(starting) * 1.5 / buys / ask, 4)
+    orders = [
+        (user_id, '/api/trades', {'symbol': SYMBOL, 'side': 'sell' if n % SHORT_EVERY == 0 else 'buy', 'size': size})
+        for n in range(args.trades) for user_id in user_ids
+    ]
+
+    failures = 0
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(args.workers, initializer=_init_worker) as pool:
+        started = time.perf_counter()
+        results = fire(pool, orders, args.workers, args.threads)
+        elapsed = time.perf_counter() - started
+        statuses = Counter(status for status, _ in results)
+        opened = [body['id'] for status, body in results if status == 201]
+        print(f'orders: {len(orders)} in {elapsed:.1f}s, statuses {dict(statuses)}')
+        if not statuses[400]:
+            print('  expected some buys to be rejected for insufficient funds')
+            failures += 1
+        if set(statuses) - {201, 400}:
+            failures += 1
+        failures += check_balances(app, user_ids, starting, 'open')
+
+        owners = {body['id']: body['userId'] for status, body in results if status == 201}
+        closes = [(owners[trade_id], f'/api/trades/{trade_id}/close', None) for trade_id in opened for _ in range(2)]
+        started = time.perf_counter()
+        results = fire(pool, closes, args.workers, args.threads)
+        elapsed = time.perf_counter() - started
+        statuses = Counter(status for status, _ in results)
+        print(f'closes: {len(closes)} in {elapsed:.1f}s, statuses {dict(statuses)}')
+        if statuses[200] != len(opened) or statuses[400] != len(opened):
+            print(f'  expected exactly one successful close for each of {len(opened)} trades')
+            failures += 1
+        failures += check_balances(app, user_ids, starting, 'closed')
+
+    print('FAILED' if failures else 'all balances consistent')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""Close open trades whose stop-loss or take-profit was hit (cron / CLI entry point).
+
+    python sweep_trades.py              # one sweep, e.g. from cron every minute
+    python sweep_trades.py --loop 5     # sweep every 5 seconds until interrupted
+    python sweep_trades.py --json       # print each sweep's stats as JSON
+
+Each sweep prints how many open trades it checked and closed, with the load /
+evaluate / write latency. Safe to run next to the API (see app/services/trade_sweeper.py).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+dotenv_flask = Path(__file__).with_name('.env.flask')
+if dotenv_flask.exists():
+    load_dotenv(dotenv_flask)
+else:
+    load_dotenv()
+
+from app import create_app
+from app.services.trade_sweeper import sweep
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--loop', type=float, metavar='SECONDS', help='sweep repeatedly at this interval')
+    parser.add_argument('--json', action='store_true', help='print stats as JSON lines')
+    args = parser.parse_args()
+
+    app = create_app(os.environ.get('FLASK_ENV', 'production'))
+    from app.blueprints.api.routes import market_service
+
+    with app.app_context():
+        while True:
+            result = sweep(market_service)
+            if args.json:
+                print(json.dumps(result), flush=True)
+            else:
+                print(
+                    f"[sweep] open={result['open']} symbols={result['symbols']} "
+                    f"triggered={result['triggered']} closed={result['closed']} "
+                    f"load={result['load_ms']}ms evaluate={result['evaluate_ms']}ms "
+                    f"write={result['write_ms']}ms total={result['total_ms']}ms",
+                    flush=True,
+                )
+            if not args.loop:
+                return 0
+            time.sleep(args.loop)
+
+
+if __name__ == '__main__':
+    sys.exit(main())